@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the standalone functional documentation HTML
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import time
+from html.parser import HTMLParser
+
+import create_standalone_html_fixed as gen
+
+BLOB_RE = re.compile(r'<script type="application/octet-stream" class="doc-blob" data-doc="([^"]+)">([^<]*)</script>')
+
+# Decodes every blob the way the page does, timing each one
+NODE_DECODE = """
+const blobs = JSON.parse(require('fs').readFileSync(process.argv[1], 'utf8'));
+(async () => {
+    const times = [];
+    for (const blob of blobs) {
+        const start = performance.now();
+        const bytes = Uint8Array.from(atob(blob), c => c.charCodeAt(0));
+        const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('gzip'));
+        await new Response(stream).text();
+        times.push(performance.now() - start);
+    }
+    console.log(JSON.stringify(times));
+})();
+"""
+
+def best_of(func, repeat):
+    """Return the best wall-clock time of `repeat` calls to func"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def load_corpus(scale):
+    """The rendered documents, repeated `scale` times under distinct names"""
+    rendered = []
+    for filename, filepath in gen.find_documents(gen.SCRIPT_DIR):
+        content = gen.read_document(filepath)
+        rendered.append((filename, gen.extract_title(content, filename), gen.render_markdown(content)))
+    return {f"copy{n}_{filename}": (title, html_content)
+            for n in range(scale) for filename, title, html_content in rendered}
+
+class ElementCounter(HTMLParser):
+    """Counts the elements a parse of the page builds"""
+
+    def __init__(self):
+        super().__init__()
+        self.elements = 0
+
+    def handle_starttag(self, tag, attrs):
+        self.elements += 1
+
+def count_elements(page):
+    counter = ElementCounter()
+    counter.feed(page)
+    counter.close()
+    return counter.elements
+
+def bench_payload(args):
+    """Page size, build time and initial parse: inline HTML vs compressed blobs"""
+    documents = load_corpus(args.scale)
+    print(f"{len(documents)} documents ({args.scale}x the corpus)")
+
+    for label, inline in (('inline HTML', True), ('compressed blobs', False)):
+        page = gen.build_html(documents, inline=inline)
+        build = best_of(lambda: gen.build_html(documents, inline=inline), args.repeat)
+        blob_bytes = sum(len(match.group(2)) for match in BLOB_RE.finditer(page))
+        # html.parser stands in for the browser's initial parse: blob
+        # contents are script text, scanned but never built into elements
+        parse = best_of(lambda: count_elements(page), args.repeat)
+        print(f"  {label:<16}: {len(page.encode('utf-8')) / 1024:9.0f} KB "
+              f"({blob_bytes / 1024:.0f} KB in blobs), build {build * 1000:8.1f} ms, "
+              f"initial parse {parse * 1000:8.1f} ms, {count_elements(page):,} elements up front")
+
+def bench_decode(args):
+    """First-view cost: decoding each blob with DecompressionStream under node"""
+    node = shutil.which('node')
+    if node is None:
+        print("  skipped: node is not installed")
+        return
+    documents = load_corpus(args.scale)
+    page = gen.build_html(documents)
+    blobs = [match.group(2) for match in BLOB_RE.finditer(page)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        blob_file = os.path.join(tmp, 'blobs.json')
+        with open(blob_file, 'w', encoding='utf-8') as f:
+            json.dump(blobs, f)
+        result = subprocess.run([node, '-e', NODE_DECODE, blob_file],
+                                capture_output=True, text=True, check=True)
+    times = sorted(json.loads(result.stdout))
+    print(f"{len(blobs)} blobs: median {times[len(times) // 2]:.2f} ms, "
+          f"max {times[-1]:.2f} ms, all {sum(times):.0f} ms")
+
+BENCHMARKS = {
+    'payload': bench_payload,
+    'decode': bench_decode,
+}
+
+def main():
+    """Run the selected benchmarks"""
+    parser = argparse.ArgumentParser(description='Benchmark create_standalone_html_fixed.py')
+    parser.add_argument('names', nargs='*', metavar='name',
+                        help=f"benchmarks to run: {', '.join(BENCHMARKS)} (default: all)")
+    parser.add_argument('--scale', type=int, default=50,
+                        help='copies of the document corpus (default: 50)')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='timing repetitions, best is reported (default: 3)')
+    args = parser.parse_args()
+    for name in args.names:
+        if name not in BENCHMARKS:
+            parser.error(f"unknown benchmark: {name}")
+
+    for name in args.names or BENCHMARKS:
+        print(f"== {name}: {BENCHMARKS[name].__doc__}")
+        BENCHMARKS[name](args)
+        print()
+
+if __name__ == '__main__':
+    main()
@@ -1,12 +1,35 @@
+#!/usr/bin/env python3
+"""
+Build the standalone ACAS functional documentation HTML.
+
+Every markdown document is rendered to HTML at build time. The home page is
+embedded as HTML; each other page is stored gzip-compressed in its own
+<script type="application/octet-stream"> and decompressed in the browser the
+first time it is viewed. The sidebar only swaps which page element is shown.
+
+Usage:
+    python3 create_standalone_html_fixed.py [--input-dir DIR] [--output FILE] [--inline-documents]
+"""
+
+import argparse
+import base64
+import gzip
+import html
 import os
-import json
+import re
+import sys
+
+import markdown2
 
-# Read all markdown files
-docs_path = "/Users/MartinGonella/Desktop/Demos/ACAS-Nightly/FUNCTIONAL DOCUMENTATION"
-documents = {}
+# Build helpers shared with the other generators live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from search_index import SEARCH_BOX, SEARCH_CSS, SearchIndexBuilder, search_script
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+OUTPUT_NAME = "Functional_Documentation_Report.html"
 
 # List of files in order
-files = [
+FILES = [
     "ACAS_Executive_Summary.md",
     "ACAS_Program_Catalog.md", 
     "ACAS_Architecture_Diagrams.md",
@@ -18,28 +41,96 @@ files = [
     "Original_Documentation_Prompt.md"
 ]
 
-# Read each file
-for filename in files:
-    filepath = os.path.join(docs_path, filename)
-    if os.path.exists(filepath):
-        with open(filepath, 'r', encoding='utf-8') as f:
-            content = f.read()
-            # Escape backticks and backslashes for JavaScript
-            content = content.replace('\\', '\\\\').replace('`', '\\`').replace('${', '\\${')
-            documents[filename] = content
-
-# Create the HTML content
-html_content = '''<!DOCTYPE html>
+# marked's gfm + breaks options, which the page used to parse with
+MARKDOWN_EXTRAS = ['tables', 'break-on-newline', 'header-ids', 'strike', 'cuddled-lists']
+
+FENCE_RE = re.compile(r'^```[ \t]*([\w+-]*)[ \t]*\n(.*?)^```[ \t]*$', re.MULTILINE | re.DOTALL)
+PLACEHOLDER_RE = re.compile(r'<p>\[\[BLOCK_(\d+)\]\]</p>|\[\[BLOCK_(\d+)\]\]')
+TITLE_RE = re.compile(r'^#\s+(.+)$', re.MULTILINE)
+
+# Home page content
+HOME_CONTENT = '''
+# Welcome to ACAS Functional Documentation
+
+## About This Documentation
+
+This comprehensive documentation suite provides detailed functional and technical documentation for the **ACAS (Applewood Computers Accounting System)**, a mature COBOL-based accounting system that has been in continuous development since 1976.
+
+### Documentation Overview
+
+This documentation package includes:
+
+1. **Executive Summary** - High-level overview for decision makers
+2. **Program Catalog** - Complete listing of 200+ programs with dependencies
+3. **Architecture Diagrams** - Visual representations of system structure
+4. **Data Dictionary** - Field-level documentation of all files and tables
+5. **Business Flows** - End-to-end process documentation
+6. **Technical Debt Assessment** - Modernization analysis and recommendations
+7. **Accounting Analysis** - Compliance features and calculation engines
+
+### System Highlights
+
+- **47+ years** of continuous development (1976-2025)
+- **200+ COBOL programs** organized in modular architecture
+- **5 integrated modules**: Sales, Purchase, Stock, General Ledger, and IRS
+- **Dual architecture** supporting both COBOL files and MySQL/MariaDB
+- **Complete accounting** functionality for small to medium businesses
+
+### How to Use This Documentation
+
+#### For Executives
+Start with the **Executive Summary** for a high-level overview of the system's capabilities, current state, and modernization opportunities.
+
+#### For Architects
+Review the **Architecture Diagrams** and **Technical Debt Assessment** to understand the system structure and plan modernization strategies.
+
+#### For Developers
+Use the **Program Catalog** and **Data Dictionary** to navigate the codebase and understand data structures.
+
+#### For Business Analysts
+Explore the **Business Flows** and **Accounting Analysis** to understand business processes and compliance features.
+
+### Key Findings Summary
+
+#### Strengths
+- ✅ Complete accounting functionality
+- ✅ Proven reliability over 47 years
+- ✅ Modular architecture
+- ✅ Strong data validation
+- ✅ Comprehensive integration
+
+#### Areas for Improvement
+- ❌ No built-in security/authentication
+- ❌ Character-based UI only
+- ❌ Missing GL programs (gl040, gl130, gl190)
+- ❌ Technical debt (GO TO patterns)
+- ❌ Limited integration capabilities
+
+### Navigation Guide
+
+Use the sidebar on the left to navigate through the documentation. Each section is designed to provide specific insights:
+
+- **Overview** sections provide high-level understanding
+- **Technical** sections detail system implementation
+- **Business** sections explain functional capabilities
+- **Reference** sections provide comprehensive listings
+
+---
+
+*This documentation was generated through comprehensive analysis of the ACAS codebase to enable technical teams to understand the system, create architectural diagrams, and develop modernization strategies.*
+'''
+
+# HTML before the document pages
+PAGE_HEAD = '''<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>ACAS Functional Documentation</title>
     <link href="https://cdnjs.cloudflare.com/ajax/libs/prism/1.29.0/themes/prism-tomorrow.min.css" rel="stylesheet" />
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/prism/1.29.0/prism.min.js"></script>
+    <script src="https://cdnjs.cloudflare.com/ajax/libs/prism/1.29.0/prism.min.js" data-manual></script>
     <script src="https://cdnjs.cloudflare.com/ajax/libs/prism/1.29.0/components/prism-yaml.min.js"></script>
     <script src="https://cdnjs.cloudflare.com/ajax/libs/prism/1.29.0/components/prism-bash.min.js"></script>
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/marked/4.3.0/marked.min.js"></script>
     <script src="https://cdn.jsdelivr.net/npm/mermaid@10/dist/mermaid.min.js"></script>
     <style>
         * {
@@ -287,31 +378,6 @@ html_content = '''<!DOCTYPE html>
             overflow-x: auto;
         }
         
-        /* Loading State */
-        .loading {
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            height: 100%;
-            font-size: 18px;
-            color: #666;
-        }
-        
-        .loading-spinner {
-            width: 40px;
-            height: 40px;
-            border: 4px solid #f3f3f3;
-            border-top: 4px solid #4a9eff;
-            border-radius: 50%;
-            animation: spin 1s linear infinite;
-            margin-right: 15px;
-        }
-        
-        @keyframes spin {
-            0% { transform: rotate(0deg); }
-            100% { transform: rotate(360deg); }
-        }
-        
         /* Mobile Responsive */
         .menu-toggle {
             display: none;
@@ -410,6 +476,8 @@ html_content = '''<!DOCTYPE html>
         ::-webkit-scrollbar-thumb:hover {
             background: #555;
         }
+        
+        ''' + SEARCH_CSS + '''
     </style>
 </head>
 <body>
@@ -421,6 +489,7 @@ html_content = '''<!DOCTYPE html>
             <div class="sidebar-header">
                 <h1>ACAS Documentation</h1>
                 <p>Comprehensive functional documentation for the Applewood Computers Accounting System</p>
+                ''' + SEARCH_BOX + '''
             </div>
             
             <div class="nav-section">
@@ -482,14 +551,16 @@ html_content = '''<!DOCTYPE html>
         
         <!-- Main Content Area -->
         <main class="content" id="content">
-            <div class="loading">
-                <div class="loading-spinner"></div>
-                Loading documentation...
-            </div>
-        </main>
+'''
+
+# Closes the content area; the compressed page blobs follow it
+PAGE_BODY_CLOSE = '''        </main>
     </div>
     
-    <script>
+'''
+
+# Page scripts, after the blobs
+PAGE_TAIL = '''    <script>
         // Initialize Mermaid with proper configuration
         mermaid.initialize({ 
             startOnLoad: false,
@@ -520,191 +591,78 @@ html_content = '''<!DOCTYPE html>
             }
         });
         
-        // Marked configuration
-        marked.setOptions({
-            breaks: true,
-            gfm: true,
-            highlight: function(code, lang) {
-                if (Prism.languages[lang]) {
-                    return Prism.highlight(code, Prism.languages[lang], lang);
-                }
-                return code;
-            }
+        // Pages embedded as HTML (the home page, or every page in an
+        // --inline-documents build) are always at hand
+        const inlinePages = new Map();
+        document.querySelectorAll('.doc-page').forEach(page => {
+            inlinePages.set(page.dataset.doc, page);
         });
         
-        // Home page content
-        const homeContent = `
-# Welcome to ACAS Functional Documentation
-
-## About This Documentation
-
-This comprehensive documentation suite provides detailed functional and technical documentation for the **ACAS (Applewood Computers Accounting System)**, a mature COBOL-based accounting system that has been in continuous development since 1976.
-
-### Documentation Overview
-
-This documentation package includes:
-
-1. **Executive Summary** - High-level overview for decision makers
-2. **Program Catalog** - Complete listing of 200+ programs with dependencies
-3. **Architecture Diagrams** - Visual representations of system structure
-4. **Data Dictionary** - Field-level documentation of all files and tables
-5. **Business Flows** - End-to-end process documentation
-6. **Technical Debt Assessment** - Modernization analysis and recommendations
-7. **Accounting Analysis** - Compliance features and calculation engines
-
-### System Highlights
-
-- **47+ years** of continuous development (1976-2025)
-- **200+ COBOL programs** organized in modular architecture
-- **5 integrated modules**: Sales, Purchase, Stock, General Ledger, and IRS
-- **Dual architecture** supporting both COBOL files and MySQL/MariaDB
-- **Complete accounting** functionality for small to medium businesses
-
-### How to Use This Documentation
-
-#### For Executives
-Start with the **Executive Summary** for a high-level overview of the system's capabilities, current state, and modernization opportunities.
-
-#### For Architects
-Review the **Architecture Diagrams** and **Technical Debt Assessment** to understand the system structure and plan modernization strategies.
-
-#### For Developers
-Use the **Program Catalog** and **Data Dictionary** to navigate the codebase and understand data structures.
-
-#### For Business Analysts
-Explore the **Business Flows** and **Accounting Analysis** to understand business processes and compliance features.
-
-### Key Findings Summary
-
-#### Strengths
-- ✅ Complete accounting functionality
-- ✅ Proven reliability over 47 years
-- ✅ Modular architecture
-- ✅ Strong data validation
-- ✅ Comprehensive integration
-
-#### Areas for Improvement
-- ❌ No built-in security/authentication
-- ❌ Character-based UI only
-- ❌ Missing GL programs (gl040, gl130, gl190)
-- ❌ Technical debt (GO TO patterns)
-- ❌ Limited integration capabilities
-
-### Navigation Guide
-
-Use the sidebar on the left to navigate through the documentation. Each section is designed to provide specific insights:
-
-- **Overview** sections provide high-level understanding
-- **Technical** sections detail system implementation
-- **Business** sections explain functional capabilities
-- **Reference** sections provide comprehensive listings
-
----
-
-*This documentation was generated through comprehensive analysis of the ACAS codebase to enable technical teams to understand the system, create architectural diagrams, and develop modernization strategies.*
-        `;
-        
-        // Embedded documents
-        const documents = {
-'''
-
-# Add each document to the JavaScript object
-for filename, content in documents.items():
-    html_content += f'            "{filename}": `{content}`,\n'
-
-html_content += '''        };
+        // Other pages are gzip-compressed base64 blobs, decoded on first view.
+        // The last few decoded pages are kept in an LRU (a Map in use order)
+        const PAGE_CACHE_SIZE = 4;
+        const pageCache = new Map();
+        let requestedDoc = null;
+        
+        async function decodePage(blob) {
+            const bytes = Uint8Array.from(atob(blob.textContent.trim()), c => c.charCodeAt(0));
+            const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('gzip'));
+            const page = document.createElement('section');
+            page.className = 'doc-page';
+            page.dataset.doc = blob.dataset.doc;
+            page.innerHTML = await new Response(stream).text();
+            return page;
+        }
+        
+        async function getPage(docName) {
+            if (inlinePages.has(docName)) {
+                return inlinePages.get(docName);
+            }
+            let page = pageCache.get(docName);
+            if (page) {
+                pageCache.delete(docName);
+            } else {
+                const blob = document.querySelector(`script.doc-blob[data-doc="${docName}"]`);
+                if (!blob) {
+                    return null;
+                }
+                page = await decodePage(blob);
+            }
+            pageCache.set(docName, page);
+            if (pageCache.size > PAGE_CACHE_SIZE) {
+                pageCache.delete(pageCache.keys().next().value);
+            }
+            return page;
+        }
         
-        // Load document function
+        // Switch documents: pages are rendered at build time, so this only
+        // swaps the page element shown (decompressing it on first view)
         async function loadDocument(docName) {
             const contentDiv = document.getElementById('content');
+            requestedDoc = docName;
             
             // Update active navigation
             document.querySelectorAll('.nav-item').forEach(item => {
-                item.classList.remove('active');
+                item.classList.toggle('active', item.dataset.doc === docName);
             });
             
-            // Find and activate the clicked item
-            const clickedItem = document.querySelector(`[data-doc="${docName}"]`);
-            if (clickedItem) {
-                clickedItem.classList.add('active');
-            }
-            
             // Close sidebar on mobile
             if (window.innerWidth <= 768) {
                 document.getElementById('sidebar').classList.remove('active');
             }
             
-            // Show loading state
-            contentDiv.innerHTML = '<div class="loading"><div class="loading-spinner"></div>Loading documentation...</div>';
-            
-            // Small delay to show loading animation
-            await new Promise(resolve => setTimeout(resolve, 100));
-            
+            let page;
             try {
-                let content;
-                
-                if (docName === 'home') {
-                    content = homeContent;
-                } else if (documents[docName]) {
-                    content = documents[docName];
-                } else {
-                    throw new Error('Document not found');
-                }
-                
-                // Extract title from content
-                const titleMatch = content.match(/^#\\s+(.+)$/m);
-                const title = titleMatch ? titleMatch[1] : docName.replace('.md', '').replace(/_/g, ' ');
-                
-                // Render the markdown content
-                let html = marked.parse(content);
-                
-                // Process mermaid diagrams
-                const mermaidRegex = /<pre><code class="language-mermaid">([\s\S]*?)<\/code><\/pre>/g;
-                let mermaidIndex = 0;
-                const mermaidDiagrams = [];
-                
-                html = html.replace(mermaidRegex, (match, diagram) => {
-                    const id = `mermaid-${mermaidIndex++}`;
-                    mermaidDiagrams.push({ id, diagram: diagram.trim() });
-                    return `<div class="mermaid" id="${id}">Loading diagram...</div>`;
-                });
-                
-                // Set the content
-                contentDiv.innerHTML = `
-                    <div class="content-header">
-                        <h1>${title}</h1>
-                        <p>ACAS Functional Documentation</p>
-                    </div>
-                    <div class="markdown-content">
-                        ${html}
-                    </div>
-                `;
-                
-                // Render Mermaid diagrams
-                for (const { id, diagram } of mermaidDiagrams) {
-                    try {
-                        const element = document.getElementById(id);
-                        if (element) {
-                            element.innerHTML = diagram;
-                            await mermaid.run({
-                                nodes: [element]
-                            });
-                        }
-                    } catch (error) {
-                        console.error('Mermaid render error:', error);
-                        document.getElementById(id).innerHTML = `<pre>${diagram}</pre>`;
-                    }
-                }
-                
-                // Re-run Prism for syntax highlighting
-                if (typeof Prism !== 'undefined') {
-                    Prism.highlightAll();
-                }
-                
-                // Scroll to top
-                contentDiv.scrollTop = 0;
-                
+                page = await getPage(docName);
             } catch (error) {
+                console.error('Document decode error:', error);
+                page = null;
+            }
+            if (requestedDoc !== docName) {
+                // Another document was picked while this one was decoding
+                return;
+            }
+            if (!page) {
                 contentDiv.innerHTML = `
                     <div class="content-header">
                         <h1>Error Loading Document</h1>
@@ -712,10 +670,53 @@ html_content += '''        };
                     </div>
                     <div class="markdown-content">
                         <p>Sorry, we couldn't load the document: <strong>${docName}</strong></p>
-                        <p>Error: ${error.message}</p>
-                        <p>Please try selecting another document from the navigation menu.</p>
+                        <p>This browser may not support DecompressionStream; a build with --inline-documents works everywhere.</p>
                     </div>
                 `;
+                return;
+            }
+            
+            contentDiv.replaceChildren(page);
+            page.hidden = false;
+            contentDiv.scrollTop = 0;
+            
+            if (!page.dataset.prepared) {
+                page.dataset.prepared = 'true';
+                prepareDocument(page);
+            }
+        }
+        
+        // First view of a page: highlight its code and lay out its diagrams
+        // (Mermaid has to measure text, so this waits until the page is shown)
+        async function prepareDocument(page) {
+            if (typeof Prism !== 'undefined') {
+                Prism.highlightAllUnder(page);
+            }
+            if (typeof mermaid === 'undefined') {
+                return;
+            }
+            for (const element of page.querySelectorAll('.mermaid')) {
+                const diagram = element.textContent;
+                try {
+                    await mermaid.run({
+                        nodes: [element]
+                    });
+                } catch (error) {
+                    console.error('Mermaid render error:', error);
+                    const source = document.createElement('pre');
+                    source.textContent = diagram;
+                    element.replaceChildren(source);
+                }
+            }
+        }
+        
+        // Search results can be on pages not yet shown (or decoded)
+        async function openSearchResult(hit) {
+            await loadDocument(hit.container.id);
+            const page = document.querySelector(`#content .doc-page[data-doc="${hit.container.id}"]`);
+            const target = page && hit.anchor ? page.querySelector(`[id="${CSS.escape(hit.anchor)}"]`) : null;
+            if (target) {
+                target.scrollIntoView({ block: 'start' });
             }
         }
         
@@ -725,20 +726,156 @@ html_content += '''        };
             sidebar.classList.toggle('active');
         }
         
-        // Load home page on startup
-        window.addEventListener('DOMContentLoaded', async function() {
-            // Wait a bit to ensure everything is loaded
-            await new Promise(resolve => setTimeout(resolve, 100));
-            await loadDocument('home');
+        // Show the home page on startup
+        window.addEventListener('DOMContentLoaded', function() {
+            loadDocument('home');
         });
     </script>
 </body>
 </html>'''
 
-# Write the HTML file
-output_path = os.path.join(docs_path, "Functional_Documentation_Report.html")
-with open(output_path, 'w', encoding='utf-8') as f:
-    f.write(html_content)
 
-print(f"Created fixed HTML file: {output_path}")
-print(f"Total size: {len(html_content):,} bytes")
\ No newline at end of file
+def find_document(docs_path, filename):
+    """Locate a document, allowing the NN_ ordering prefix used on disk"""
+    filepath = os.path.join(docs_path, filename)
+    if os.path.exists(filepath):
+        return filepath
+    if os.path.isdir(docs_path):
+        for name in sorted(os.listdir(docs_path)):
+            number, _, rest = name.partition('_')
+            if number.isdigit() and rest == filename:
+                return os.path.join(docs_path, name)
+    return None
+
+def read_document(filepath):
+    """Read a markdown document"""
+    with open(filepath, 'r', encoding='utf-8') as f:
+        return f.read()
+
+def render_markdown(content):
+    """Render markdown to HTML, emitting code and Mermaid blocks the way marked did"""
+    blocks = []
+    
+    # Fenced blocks are swapped for placeholders so markdown2 leaves them alone
+    def protect(match):
+        lang, code = match.group(1), match.group(2).rstrip('\n')
+        if lang == 'mermaid':
+            blocks.append(f'<div class="mermaid">{html.escape(code.strip())}</div>')
+        else:
+            language = f' class="language-{lang}"' if lang else ''
+            blocks.append(f'<pre><code{language}>{html.escape(code)}</code></pre>')
+        return f'\n\n[[BLOCK_{len(blocks) - 1}]]\n\n'
+    
+    html_content = markdown2.markdown(FENCE_RE.sub(protect, content), extras=MARKDOWN_EXTRAS)
+    return PLACEHOLDER_RE.sub(lambda match: blocks[int(match.group(1) or match.group(2))], html_content)
+
+def render_document(filepath):
+    """Read and render one document; run in build_docs.py worker processes"""
+    return render_markdown(read_document(filepath))
+
+def extract_title(content, name):
+    """The document's first top-level heading, or a title made from its name"""
+    match = TITLE_RE.search(content)
+    return match.group(1).strip() if match else name.replace('.md', '').replace('_', ' ')
+
+def page_content(title, html_content):
+    """Header and body of one pre-rendered page"""
+    return f'''                <div class="content-header">
+                    <h1>{html.escape(title)}</h1>
+                    <p>ACAS Functional Documentation</p>
+                </div>
+                <div class="markdown-content">
+{html_content}
+                </div>
+'''
+
+def document_page(name, title, html_content, hidden=True):
+    """One page embedded as HTML"""
+    return (f'            <section class="doc-page" data-doc="{name}"{" hidden" if hidden else ""}>\n'
+            f'{page_content(title, html_content)}            </section>\n')
+
+def document_blob(name, title, html_content):
+    """One page as a gzip-compressed, base64-encoded blob the browser skips
+    until the page is first viewed"""
+    data = gzip.compress(page_content(title, html_content).encode('utf-8'), compresslevel=9, mtime=0)
+    return (f'    <script type="application/octet-stream" class="doc-blob" data-doc="{name}">'
+            f'{base64.b64encode(data).decode("ascii")}</script>\n')
+
+def build_html(documents, inline=False):
+    """Create the HTML page from {filename: (title, rendered HTML)}
+
+    The home page is always embedded as HTML; the other pages are compressed
+    blobs unless inline is set. Every page goes into the search index.
+    """
+    home_title, home_html = extract_title(HOME_CONTENT, 'home'), render_markdown(HOME_CONTENT)
+    pages = [document_page('home', home_title, home_html, hidden=False)]
+    blobs = []
+    search_index = SearchIndexBuilder()
+    search_index.add_html(home_html, 'home', home_title)
+    for filename, (title, html_content) in documents.items():
+        if inline:
+            pages.append(document_page(filename, title, html_content))
+        else:
+            blobs.append(document_blob(filename, title, html_content))
+        search_index.add_html(html_content, filename, title)
+    return (PAGE_HEAD + '\n' + ''.join(pages) + PAGE_BODY_CLOSE + ''.join(blobs)
+            + '    ' + search_script(search_index) + '\n' + PAGE_TAIL)
+
+def find_documents(docs_path):
+    """(filename, path) for each document present, in FILES order"""
+    found = []
+    for filename in FILES:
+        filepath = find_document(docs_path, filename)
+        if filepath:
+            found.append((filename, filepath))
+        else:
+            print(f"Skipping missing document: {filename}")
+    return found
+
+def main():
+    """Render each document and write the standalone HTML file"""
+    parser = argparse.ArgumentParser(description='Build the standalone ACAS functional documentation HTML')
+    parser.add_argument('--input-dir', default=SCRIPT_DIR,
+                        help='directory holding the markdown documents (default: this script\'s directory)')
+    parser.add_argument('--output',
+                        help=f'HTML file to write (default: {OUTPUT_NAME} in the input directory)')
+    parser.add_argument('--inline-documents', action='store_true',
+                        help='embed every page as plain HTML, for browsers without DecompressionStream')
+    args = parser.parse_args()
+    if not os.path.isdir(args.input_dir):
+        parser.error(f"input directory not found: {args.input_dir}")
+    
+    documents = {}
+    for filename, filepath in find_documents(args.input_dir):
+        content = read_document(filepath)
+        documents[filename] = (extract_title(content, filename), render_markdown(content))
+    
+    html_content = build_html(documents, inline=args.inline_documents)
+    output_path = args.output or os.path.join(args.input_dir, OUTPUT_NAME)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(html_content)
+    print(f"Created HTML file: {output_path}")
+    print(f"Total size: {len(html_content):,} bytes")
+
+def plan_build():
+    """Return (jobs, finish) for build_docs.py
+
+    Builds from the documents next to this script; jobs renders each document
+    and finish takes the results in file order and writes the HTML.
+    """
+    found = find_documents(SCRIPT_DIR)
+    titles = [extract_title(read_document(filepath), filename) for filename, filepath in found]
+    jobs = [('render_document', (filepath,)) for _, filepath in found]
+    
+    def finish(results):
+        documents = {filename: (title, html_content)
+                     for (filename, _), title, html_content in zip(found, titles, results)}
+        output_path = os.path.join(SCRIPT_DIR, OUTPUT_NAME)
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(build_html(documents))
+        return output_path
+    
+    return jobs, finish
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,690 @@
+#!/usr/bin/env python3
+"""
+Convert box-drawing ASCII diagrams to Mermaid flowcharts.
+
+The diagram is loaded into a 2-D character grid. Rectangles traced from their
+corners become nodes, or subgraphs when they contain other boxes, and full-width
+dividers inside a box split it into section subgraphs. Plain text outside boxes
+becomes nodes when a line touches it. Every connected run of line and arrow
+characters (found by flood fill) becomes edges between the nodes it touches:
+arrowheads give the direction, undirected lines run top-to-bottom and
+left-to-right.
+"""
+
+import hashlib
+import re
+from collections import deque
+
+# Stroke directions as bit flags
+U, D, L, R = 1, 2, 4, 8
+OPPOSITE = {U: D, D: U, L: R, R: L}
+STEPS = ((U, -1, 0), (D, 1, 0), (L, 0, -1), (R, 0, 1))
+
+LINE_STROKES = {}
+for _chars, _bits in (('─━═', L | R), ('│┃║', U | D),
+                      ('┌╭╔┏', R | D), ('┐╮╗┓', L | D), ('└╰╚┗', U | R), ('┘╯╝┛', U | L),
+                      ('├╠┣', U | D | R), ('┤╣┫', U | D | L),
+                      ('┬╦┳', L | R | D), ('┴╩┻', L | R | U), ('┼╬╋', U | D | L | R),
+                      ('↔⟷', L | R), ('↕', U | D)):
+    for _ch in _chars:
+        LINE_STROKES[_ch] = _bits
+
+ARROW_HEADS = {'→': R, '⟶': R, '▶': R, '►': R, '←': L, '⟵': L, '◀': L, '◄': L,
+               '↓': D, '▼': D, '↑': U, '▲': U}
+
+# Unicode lines and arrows are lines wherever they appear; an arrow also
+# strokes back along its shaft
+CHAR_STROKES = dict(LINE_STROKES)
+CHAR_STROKES.update((ch, head | OPPOSITE[head]) for ch, head in ARROW_HEADS.items())
+LINE_MASK = '\x01'
+MASK_TABLE = str.maketrans({ch: LINE_MASK for ch in CHAR_STROKES})
+# ASCII characters that are lines or arrows only in context
+ASCII_LINE_RE = re.compile(r'[-=|+<>^v]')
+# Runs of text in a row with its line cells masked, split at two spaces
+TEXT_RUN_RE = re.compile(r'[^ \x01]+(?: [^ \x01]+)*')
+
+# Neighbours that make an ASCII '-' or '=' part of a line rather than text
+HORIZONTAL_CONTEXT = set('-=<>+') | {ch for ch, bits in LINE_STROKES.items() if bits & (L | R)}
+
+# Box outline characters; '+' serves as any ASCII corner or junction
+TOP_LEFT = set('┌╭╔┏+')
+TOP_RIGHT = set('┐╮╗┓+')
+BOTTOM_LEFT = set('└╰╚┗+')
+BOTTOM_RIGHT = set('┘╯╝┛+')
+HORIZONTAL_EDGE = set('─━═-┬┴┼╦╩╬┳┻╋+')
+VERTICAL_EDGE = set('│┃║|├┤┼╠╣╬┣┫╋+')
+DIVIDER_LEFT = set('├╠┣+')
+DIVIDER_RIGHT = set('┤╣┫+')
+ASCII_RIGHT_EDGE = VERTICAL_EDGE | BOTTOM_RIGHT
+TOP_LEFT_RE = re.compile('[┌╭╔┏+]')
+# A top edge up to its corner; '+' may be a junction, so it ends runs too
+TOP_EDGE_RE = re.compile('[─━═\\-┬┴┼╦╩╬┳┻╋]*')
+HORIZONTAL_EDGE_RE = re.compile('[─━═\\-┬┴┼╦╩╬┳┻╋+]*')
+DOWN_JUNCTION_RE = re.compile('[┬┼╦╬┳╋+]')
+
+# Hand-drawn right edges drift a column or three from row to row; try the
+# nearest positions first
+EDGE_DRIFT = (0, -1, 1, -2, 2, -3, 3)
+
+PALETTE = ['#4a9eff', '#00d4ff', '#4ecdc4', '#667eea', '#ffe66d', '#ff6b6b']
+DARK_TEXT = {'#ffe66d'}
+
+# Converted diagrams by content hash: the same diagram pasted into several
+# subsystem specs is only converted once per process
+_converted = {}
+
+def ascii_to_mermaid(content):
+    """Mermaid source for an ASCII diagram, or None if no structure was found"""
+    digest = hashlib.sha256(content.encode('utf-8')).hexdigest()
+    if digest not in _converted:
+        _converted[digest] = DiagramGrid(content).to_mermaid()
+    return _converted[digest]
+
+def mermaid_label(lines):
+    """Quote a (multi-line) node label for Mermaid"""
+    text = '<br/>'.join(line.replace('"', '#quot;').replace('<', '#lt;').replace('>', '#gt;')
+                        for line in lines)
+    return f'"{text or " "}"'
+
+class Box:
+    __slots__ = ('top', 'left', 'bottom', 'rights', 'right', 'parent', 'children',
+                 'dividers', 'lines', 'key')
+
+    def __init__(self, top, left, rights):
+        self.top = top
+        self.left = left
+        self.bottom = top + len(rights) - 1
+        # Column of the right edge on each row, top to bottom
+        self.rights = rights
+        self.right = max(rights)
+        self.parent = None
+        self.children = []
+        self.dividers = []
+        self.lines = []
+        self.key = ('box', None)
+
+    def right_at(self, r):
+        return self.rights[r - self.top]
+
+    @property
+    def is_group(self):
+        """Boxes holding other boxes, or split by dividers, become subgraphs"""
+        return bool(self.children or self.dividers)
+
+class DiagramGrid:
+    def __init__(self, content):
+        rows = content.expandtabs().split('\n')
+        while rows and not rows[-1].strip():
+            rows.pop()
+        while rows and not rows[0].strip():
+            rows.pop(0)
+        self.height = len(rows)
+        self.width = max((len(row) for row in rows), default=0)
+        # One blank row and column of padding: neighbours of edge cells,
+        # including index -1, land on blanks
+        self.rows = [row.ljust(self.width + 1) for row in rows] + [' ' * (self.width + 1)]
+        self.ascii_strokes = {}
+        self.ascii_heads = {}
+        self.masked = self.mask_lines()
+        self.boxes = self.find_boxes()
+        # Per cell: the box whose outline it is on, the innermost box around it
+        self.border = [[None] * (self.width + 1) for _ in range(self.height + 1)]
+        self.owner = [[None] * (self.width + 1) for _ in range(self.height + 1)]
+        self.nest_boxes()
+
+    def at(self, r, c):
+        """Character at row r, column c; blank outside the grid"""
+        if 0 <= r < self.height and 0 <= c < self.width:
+            return self.rows[r][c]
+        return ' '
+
+    def stroke(self, r, c):
+        """Stroke directions of the cell (0 for text and blanks)"""
+        bits = CHAR_STROKES.get(self.rows[r][c])
+        if bits is None:
+            return self.ascii_strokes.get((r, c), 0)
+        return bits
+
+    def head(self, r, c):
+        """Direction an arrowhead cell points, or None"""
+        head = ARROW_HEADS.get(self.rows[r][c])
+        if head is None:
+            return self.ascii_heads.get((r, c))
+        return head
+
+    def mask_lines(self):
+        """Rows with every line and arrow cell replaced by LINE_MASK"""
+        at = self.at
+        masked_rows = []
+        for r in range(self.height + 1):
+            row = self.rows[r]
+            masked = row.translate(MASK_TABLE)
+            ascii_cells = []
+            for match in ASCII_LINE_RE.finditer(row):
+                c = match.start()
+                ch = row[c]
+                bits = head = None
+                if ch in '-=':
+                    if at(r, c - 1) in HORIZONTAL_CONTEXT or at(r, c + 1) in HORIZONTAL_CONTEXT:
+                        bits = L | R
+                elif ch == '|':
+                    bits = U | D
+                elif ch == '+':
+                    if any(at(r + dr, c + dc) in '-=|+' or at(r + dr, c + dc) in LINE_STROKES
+                           for _, dr, dc in STEPS):
+                        bits = U | D | L | R
+                elif ch == '>':
+                    if at(r, c - 1) in '-=' or LINE_STROKES.get(at(r, c - 1), 0) & R:
+                        head = R
+                elif ch == '<':
+                    if at(r, c + 1) in '-=' or LINE_STROKES.get(at(r, c + 1), 0) & L:
+                        head = L
+                elif ch == '^':
+                    if at(r + 1, c) in '|+' or LINE_STROKES.get(at(r + 1, c), 0) & U:
+                        head = U
+                elif ((at(r - 1, c) in '|+' or LINE_STROKES.get(at(r - 1, c), 0) & D)
+                        and not at(r, c - 1).isalnum() and not at(r, c + 1).isalnum()):
+                    head = D
+                if head is not None:
+                    self.ascii_heads[(r, c)] = head
+                    bits = head | OPPOSITE[head]
+                if bits is not None:
+                    self.ascii_strokes[(r, c)] = bits
+                    ascii_cells.append(c)
+            if ascii_cells:
+                masked = list(masked)
+                for c in ascii_cells:
+                    masked[c] = LINE_MASK
+                masked = ''.join(masked)
+            masked_rows.append(masked)
+        return masked_rows
+
+    def find_boxes(self):
+        """Trace rectangles clockwise from each top-left corner"""
+        rows = self.rows
+        boxes = []
+        for r in range(self.height - 1):
+            row = rows[r]
+            for match in TOP_LEFT_RE.finditer(row):
+                c = match.start()
+                if row[c] == '+' and (r, c) not in self.ascii_strokes:
+                    continue
+                if rows[r + 1][c] not in VERTICAL_EDGE:
+                    continue
+                # Walk the top edge; an ASCII '+' may be a junction or the corner
+                position = c + 1
+                while True:
+                    right = TOP_EDGE_RE.match(row, position).end()
+                    if row[right] not in TOP_RIGHT:
+                        break
+                    if right > c + 1:
+                        rights = self.trace_box(r, c, right)
+                        if rights is not None:
+                            boxes.append(Box(r, c, rights))
+                            break
+                    if row[right] != '+':
+                        break
+                    position = right + 1
+        return boxes
+
+    def trace_box(self, top, left, right):
+        """Follow the right edge down and check the bottom and left edges;
+        returns the right edge column of each row, or None"""
+        rows = self.rows
+        rights = [right]
+        for bottom in range(top + 1, self.height):
+            row = rows[bottom]
+            # The left edge says whether this is the bottom row; look for the
+            # matching character on the right
+            if row[left] == '+':
+                wanted = ASCII_RIGHT_EDGE
+            elif row[left] in BOTTOM_LEFT:
+                wanted = BOTTOM_RIGHT
+            elif row[left] in VERTICAL_EDGE:
+                wanted = VERTICAL_EDGE
+            else:
+                return None
+            for drift in EDGE_DRIFT:
+                right = rights[-1] + drift
+                if left + 1 < right <= self.width and row[right] in wanted:
+                    break
+            else:
+                return None
+            rights.append(right)
+            ch = row[right]
+            if ch in BOTTOM_RIGHT and row[left] in BOTTOM_LEFT and bottom > top + 1:
+                if HORIZONTAL_EDGE_RE.match(row, left + 1).end() >= right:
+                    return rights
+                if ch != '+':
+                    return None
+            elif ch not in VERTICAL_EDGE:
+                return None
+        return None
+
+    def nest_boxes(self):
+        """Record box outlines, nesting, dividers and which box owns each cell"""
+        # Paint interiors largest first, so each cell ends up owned by the
+        # innermost box around it
+        self.boxes.sort(key=lambda box: (-(box.bottom - box.top) * (box.right - box.left),
+                                         box.top, box.left))
+        for index, box in enumerate(self.boxes):
+            box.parent = self.owner[box.top][box.left]
+            if box.parent is not None:
+                self.boxes[box.parent].children.append(index)
+            for r in range(box.top + 1, box.bottom):
+                right = box.right_at(r)
+                self.owner[r][box.left + 1:right] = [index] * (right - box.left - 1)
+                self.border[r][box.left] = index
+                self.border[r][right] = index
+            for r in (box.top, box.bottom):
+                right = box.right_at(r)
+                self.border[r][box.left:right + 1] = [index] * (right - box.left + 1)
+
+        for index, box in enumerate(self.boxes):
+            for r in range(box.top + 1, box.bottom):
+                row = self.rows[r]
+                right = box.right_at(r)
+                width = right - box.left - 1
+                if (row[box.left] in DIVIDER_LEFT and row[right] in DIVIDER_RIGHT
+                        and HORIZONTAL_EDGE_RE.match(row, box.left + 1).end() >= right
+                        and self.owner[r][box.left + 1:right].count(index) == width):
+                    box.dividers.append(r)
+                    self.border[r][box.left + 1:right] = [index] * width
+                    self.owner[r][box.left + 1:right] = [None] * width
+
+    def connector_cells(self):
+        """Line and arrow cells that are not part of a box outline"""
+        cells = []
+        for r, masked in enumerate(self.masked):
+            if LINE_MASK not in masked:
+                continue
+            border = self.border[r]
+            start = masked.find(LINE_MASK)
+            while start != -1:
+                if border[start] is None:
+                    cells.append((r, start))
+                start = masked.find(LINE_MASK, start + 1)
+        return cells
+
+    def text_labels(self):
+        """Runs of text on each row, split at two or more spaces"""
+        labels = []
+        for r, masked in enumerate(self.masked):
+            for match in TEXT_RUN_RE.finditer(masked):
+                labels.append((r, match.start(), match.end() - 1, match.group()))
+        return labels
+
+    def reach(self, r, c, dr, dc):
+        """Neighbouring cell; a horizontal line end reaches across a couple of
+        blanks, as in 'A → B'"""
+        if dc and self.rows[r][c + dc] == ' ':
+            for distance in (2, 3):
+                if self.at(r, c + dc * distance) != ' ':
+                    return r, c + dc * distance
+        return r + dr, c + dc
+
+    def section_of(self, box_index, r):
+        """Index of the section of a divided box that contains row r"""
+        return sum(1 for divider in self.boxes[box_index].dividers if divider < r)
+
+    def to_mermaid(self):
+        """Build the Mermaid flowchart"""
+        connectors = self.connector_cells()
+        if not connectors and not self.boxes:
+            return None
+        graph = MermaidGraph()
+
+        # Subgraphs for boxes with boxes inside, one per section when divided
+        for index, box in enumerate(self.boxes):
+            box.key = ('box', index)
+            if box.is_group:
+                graph.add_group(box.key, self.group_parent(box), (box.top, box.left))
+                for section in range(len(box.dividers) + 1):
+                    row = box.dividers[section - 1] if section else box.top
+                    graph.add_group(('section', index, section), box.key, (row, box.left))
+
+        # Text inside other boxes is their label; the rest stays loose
+        loose = []
+        cell_label = {}
+        for label in self.text_labels():
+            r, start, end, text = label
+            owner = self.owner[r][start]
+            if owner is not None and not self.boxes[owner].is_group:
+                self.boxes[owner].lines.append(text)
+                continue
+            for c in range(start, end + 1):
+                cell_label[(r, c)] = len(loose)
+            loose.append(label)
+
+        for box in self.boxes:
+            if not box.is_group:
+                graph.add_node(box.key, box.lines, self.group_parent(box),
+                               (box.top, box.left))
+
+        # Flood fill each run of connector cells and link what it touches
+        stroke = self.stroke
+        border = self.border
+        seen = set()
+        attached = set()
+        for cell in connectors:
+            if cell in seen:
+                continue
+            component = []
+            queue = deque([cell])
+            seen.add(cell)
+            while queue:
+                r, c = queue.popleft()
+                component.append((r, c))
+                bits = stroke(r, c)
+                for step, dr, dc in STEPS:
+                    neighbour = (r + dr, c + dc)
+                    if neighbour in seen or border[r + dr][c + dc] is not None:
+                        continue
+                    other = stroke(r + dr, c + dc)
+                    if other and (bits & step or other & OPPOSITE[step]):
+                        seen.add(neighbour)
+                        queue.append(neighbour)
+
+            ends = []
+            for r, c in component:
+                bits = stroke(r, c)
+                head = self.head(r, c)
+                for step, dr, dc in STEPS:
+                    nr, nc = self.reach(r, c, dr, dc)
+                    if (nr, nc) in cell_label:
+                        if not bits & step:
+                            continue
+                        index = cell_label[(nr, nc)]
+                        key = self.loose_node(graph, loose[index])
+                        attached.add(index)
+                    elif 0 <= nr <= self.height and border[nr][nc] is not None:
+                        if not (bits & step or stroke(nr, nc) & OPPOSITE[step]):
+                            continue
+                        key = self.box_endpoint((nr, nc), step, self.owner[r][c])
+                        if key is None:
+                            continue
+                    else:
+                        continue
+                    ends.append((key, step, head == step))
+            graph.link(ends)
+
+        # Outlines joined directly, junction to junction (a box's ┬ on a ┴,
+        # allowing for a column of drift)
+        for index, box in enumerate(self.boxes):
+            for r in [box.bottom] + box.dividers:
+                row = self.rows[r]
+                for match in DOWN_JUNCTION_RE.finditer(row, box.left + 1, box.right_at(r)):
+                    c = match.start()
+                    if stroke(r, c) & D:
+                        self.join_outlines(graph, index, (r, c), D,
+                                           ((r + 1, c), (r + 1, c - 1), (r + 1, c + 1)))
+            for r in range(box.top + 1, box.bottom):
+                c = box.right_at(r)
+                if stroke(r, c) & R:
+                    self.join_outlines(graph, index, (r, c), R, ((r, c + 1),))
+
+        # Loose text nobody points at titles its subgraph, or stands alone
+        for index, label in enumerate(loose):
+            if index in attached:
+                continue
+            group = self.label_group(label)
+            if group is None:
+                self.loose_node(graph, label)
+            else:
+                graph.add_title(group, label[3])
+
+        return graph.render()
+
+    def join_outlines(self, graph, index, cell, step, candidates):
+        """Link box index to the first outline junction among candidates"""
+        for nr, nc in candidates:
+            other_index = self.border[nr][nc]
+            if (other_index is not None and other_index != index
+                    and self.stroke(nr, nc) & OPPOSITE[step]):
+                break
+        else:
+            return
+        r, c = cell
+        source = self.box_endpoint(cell, OPPOSITE[step], self.owner[nr][nc])
+        target = self.box_endpoint((nr, nc), step, self.owner[r][c])
+        if source is not None and target is not None:
+            graph.link([(source, OPPOSITE[step], False), (target, step, False)])
+
+    def group_parent(self, box):
+        """Subgraph key that a box belongs to"""
+        if box.parent is None:
+            return None
+        return ('section', box.parent, self.section_of(box.parent, box.top))
+
+    def label_group(self, label):
+        """Subgraph key for a run of loose text, if it is inside a box"""
+        r, start, _, _ = label
+        owner = self.owner[r][start]
+        if owner is None:
+            return None
+        return ('section', owner, self.section_of(owner, r))
+
+    def loose_node(self, graph, label):
+        """Node for a run of loose text; equal text in one subgraph is one node"""
+        r, start, _, text = label
+        group = self.label_group(label)
+        key = ('text', group, text)
+        graph.add_node(key, [text], group, (r, start))
+        return key
+
+    def box_endpoint(self, cell, step, inside):
+        """What a connector reaching an outline cell from direction step links to"""
+        r, c = cell
+        index = self.border[r][c]
+        box = self.boxes[index]
+        if r in box.dividers and box.left < c < box.right_at(r):
+            # A divider stands for the section on its far side
+            return ('section', index, self.section_of(index, r) + (1 if step == D else 0))
+        # Lines drawn inside a box do not link to the box itself
+        while inside is not None:
+            if inside == index:
+                return None
+            inside = self.boxes[inside].parent
+        return box.key
+
+class MermaidGraph:
+    def __init__(self):
+        self.nodes = {}
+        self.groups = {}
+        self.titles = {}
+        self.edges = {}
+
+    def add_group(self, key, parent, position):
+        self.groups.setdefault(key, {'parent': parent, 'position': position})
+        self.titles.setdefault(key, [])
+
+    def add_title(self, key, text):
+        self.titles[key].append(text)
+
+    def add_node(self, key, label, parent, position):
+        self.nodes.setdefault(key, {'label': label, 'parent': parent, 'position': position})
+
+    def link(self, ends):
+        """Turn one connector's endpoints into edges"""
+        if any(is_head for _, _, is_head in ends):
+            sources = [key for key, _, is_head in ends if not is_head]
+            targets = [(key, step) for key, step, is_head in ends if is_head]
+        else:
+            # Undirected: read top-to-bottom, left-to-right
+            sources = [key for key, step, _ in ends if step in (U, L)]
+            targets = [(key, step) for key, step, _ in ends if step in (D, R)]
+        for source in dict.fromkeys(sources):
+            for target, step in dict.fromkeys(targets):
+                if source != target and not self.related(source, target):
+                    self.edges.setdefault((source, target), step in (L, R))
+
+    def parent_of(self, key):
+        entry = self.nodes.get(key) or self.groups.get(key)
+        return entry['parent'] if entry else None
+
+    def related(self, a, b):
+        """True when one key is a subgraph enclosing the other"""
+        for inner, outer in ((a, b), (b, a)):
+            parent = self.parent_of(inner)
+            while parent is not None:
+                if parent == outer:
+                    return True
+                parent = self.parent_of(parent)
+        return False
+
+    def render(self):
+        # Sections without content fold their text into the enclosing title
+        members = {}
+        for key, entry in list(self.nodes.items()) + list(self.groups.items()):
+            members.setdefault(entry['parent'], []).append(key)
+        for key in sorted(self.groups, key=lambda k: self.groups[k]['position'], reverse=True):
+            if key[0] == 'section' and not members.get(key):
+                parent = self.groups[key]['parent']
+                self.titles[parent] = self.titles[key] + self.titles[parent]
+                members[parent].remove(key)
+                del self.groups[key]
+        # A box split into one section is just the box
+        for key in list(self.groups):
+            if key[0] == 'box':
+                sections = [k for k in members.get(key, []) if k in self.groups]
+                if len(sections) == 1 and len(members[key]) == 1:
+                    section = sections[0]
+                    self.titles[key] = self.titles[key] + self.titles[section]
+                    for child in members.get(section, []):
+                        (self.nodes.get(child) or self.groups[child])['parent'] = key
+                    members[key] = members.pop(section, [])
+                    del self.groups[section]
+
+        if not self.nodes:
+            return None
+        edges = {}
+        for (source, target), horizontal in sorted(self.edges.items(), key=self.edge_order):
+            source, target = self.resolve(source), self.resolve(target)
+            if source != target and not self.related(source, target):
+                edges.setdefault((source, target), horizontal)
+        if not edges and len(self.nodes) < 2:
+            return None
+
+        ids = {}
+        groups = sorted(self.groups, key=lambda k: self.groups[k]['position'])
+        nodes = sorted(self.nodes, key=lambda k: self.nodes[k]['position'])
+        ids.update((key, f"S{n}") for n, key in enumerate(groups))
+        ids.update((key, f"N{n}") for n, key in enumerate(nodes))
+
+        horizontal = sum(1 for value in edges.values() if value)
+        direction = 'LR' if horizontal > len(edges) - horizontal else 'TB'
+        lines = [f"graph {direction}"]
+        self.render_members(None, members, ids, lines, 1)
+        if edges:
+            lines.append('')
+        for source, target in edges:
+            lines.append(f"    {ids[source]} --> {ids[target]}")
+
+        levels = self.levels(edges)
+        lines.append('')
+        for key in nodes:
+            fill = PALETTE[levels.get(key, 0) % len(PALETTE)]
+            text = '#333' if fill in DARK_TEXT else '#fff'
+            lines.append(f"    style {ids[key]} fill:{fill},stroke:#333,stroke-width:2px,color:{text}")
+        return '\n'.join(lines)
+
+    def edge_order(self, item):
+        (source, target), _ = item
+        return self.position(source), self.position(target)
+
+    def position(self, key):
+        return (self.nodes.get(key) or self.groups.get(key) or {'position': (0, 0)})['position']
+
+    def resolve(self, key):
+        """Edges to folded sections go to the subgraph that absorbed them"""
+        while key not in self.nodes and key not in self.groups:
+            key = ('box', key[1])
+        return key
+
+    def render_members(self, parent, members, ids, lines, depth):
+        indent = '    ' * depth
+        children = [key for key in members.get(parent, []) if key in self.nodes or key in self.groups]
+        children.sort(key=lambda k: (self.nodes.get(k) or self.groups[k])['position'])
+        for key in children:
+            if key in self.groups:
+                title = ' '.join(self.titles[key])
+                lines.append(f"{indent}subgraph {ids[key]}[{mermaid_label([title])}]")
+                self.render_members(key, members, ids, lines, depth + 1)
+                lines.append(f"{indent}end")
+            else:
+                lines.append(f"{indent}{ids[key]}[{mermaid_label(self.nodes[key]['label'])}]")
+
+    def levels(self, edges):
+        """Longest distance from a root for each node, for colouring
+
+        Nodes on a cycle share one level: the distances are taken over the
+        graph of strongly connected components, in Kahn's topological order,
+        so the pass is linear in nodes and edges.
+        """
+        successors = {key: [] for key in self.nodes}
+        for source, target in edges:
+            successors.setdefault(source, []).append(target)
+            successors.setdefault(target, [])
+        component = strong_components(successors)
+
+        count = max(component.values(), default=-1) + 1
+        targets = [set() for _ in range(count)]
+        for source, following in successors.items():
+            for target in following:
+                if component[source] != component[target]:
+                    targets[component[source]].add(component[target])
+        incoming = [0] * count
+        for following in targets:
+            for target in following:
+                incoming[target] += 1
+        level = [0] * count
+        queue = deque(number for number in range(count) if not incoming[number])
+        while queue:
+            number = queue.popleft()
+            for target in targets[number]:
+                level[target] = max(level[target], level[number] + 1)
+                incoming[target] -= 1
+                if not incoming[target]:
+                    queue.append(target)
+        return {key: level[component[key]] for key in self.nodes}
+
+def strong_components(successors):
+    """{vertex: component number} by Tarjan's algorithm, without recursion"""
+    index = {}
+    low = {}
+    stack = []
+    on_stack = set()
+    component = {}
+    count = 0
+    for root in successors:
+        if root in index:
+            continue
+        index[root] = low[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(successors[root]))]
+        while work:
+            vertex, following = work[-1]
+            for target in following:
+                if target not in index:
+                    index[target] = low[target] = len(index)
+                    stack.append(target)
+                    on_stack.add(target)
+                    work.append((target, iter(successors[target])))
+                    break
+                if target in on_stack:
+                    low[vertex] = min(low[vertex], index[target])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[vertex])
+                if low[vertex] == index[vertex]:
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component[member] = count
+                        if member == vertex:
+                            break
+                    count += 1
+    return component
@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the visual Subsystems report generator
+"""
+
+import argparse
+import html
+import json
+import os
+import pickle
+import random
+import re
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+import markdown2
+
+from call_graph import CALL_GRAPH_FILE, CallGraph, load_call_graph
+from create_subsystems_report_visual import SubsystemsReportGenerator
+from data_dictionary import COPYBOOK_DIR, copybook_paths
+from cobol_scanner.layout import load_layouts
+from inline_arrows import InlineArrowRewriter, convert_inline_arrows
+from program_xref import ANALYSIS_FILE, ProgramIndex, load_index, parse_index
+
+# The previous ASCII art pass: one regex over the markdown, whose nested
+# quantifiers backtrack exponentially when a block fails to match
+ASCII_BLOCK_RE = re.compile(r'```\n((?:[^\n]*[┌┐└┘├┤┬┴┼─│→←↑↓].*\n?)+)```', re.MULTILINE)
+
+# The previous inline arrow pass: one re.sub per gap between tags, including
+# the text of <pre>, <code> and Mermaid divs
+ARROW_PATTERN = r'(\w+(?:_\w+)?)\s*→\s*(\w+(?:_\w+)?)'
+
+def regex_inline_arrows(html_content):
+    """The previous convert_inline_arrows"""
+    def replace_arrow(match):
+        return f'<span class="inline-flow">{match.group(1)} ➔ {match.group(2)}</span>'
+
+    parts = []
+    last_end = 0
+    for tag_match in re.finditer(r'<[^>]+>', html_content):
+        start, end = tag_match.span()
+        parts.append(re.sub(ARROW_PATTERN, replace_arrow, html_content[last_end:start]))
+        parts.append(html_content[start:end])
+        last_end = end
+    parts.append(re.sub(ARROW_PATTERN, replace_arrow, html_content[last_end:]))
+    return ''.join(parts)
+
+def best_of(func, repeat):
+    """Return the best wall-clock time of `repeat` calls to func"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def two_pass_ascii(generator, content):
+    """The previous pipeline: regex pass before markdown2, <pre><code> pass after"""
+    def convert(match, code):
+        if generator.is_ascii_diagram(code):
+            mermaid_content = generator.convert_ascii_to_mermaid(code)
+            if mermaid_content is not None:
+                return f'<div class="mermaid">{html.escape(mermaid_content)}</div>'
+        return match.group(0)
+
+    content = re.sub(r'```mermaid\n(.*?)\n```', lambda m: f'<div class="mermaid">{html.escape(m.group(1))}</div>',
+                     content, flags=re.DOTALL)
+    content = ASCII_BLOCK_RE.sub(lambda m: convert(m, m.group(1)), content)
+    html_content = markdown2.markdown(content, extras=generator.MARKDOWN_EXTRAS)
+    return re.sub(r'<pre><code>(.*?)</code></pre>', lambda m: convert(m, html.unescape(m.group(1))),
+                  html_content, flags=re.DOTALL)
+
+def one_pass_ascii(generator, content):
+    """The current pipeline up to markdown2"""
+    content, _ = generator.process_code_fences(content)
+    return markdown2.markdown(content, extras=generator.MARKDOWN_EXTRAS)
+
+def count_calls(generator, func):
+    """Run func, returning how many times it called is_ascii_diagram"""
+    calls = 0
+    classify = generator.is_ascii_diagram
+
+    def counting(content):
+        nonlocal calls
+        calls += 1
+        return classify(content)
+
+    generator.is_ascii_diagram = counting
+    try:
+        func()
+    finally:
+        del generator.is_ascii_diagram
+    return calls
+
+def bench_fences(args):
+    """Classifier calls and time over the real subsystem documents"""
+    generator = SubsystemsReportGenerator()
+    documents = [content for kind, _, content in generator.load_documents() if kind != 'diagram']
+    untyped = 0
+    for content in documents:
+        in_block = False
+        for line in content.split('\n'):
+            if line.lstrip().startswith('```'):
+                untyped += not in_block and line.strip() == '```'
+                in_block = not in_block
+    print(f"{len(documents)} documents, {untyped} fenced blocks without a language")
+
+    old_calls = sum(count_calls(generator, lambda: two_pass_ascii(generator, c)) for c in documents)
+    new_calls = sum(count_calls(generator, lambda: generator.process_code_fences(c)) for c in documents)
+    print(f"  is_ascii_diagram calls: two passes {old_calls}, one fence pass {new_calls}")
+
+    two_pass = best_of(lambda: [two_pass_ascii(generator, c) for c in documents], args.repeat)
+    one_pass = best_of(lambda: [one_pass_ascii(generator, c) for c in documents], args.repeat)
+    print(f"  two passes + markdown2   : {two_pass * 1000:8.1f} ms")
+    print(f"  one fence pass + markdown2: {one_pass * 1000:8.1f} ms")
+
+def pathological_block(width):
+    """A box diagram with a plain-text caption line: the old regex cannot
+    match it and backtracks through every split of the box-drawing lines"""
+    return (f"```\n┌{'─' * width}┐\n│{'SL_MGMT'.center(width)}│\n└{'─' * width}┘\n"
+            f"Caption: posting files feed GL_CORE\n```\n")
+
+def bench_pathological(args):
+    """Worst-case input for the old ASCII art regex"""
+    generator = SubsystemsReportGenerator()
+    for width in range(1, args.max_width + 1):
+        content = pathological_block(width)
+        old = best_of(lambda: ASCII_BLOCK_RE.sub(lambda m: m.group(0), content), 1)
+        new = best_of(lambda: generator.process_code_fences(content), args.repeat)
+        print(f"  {width:4d}-character box: old regex {old * 1000:10.1f} ms, "
+              f"fence pass {new * 1000:8.3f} ms")
+
+    # The fence pass stays linear far past where the regex would never finish
+    content = pathological_block(1000)
+    new = best_of(lambda: generator.process_code_fences(content), args.repeat)
+    print(f"  1000-character box: fence pass {new * 1000:8.3f} ms")
+
+def full_report_without_arrows():
+    """The complete report HTML as it stands before the inline arrow pass"""
+    generator = SubsystemsReportGenerator()
+    generator.convert_inline_arrows = lambda html_content: html_content
+    documents = generator.load_documents()
+    converted = [None if kind == 'diagram' else generator.process_markdown_content(content)
+                 for kind, name, content in documents]
+    return generator.assemble_html(documents, converted)
+
+# Markup the arrow pass must copy byte for byte: CDATA, bare and terminated
+# references, comments, processing instructions, declarations, odd end tags
+ROUND_TRIP_SAMPLE = (
+    '<!DOCTYPE html>\n<P>Tom &amp Jerry &nbsp x &#169 &#x41; &lt; & y</P >'
+    '<![CDATA[ z ]]><!-- c -- --><?php echo 1 ?><!weird decl><![if IE]>'
+    '<DIV class="mermaid">a --> b</Div\n><script>if (a</b) x()</SCRIPT><br/><img src=x>'
+)
+
+def round_trips(document, chunk_size=None):
+    """True if the arrow rewriter gives back an arrow-free document unchanged"""
+    rewriter = InlineArrowRewriter()
+    step = chunk_size or len(document) or 1
+    for start in range(0, len(document), step):
+        rewriter.feed(document[start:start + step])
+    rewriter.close()
+    return ''.join(rewriter.pieces) == document
+
+def bench_arrows(args):
+    """Inline arrow rewriting over the full subsystem report"""
+    report = full_report_without_arrows()
+    old_output = regex_inline_arrows(report)
+    new_output = convert_inline_arrows(report)
+    print(f"{len(report.encode('utf-8')) / 1024:.0f} KB report, "
+          f"{len(re.findall(r'<[^>]+>', report))} tags (one re.sub each in the regex pass)")
+    print(f"  flows rewritten: regex pass {old_output.count('inline-flow')}, "
+          f"streaming pass {new_output.count('inline-flow')} (skips <pre>, <code> and Mermaid)")
+
+    arrow_free = report.replace('→', '->')
+    checks = [round_trips(ROUND_TRIP_SAMPLE), round_trips(ROUND_TRIP_SAMPLE, 1), round_trips(arrow_free)]
+    print(f"  arrow-free markup copied byte for byte: sample {'yes' if all(checks[:2]) else 'NO'} "
+          f"(whole and one character at a time), full report {'yes' if checks[2] else 'NO'}")
+
+    old = best_of(lambda: regex_inline_arrows(report), args.repeat)
+    new = best_of(lambda: convert_inline_arrows(report), args.repeat)
+    print(f"  whole report   - regex per tag gap: {old * 1000:8.1f} ms, "
+          f"html.parser streaming: {new * 1000:8.1f} ms")
+
+    # The generator runs the pass per document, where documents without
+    # arrows (or long tails after the last one) are not parsed at all
+    generator = SubsystemsReportGenerator()
+    generator.convert_inline_arrows = lambda html_content: html_content
+    documents = [generator.process_markdown_content(content)[0]
+                 for kind, _, content in generator.load_documents() if kind != 'diagram']
+    old = best_of(lambda: [regex_inline_arrows(d) for d in documents], args.repeat)
+    new = best_of(lambda: [convert_inline_arrows(d) for d in documents], args.repeat)
+    print(f"  per document   - regex per tag gap: {old * 1000:8.1f} ms, "
+          f"html.parser streaming: {new * 1000:8.1f} ms")
+
+def scaled_analysis(path, scale):
+    """Write the analysis with its programs repeated `scale` times under new names"""
+    with open(ANALYSIS_FILE, 'r', encoding='utf-8') as f:
+        analysis = json.load(f)
+    programs = analysis['programs']
+    analysis['programs'] = [dict(program, name=f"{n}{program['name']}",
+                                 calls=[f"{n}{call}" for call in program.get('calls', ())])
+                            for n in range(scale) for program in programs]
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(analysis, f, indent=2)
+
+def json_load_index(path):
+    """The alternative to streaming: decode the whole file, then index it"""
+    index = ProgramIndex()
+    with open(path, 'r', encoding='utf-8') as f:
+        for program in json.load(f)['programs']:
+            index.add_program(program)
+    return index
+
+def peak_memory(func):
+    """Peak bytes Python allocates during func()"""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def bench_xref(args):
+    """Program cross-reference indexes: json.load vs streaming parse vs pickle cache"""
+    if not os.path.exists(ANALYSIS_FILE):
+        print(f"  skipped: {ANALYSIS_FILE} not found")
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale in (1, args.xref_scale):
+            analysis = os.path.join(tmp, f'analysis{scale}.json')
+            cache = os.path.join(tmp, f'xref{scale}.pickle')
+            scaled_analysis(analysis, scale)
+            load_index(analysis, cache)
+            programs = len(parse_index(analysis).names)
+            print(f"{programs} programs, {os.path.getsize(analysis) / 1024:.0f} KB of JSON, "
+                  f"{os.path.getsize(cache) / 1024:.0f} KB pickled")
+
+            def cached():
+                with open(cache, 'rb') as f:
+                    pickle.load(f)
+
+            for label, func in (('json.load + index', lambda: json_load_index(analysis)),
+                                ('streaming parse', lambda: parse_index(analysis)),
+                                ('pickle cache', cached)):
+                elapsed = best_of(func, args.repeat)
+                print(f"  {label:<18}: {elapsed * 1000:8.1f} ms, peak {peak_memory(func) / 1024:8.0f} KB")
+
+def scaled_call_graph(graph, nodes, seed=0):
+    """Edges of copies of graph totalling about `nodes` programs, with one
+    call in fifty redirected into another copy so the copies interlink"""
+    rng = random.Random(seed)
+    size = len(graph.names)
+    copies = max(1, nodes // size)
+    edges = set()
+    for copy in range(copies):
+        for caller in range(size):
+            for callee in graph.callees(caller):
+                if rng.random() < 0.02:
+                    target_copy = rng.randrange(copies)
+                else:
+                    target_copy = copy
+                edges.add((copy * size + caller, target_copy * size + callee))
+    return copies * size, sorted(edges)
+
+def query_times(func, args_list):
+    """Wall-clock milliseconds of func(*args) for each args"""
+    times = []
+    for args in args_list:
+        start = time.perf_counter()
+        func(*args)
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+def bench_graph(args):
+    """Call-graph engine: CSR build, SCCs, impact, layers and paths at ACAS size and scaled"""
+    if not os.path.exists(CALL_GRAPH_FILE):
+        print(f"  skipped: {CALL_GRAPH_FILE} not found")
+        return
+    acas = load_call_graph(CALL_GRAPH_FILE)
+    rng = random.Random(1)
+    for count, edges in ((len(acas.names), [(caller, callee) for caller in range(len(acas.names))
+                                            for callee in acas.callees(caller)]),
+                         scaled_call_graph(acas, args.graph_nodes)):
+        names = [str(node) for node in range(count)]
+        build = best_of(lambda: CallGraph(names, edges), args.repeat)
+        graph = CallGraph(names, edges, entry_points=range(0, count, len(acas.names)))
+        start = time.perf_counter()
+        graph.components()
+        components = time.perf_counter() - start
+        print(f"{count:,} programs, {len(edges):,} calls: CSR build {build * 1000:.1f} ms, "
+              f"SCCs {components * 1000:.1f} ms (once), {len(graph.cycles())} cycles")
+
+        sample = [rng.randrange(count) for _ in range(args.graph_queries)]
+        subsystem = sorted(rng.sample(range(count), min(count, 100)))
+        for label, func, args_list in (
+                ('impact (reverse reachability)', graph.impact, [([node],) for node in sample]),
+                ('callee closure', graph.reachable, [([node],) for node in sample]),
+                ('shortest path from menus', graph.shortest_path,
+                 [(graph.entry_points[:6], node) for node in sample]),
+                ('layers of 100 programs', graph.layers, [(subsystem,)] * 20)):
+            times = sorted(query_times(func, args_list))
+            print(f"  {label:<30}: median {statistics.median(times):7.3f} ms, "
+                  f"p99 {times[int(len(times) * 0.99)]:7.3f} ms, max {times[-1]:7.3f} ms")
+
+def slice_decoder(layout):
+    """The alternative to one struct: slice and convert each field occurrence on its own"""
+    converter = layout.decoder().converter
+    plan = [(field.name, field.occurrences, field.length, converter(field),
+             field.category == 'binary' and field.numeric, field.signed, bool(field.dims))
+            for field in layout.elementary()]
+
+    def decode(buffer, offset=0):
+        record = {}
+        for name, starts, length, convert, binary, signed, repeated in plan:
+            values = []
+            for start in starts:
+                data = buffer[offset + start:offset + start + length]
+                if binary:
+                    data = int.from_bytes(data, 'big', signed=signed)
+                values.append(convert(data) if convert else data)
+            record[name] = values if repeated else values[0]
+        return record
+    return decode
+
+def bench_layouts(args):
+    """Copybook layouts: compiling vs the pickle cache, struct decoder vs slicing per field"""
+    paths = copybook_paths()
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = os.path.join(tmp, 'layouts.pickle')
+        layouts, compiled = load_layouts(paths, cache)
+        fields = sum(len(layout.fields) for records in layouts.values() for layout in records)
+        print(f"{len(layouts)} copybooks, {fields} fields")
+        cold = best_of(lambda: load_layouts(paths), args.repeat)
+        warm = best_of(lambda: load_layouts(paths, cache), args.repeat)
+        print(f"  compile all      : {cold * 1000:8.1f} ms")
+        print(f"  from pickle cache: {warm * 1000:8.1f} ms")
+
+    layout = layouts[os.path.join(COPYBOOK_DIR, 'wsstock.cob')][0]
+    rng = random.Random(2)
+    buffer = bytes(rng.randrange(48, 58) for _ in range(layout.size * args.records))
+    decoder = layout.decoder()
+    sliced = slice_decoder(layout)
+    offsets = range(0, len(buffer), layout.size)
+    for label, func in (('struct decoder', lambda: [decoder.decode(buffer, offset) for offset in offsets]),
+                        ('slice per field', lambda: [sliced(buffer, offset) for offset in offsets])):
+        elapsed = best_of(func, args.repeat)
+        print(f"  {layout.name} x {args.records:,}, {label:<15}: {elapsed * 1000:8.1f} ms "
+              f"({args.records / elapsed:,.0f} records/s)")
+
+BENCHMARKS = {
+    'fences': bench_fences,
+    'arrows': bench_arrows,
+    'pathological': bench_pathological,
+    'xref': bench_xref,
+    'graph': bench_graph,
+    'layouts': bench_layouts,
+}
+
+def main():
+    """Run the selected benchmarks"""
+    parser = argparse.ArgumentParser(description='Benchmark create_subsystems_report_visual.py')
+    parser.add_argument('names', nargs='*', metavar='name',
+                        help=f"benchmarks to run: {', '.join(BENCHMARKS)} (default: all)")
+    parser.add_argument('--max-width', type=int, default=5,
+                        help='widest box timed with the old regex; each extra column '
+                             'costs it about 8x (default: 5)')
+    parser.add_argument('--xref-scale', type=int, default=20,
+                        help='copies of the analysed programs for the larger xref run (default: 20)')
+    parser.add_argument('--graph-nodes', type=int, default=100000,
+                        help='programs in the scaled call graph (default: 100000)')
+    parser.add_argument('--graph-queries', type=int, default=500,
+                        help='random programs queried in the graph benchmark (default: 500)')
+    parser.add_argument('--records', type=int, default=20000,
+                        help='records decoded by the layouts benchmark (default: %(default)s)')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='timing repetitions, best is reported (default: 3)')
+    args = parser.parse_args()
+    for name in args.names:
+        if name not in BENCHMARKS:
+            parser.error(f"unknown benchmark: {name}")
+
+    for name in args.names or BENCHMARKS:
+        print(f"== {name}: {BENCHMARKS[name].__doc__}")
+        BENCHMARKS[name](args)
+        print()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Call-graph analytics over the COBOL parser's system-call-graph.json.
+
+CallGraph numbers the programs and keeps the calls as CSR (compressed sparse
+row) arrays in both directions: the callees of program i are
+targets[offsets[i]:offsets[i + 1]], its callers likewise in the reverse
+arrays. Transitive impact, strongly connected components, call layers and
+shortest call paths walk those arrays directly, so a query costs time in
+proportion to the part of the graph it touches, not the size of the graph.
+
+ChangeImpact renders the "Change Impact" section of each subsystem in the
+subsystem reports.
+"""
+
+import html
+import os
+from array import array
+from fnmatch import fnmatchcase
+
+from program_xref import iter_array_items, program_name
+
+CALL_GRAPH_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                               '0_COBOL PARSER', 'analysis-results', 'system-call-graph.json')
+
+# Programs listed in the per-program table of a Change Impact section
+IMPACT_ROWS = 12
+
+def build_csr(count, edges, tail, head):
+    """(offsets, targets) arrays for edges running from pair[tail] to pair[head]"""
+    offsets = array('i', bytes(4 * (count + 1)))
+    for edge in edges:
+        offsets[edge[tail] + 1] += 1
+    for node in range(count):
+        offsets[node + 1] += offsets[node]
+    fill = offsets[:-1]
+    targets = array('i', bytes(4 * len(edges)))
+    for edge in edges:
+        node = edge[tail]
+        targets[fill[node]] = edge[head]
+        fill[node] += 1
+    return offsets, targets
+
+def strongly_connected(count, offsets, targets):
+    """Tarjan's algorithm without recursion
+
+    Returns (component number per node, members of each component).
+    Components come out callees first: when a program in component a calls
+    one in component b != a, then b < a.
+    """
+    index = array('i', [-1]) * count
+    low = array('i', [0]) * count
+    on_stack = bytearray(count)
+    component = array('i', [-1]) * count
+    members = []
+    stack = []
+    counter = 0
+    for root in range(count):
+        if index[root] != -1:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = 1
+        work = [(root, offsets[root])]
+        while work:
+            node, edge = work[-1]
+            if edge < offsets[node + 1]:
+                work[-1] = (node, edge + 1)
+                child = targets[edge]
+                if index[child] == -1:
+                    index[child] = low[child] = counter
+                    counter += 1
+                    stack.append(child)
+                    on_stack[child] = 1
+                    work.append((child, offsets[child]))
+                elif on_stack[child] and index[child] < low[node]:
+                    low[node] = index[child]
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                if low[node] < low[parent]:
+                    low[parent] = low[node]
+            if low[node] == index[node]:
+                group = []
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = 0
+                    component[member] = len(members)
+                    group.append(member)
+                    if member == node:
+                        break
+                members.append(sorted(group))
+    return component, members
+
+class CallGraph:
+    """Programs numbered 0..n-1 with CSR call adjacency in both directions"""
+
+    def __init__(self, names, edges, groups=None, entry_points=()):
+        """names: program names in id order; edges: (caller id, callee id) pairs;
+        groups: source directory per program; entry_points: ids of the menu programs"""
+        self.names = list(names)
+        self.ids = {name: number for number, name in enumerate(self.names)}
+        self.groups = list(groups) if groups is not None else [''] * len(self.names)
+        self.entry_points = list(entry_points)
+        self.offsets, self.targets = build_csr(len(self.names), edges, 0, 1)
+        self.reverse_offsets, self.sources = build_csr(len(self.names), edges, 1, 0)
+        self._components = None
+
+    def callees(self, node):
+        return self.targets[self.offsets[node]:self.offsets[node + 1]]
+
+    def callers(self, node):
+        return self.sources[self.reverse_offsets[node]:self.reverse_offsets[node + 1]]
+
+    def matching(self, patterns):
+        """Ids of the programs whose names match any of the glob patterns"""
+        return [number for number, name in enumerate(self.names)
+                if any(fnmatchcase(name, pattern) for pattern in patterns)]
+
+    def reachable(self, starts, reverse=False):
+        """Ids reachable from starts (starts first, then breadth-first order);
+        with reverse, the programs that reach them instead"""
+        offsets, targets = ((self.reverse_offsets, self.sources) if reverse
+                            else (self.offsets, self.targets))
+        seen = bytearray(len(self.names))
+        queue = []
+        for node in starts:
+            if not seen[node]:
+                seen[node] = 1
+                queue.append(node)
+        position = 0
+        while position < len(queue):
+            node = queue[position]
+            position += 1
+            for other in targets[offsets[node]:offsets[node + 1]]:
+                if not seen[other]:
+                    seen[other] = 1
+                    queue.append(other)
+        return queue
+
+    def impact(self, nodes):
+        """Every program that calls any of nodes, directly or through other programs"""
+        starts = set(nodes)
+        return [node for node in self.reachable(starts, reverse=True) if node not in starts]
+
+    def shortest_path(self, sources, target):
+        """Fewest-calls path from any of sources to target as a list of ids, or None"""
+        parent = {source: -1 for source in sources}
+        if target in parent:
+            return [target]
+        queue = list(parent)
+        position = 0
+        while position < len(queue):
+            node = queue[position]
+            position += 1
+            for callee in self.targets[self.offsets[node]:self.offsets[node + 1]]:
+                if callee in parent:
+                    continue
+                parent[callee] = node
+                if callee == target:
+                    path = [callee]
+                    while parent[path[-1]] != -1:
+                        path.append(parent[path[-1]])
+                    return path[::-1]
+                queue.append(callee)
+        return None
+
+    def components(self):
+        """(component number per node, members of each component), computed once"""
+        if self._components is None:
+            self._components = strongly_connected(len(self.names), self.offsets, self.targets)
+        return self._components
+
+    def cycles(self):
+        """Components of more than one program, i.e. mutually recursive calls"""
+        return [group for group in self.components()[1] if len(group) > 1]
+
+    def layers(self, nodes):
+        """Topological call layers of the subgraph on nodes
+
+        Layer 0 holds the programs no other program in the set calls; every
+        call inside the set goes to a later layer, except calls within a
+        cycle, whose programs share a layer.
+        """
+        component = self.components()[0]
+        members = set(nodes)
+        by_component = {}
+        for node in sorted(members):
+            by_component.setdefault(component[node], []).append(node)
+        depth = dict.fromkeys(by_component, 0)
+        # Callers have higher component numbers, so this visits them first
+        for number in sorted(by_component, reverse=True):
+            for node in by_component[number]:
+                for callee in self.targets[self.offsets[node]:self.offsets[node + 1]]:
+                    if callee in members and component[callee] != number:
+                        depth[component[callee]] = max(depth[component[callee]], depth[number] + 1)
+        layers = [[] for _ in range(max(depth.values(), default=-1) + 1)]
+        for node in sorted(members):
+            layers[depth[component[node]]].append(node)
+        return layers
+
+def load_call_graph(path=CALL_GRAPH_FILE):
+    """CallGraph of system-call-graph.json, programs named as other programs CALL them
+
+    Nodes are named after their source file (the label), as the subsystem
+    inventory names them, and edges are matched to nodes by PROGRAM-ID (the
+    node id). Copies of a program in several directories become one node;
+    calls to names that are not programs (SYSTEM, data names) are dropped.
+    """
+    groups = {}
+    node_names = {}
+    calls = []
+    main_programs = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for key, item in iter_array_items(f, ('nodes', 'edges', 'mainPrograms')):
+            if key == 'nodes':
+                name = program_name(item.get('label', item['id']))
+                groups.setdefault(name, item.get('subsystem', ''))
+                node_names.setdefault(item['id'], name)
+            elif key == 'edges':
+                calls.append((item['from'], item['to'].lower()))
+            else:
+                main_programs.append(program_name(item))
+    ids = {name: number for number, name in enumerate(groups)}
+    edges = sorted({(ids[node_names[caller]], ids[callee]) for caller, callee in calls
+                    if caller in node_names and callee in ids})
+    return CallGraph(groups, edges, groups.values(),
+                     [ids[name] for name in main_programs if name in ids])
+
+class ChangeImpact:
+    """Renders per-subsystem change impact sections from a CallGraph"""
+
+    def __init__(self, graph, patterns):
+        self.graph = graph
+        self.members = {code: graph.matching(found) for code, found in patterns.items()}
+        self.owners = {}
+        for code, nodes in self.members.items():
+            for node in nodes:
+                self.owners.setdefault(node, []).append(code)
+
+    def affected(self, nodes, code):
+        """'SL_MGMT (4), ...' for the subsystems other than code owning nodes"""
+        counts = {}
+        for node in nodes:
+            for owner in self.owners.get(node, ('unassigned',)):
+                if owner != code:
+                    counts[owner] = counts.get(owner, 0) + 1
+        ranked = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+        return ', '.join(f'{owner} ({count})' for owner, count in ranked) or '—'
+
+    def program_list(self, nodes):
+        names = sorted(self.graph.names[node] for node in nodes)
+        return ', '.join(f'<code>{html.escape(name)}</code>' for name in names)
+
+    def section_html(self, code):
+        """Change impact section for one subsystem ('' if it has no programs in the graph)"""
+        members = self.members.get(code)
+        if not members:
+            return ''
+        graph = self.graph
+        inside = set(members)
+        outside_impact = [node for node in graph.impact(members) if node not in inside]
+        cycles = [group for group in graph.cycles() if inside.intersection(group)]
+
+        layer_items = '\n'.join(f'<li>{self.program_list(layer)}</li>' for layer in graph.layers(members))
+        cycle_text = ''
+        if cycles:
+            cycle_text = ('<p>Mutually recursive programs (changed together): '
+                          + '; '.join(' ↔ '.join(f'<code>{html.escape(graph.names[node])}</code>'
+                                                 for node in group) for group in cycles)
+                          + '.</p>')
+
+        # Menus dispatch most programs through a data name (CALL WS-CALLED),
+        # which the graph cannot follow: only programs with static callers
+        # are ranked
+        impacts = {node: graph.impact([node]) for node in members}
+        ranked = sorted((node for node in members if impacts[node]),
+                        key=lambda node: (-len(impacts[node]), graph.names[node]))
+        rows = []
+        for node in ranked[:IMPACT_ROWS]:
+            path = graph.shortest_path(graph.entry_points, node)
+            path_text = (' → '.join(html.escape(graph.names[step]) for step in path) if path
+                         else '<span class="xref-unresolved">no static call path</span>')
+            rows.append(f'<tr><td><code>{html.escape(graph.names[node])}</code></td>'
+                        f'<td>{len(graph.callers(node))}</td><td>{len(impacts[node])}</td>'
+                        f'<td>{self.affected(impacts[node], code)}</td>'
+                        f'<td>{path_text}</td></tr>')
+
+        anchor = 'change-impact-' + code.lower().replace('_', '-')
+        return f'''
+<div class="impact-section">
+<h2 id="{anchor}">Change Impact</h2>
+<p>A change to {code} can reach {len(outside_impact)} programs in other subsystems through
+chains of CALLs: {self.affected(outside_impact, code)}.</p>
+{cycle_text}
+<p>Call layers within {code}: programs in the first layer are not called by other {code}
+programs, and every call inside the subsystem goes to a later layer.</p>
+<ol class="impact-layers">
+{layer_items}
+</ol>
+<p>{len(ranked)} of its {len(members)} programs have static callers; the most widely called:</p>
+<table class="xref-table">
+<thead><tr><th>Program</th><th>Direct callers</th><th>Transitive callers</th><th>Affected subsystems</th><th>Shortest path from a menu</th></tr></thead>
+<tbody>
+{chr(10).join(rows)}
+</tbody>
+</table>
+</div>
+'''
@@ -5,17 +5,119 @@ Combines all markdown files into a single, navigable HTML document with proper
 rendering of Mermaid diagrams and ASCII art.
 """
 
+import argparse
+import hashlib
+import json
 import os
 import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import markdown2
 from datetime import datetime
 import html
+from call_graph import CALL_GRAPH_FILE, ChangeImpact, load_call_graph
+from program_xref import (ANALYSIS_FILE, INVENTORY_DOC, LINE_COUNT_CACHE_FILE, XREF_CACHE_FILE, ProgramXref,
+                          inventory_patterns, load_index)
+from render_cache import DEFAULT_MAX_BYTES, RenderCache
+
+# Build helpers shared with the other generators live at the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from mermaid_svg import SVG_CACHE_DIR, make_prerenderer, prerender_enabled
+from search_index import SEARCH_BOX, SEARCH_CSS, SearchIndexBuilder, search_script
+from cobol_scanner import load_line_counts
+from cobol_scanner.layout import load_layouts
+from data_dictionary import LAYOUT_CACHE_FILE, DataDictionary, copybook_paths
+
+RENDER_CACHE_FILE = ".render_cache.sqlite"
+
+# Any edit to this script invalidates its cached renders
+GENERATOR_DIGEST = hashlib.sha256(Path(__file__).read_bytes()).hexdigest()
+
+SUBSYSTEM_NAMES = ['SYS_ADMIN', 'GL_CORE', 'IRS_CORE', 'SL_MGMT', 'PL_MGMT',
+                   'ST_CTRL', 'BATCH_FW', 'RPT_ENGINE', 'DAL', 'PERIOD_PROC',
+                   'COMMON_UTIL', 'INTEG_SVC']
+
+# Character classes for the ASCII art classifier. Light box drawing also
+# covers the tree characters [│├└─].
+BOX_CHARS = frozenset('┌┐└┘├┤┬┴┼─│╭╮╰╯═║╔╗╚╝╠╣╦╩╬━┃┏┓┗┛┣┫┳┻╋')
+ARROW_CHARS = frozenset('→←↑↓⟶⟵⟷↔▶◀▲▼')
+ARROW_TIPS = frozenset('<>')
+ARROW_SHAFTS = frozenset('-=')
+ARROW_RE = re.compile(r'[-=]>|<[-=]')
+# A +--+ border always contains a run of 3+ of [+-|] as well
+TABLE_BORDER_RE = re.compile(r'\+[-+]+\+')
+
+def classify_ascii_art(content):
+    """Determine if a code block contains ASCII art, and which kind"""
+    # One pass collects the distinct characters; the pattern searches below
+    # only run when the characters they need are present
+    chars = frozenset(content)
+    if not BOX_CHARS.isdisjoint(chars):
+        return True, 'ascii-art-box'
+    if not ARROW_CHARS.isdisjoint(chars):
+        return True, 'ascii-art-arrows'
+    if (not ARROW_TIPS.isdisjoint(chars) and not ARROW_SHAFTS.isdisjoint(chars)
+            and ARROW_RE.search(content)):
+        return True, 'ascii-art-arrows'
+    if '+' in chars and TABLE_BORDER_RE.search(content):
+        return True, 'ascii-art-table'
+    
+    # Diagrams by structure: both rules need a keyword hit, so plain code
+    # blocks skip the line statistics
+    subsystem_hits = sum(1 for name in SUBSYSTEM_NAMES if name in content)
+    mentions_via = 'via' in content.lower()
+    if subsystem_hits < 3 and not mentions_via:
+        return False, None
+    
+    non_empty = 0
+    max_indent = 0
+    text_length = 0
+    for line in content.split('\n'):
+        stripped = line.strip()
+        if stripped:
+            non_empty += 1
+            max_indent = max(max_indent, len(line) - len(line.lstrip()))
+            text_length += len(stripped)
+    
+    if non_empty > 2:
+        # Architecture diagrams name several subsystems
+        if subsystem_hits >= 3:
+            return True, 'ascii-art-box'
+        
+        # Centered/aligned content rather than just indented code
+        if max_indent > 8 and text_length / non_empty < 60 and mentions_via:
+            return True, 'ascii-art'
+    
+    return False, None
 
 class SubsystemsReportGenerator:
-    def __init__(self):
+    MARKDOWN_EXTRAS = ['tables', 'fenced-code-blocks', 'header-ids', 'toc', 'footnotes']
+    MERMAID_CONFIG = {
+        'theme': 'default',
+        'themeVariables': {
+            'primaryColor': '#2c3e50',
+            'primaryTextColor': '#fff',
+            'primaryBorderColor': '#7C0000',
+            'lineColor': '#5D5D5D',
+            'secondaryColor': '#3498db',
+            'tertiaryColor': '#e74c3c'
+        },
+        'flowchart': {
+            'useMaxWidth': True,
+            'htmlLabels': True,
+            'curve': 'basis'
+        }
+    }
+    
+    def __init__(self, output_file="ACAS_Subsystems_Report.html", cache_file=None, prerender_diagrams=False):
         self.base_path = Path(__file__).parent
-        self.output_file = self.base_path / "ACAS_Subsystems_Report.html"
+        self.output_file = self.base_path / output_file
+        self.render_cache = RenderCache(self.base_path / cache_file) if cache_file else None
+        self.xref_cache = self.base_path / XREF_CACHE_FILE if cache_file else None
+        self.layout_cache = self.base_path / LAYOUT_CACHE_FILE if cache_file else None
+        self.line_count_cache = self.base_path / LINE_COUNT_CACHE_FILE if cache_file else None
+        self.prerender_diagrams = prerender_diagrams
         
     def get_file_order(self):
         """Define the order of files for the report"""
@@ -81,6 +183,7 @@ class SubsystemsReportGenerator:
         toc_html.append('<div class="toc-header">')
         toc_html.append('<h1>🏗️ ACAS Subsystems</h1>')
         toc_html.append('<p>Architecture Documentation</p>')
+        toc_html.append(SEARCH_BOX)
         toc_html.append('</div>')
         
         # Main Architecture Documents
@@ -136,9 +239,7 @@ class SubsystemsReportGenerator:
         
         # Convert markdown to HTML FIRST
         # Note: Not using 'codehilite' to avoid syntax highlighting on plain code blocks
-        html_content = markdown2.markdown(content, extras=[
-            'tables', 'fenced-code-blocks', 'header-ids', 'toc', 'footnotes'
-        ])
+        html_content = markdown2.markdown(content, extras=self.MARKDOWN_EXTRAS)
         
         # THEN post-process the HTML to style ASCII art blocks
         html_content = self.post_process_ascii_art(html_content)
@@ -150,58 +251,6 @@ class SubsystemsReportGenerator:
         ascii_art_count = 0
         total_blocks_checked = 0
         
-        def check_if_ascii_art(content):
-            """Determine if a code block contains ASCII art"""
-            # Check for box-drawing characters (expanded set)
-            box_chars = '┌┐└┘├┤┬┴┼─│╭╮╰╯═║╔╗╚╝╠╣╦╩╬'
-            if any(char in content for char in box_chars):
-                return True, 'ascii-art-box'
-            
-            # Check for heavy box drawing
-            if any(char in content for char in '━┃┏┓┗┛┣┫┳┻╋'):
-                return True, 'ascii-art-box'
-            
-            # Check for arrow characters and flow patterns
-            arrow_chars = '→←↑↓⟶⟵⟷↔▶◀▲▼'
-            if any(char in content for char in arrow_chars):
-                return True, 'ascii-art-arrows'
-            
-            # Check for simple arrow patterns (->)
-            if re.search(r'[-=]+>', content) or re.search(r'<[-=]+', content):
-                return True, 'ascii-art-arrows'
-            
-            # Check for tree patterns
-            if re.search(r'[│├└─]{2,}', content):
-                return True, 'ascii-art-tree'
-            
-            # Check for table patterns with +, -, |
-            if re.search(r'[+\-|]{3,}', content) and re.search(r'\+[-+]+\+', content):
-                return True, 'ascii-art-table'
-            
-            # Check for diagrams by structure
-            lines = content.split('\n')
-            non_empty_lines = [line for line in lines if line.strip()]
-            
-            if len(non_empty_lines) > 2:
-                # Check for subsystem names (architecture diagrams)
-                subsystem_names = ['SYS_ADMIN', 'GL_CORE', 'IRS_CORE', 'SL_MGMT', 'PL_MGMT', 
-                                 'ST_CTRL', 'BATCH_FW', 'RPT_ENGINE', 'DAL', 'PERIOD_PROC', 
-                                 'COMMON_UTIL', 'INTEG_SVC']
-                subsystem_count = sum(1 for name in subsystem_names if name in content)
-                if subsystem_count >= 3:
-                    return True, 'ascii-art-box'
-                
-                # Check for centered/aligned content
-                if non_empty_lines:
-                    leading_spaces = [len(line) - len(line.lstrip()) for line in non_empty_lines if line.strip()]
-                    if leading_spaces and max(leading_spaces) > 8:
-                        # Check if it's actually a diagram (not just indented code)
-                        avg_line_length = sum(len(line.strip()) for line in non_empty_lines) / len(non_empty_lines)
-                        if avg_line_length < 60 and 'via' in content.lower():
-                            return True, 'ascii-art'
-            
-            return False, None
-        
         # Process simple <pre><code> blocks (no syntax highlighting)
         def replace_simple_code_blocks(match):
             nonlocal ascii_art_count, total_blocks_checked
@@ -212,7 +261,7 @@ class SubsystemsReportGenerator:
             # Unescape HTML entities
             code_content_unescaped = html.unescape(code_content)
             
-            is_ascii, css_class = check_if_ascii_art(code_content_unescaped)
+            is_ascii, css_class = classify_ascii_art(code_content_unescaped)
             if is_ascii:
                 ascii_art_count += 1
                 return f'<pre class="{css_class}">{code_content}</pre>'
@@ -231,7 +280,7 @@ class SubsystemsReportGenerator:
             # Unescape HTML entities
             clean_text = html.unescape(clean_text)
             
-            is_ascii, css_class = check_if_ascii_art(clean_text)
+            is_ascii, css_class = classify_ascii_art(clean_text)
             if is_ascii:
                 ascii_art_count += 1
                 # For highlighted blocks, we need to preserve the text but remove syntax highlighting
@@ -269,8 +318,147 @@ class SubsystemsReportGenerator:
         
         return html_content
     
-    def generate_html(self):
+    def load_documents(self):
+        """Read every report document in order as (kind, name, content) tuples"""
+        file_order = self.get_file_order()
+        documents = []
+        
+        # Main documentation files
+        for filename in file_order['main_docs']:
+            filepath = self.base_path / filename
+            if filepath.exists():
+                documents.append(('main', filename, self.read_file(filepath)))
+        
+        # Subsystem specifications
+        subsystems_path = self.base_path / "Subsystems"
+        for subsystem in file_order['subsystems']:
+            spec_file = subsystems_path / subsystem / f"{subsystem}_SPECIFICATION.md"
+            if spec_file.exists():
+                documents.append(('subsystem', subsystem, self.read_file(spec_file)))
+        
+        # Diagram files (pure Mermaid, not converted)
+        diagrams_path = self.base_path / "Diagrams"
+        for diagram_file in file_order['diagrams']:
+            filepath = diagrams_path / diagram_file
+            if filepath.exists():
+                documents.append(('diagram', diagram_file, self.read_file(filepath)))
+        
+        return documents
+    
+    def load_inventory_patterns(self):
+        """Program name patterns per subsystem from the subsystem inventory"""
+        return inventory_patterns(self.read_file(self.base_path / INVENTORY_DOC))
+    
+    def load_program_xref(self, patterns):
+        """Program cross-reference from the COBOL parser's analysis, or None without it"""
+        if not os.path.exists(ANALYSIS_FILE):
+            print(f"Skipping program cross-reference: {ANALYSIS_FILE} not found")
+            return None
+        index, cached = load_index(ANALYSIS_FILE, self.xref_cache)
+        print(f"Program cross-reference: {len(index.names)} programs "
+              f"{'from cache' if cached else 'parsed from structure-analysis.json'}")
+        line_counts, expanded = load_line_counts(index.paths, self.line_count_cache)
+        print(f"Expanded the COPY statements of {len(line_counts)} programs, "
+              f"{len(line_counts) - expanded} from cache")
+        return ProgramXref(index, patterns, line_counts)
+    
+    def load_change_impact(self, patterns):
+        """Change impact analysis of the COBOL call graph, or None without it"""
+        if not os.path.exists(CALL_GRAPH_FILE):
+            print(f"Skipping change impact: {CALL_GRAPH_FILE} not found")
+            return None
+        graph = load_call_graph(CALL_GRAPH_FILE)
+        print(f"Change impact: {len(graph.names)} programs, {len(graph.targets)} calls")
+        return ChangeImpact(graph, patterns)
+    
+    def load_data_dictionary(self):
+        """Record layouts compiled from the copybooks of the files each subsystem owns"""
+        layouts, compiled = load_layouts(copybook_paths(), self.layout_cache)
+        print(f"Data dictionary: {len(layouts)} copybooks, {compiled} compiled, "
+              f"{len(layouts) - compiled} from cache")
+        return DataDictionary(layouts)
+    
+    def render_cache_key(self, content):
+        """Cache key: document text, markdown2 version, extras and this generator's source"""
+        return RenderCache.make_key(content, markdown2.__version__,
+                                    ','.join(self.MARKDOWN_EXTRAS), GENERATOR_DIGEST)
+    
+    def lookup_renders(self, markdown_docs):
+        """Return (cache keys, cached results) with None for every cache miss"""
+        if self.render_cache is None:
+            return [None] * len(markdown_docs), [None] * len(markdown_docs)
+        keys = [self.render_cache_key(content) for content in markdown_docs]
+        return keys, [self.render_cache.get(key) for key in keys]
+    
+    def store_render(self, key, result):
+        """Save a freshly converted document in the render cache"""
+        if self.render_cache is not None:
+            self.render_cache.put(key, *result)
+    
+    def convert_documents(self, documents, workers=None):
+        """Convert each markdown document to (html, mermaid diagrams), in document order
+        
+        Documents found in the render cache are reused. With workers set, the
+        remaining independent conversions run in a process pool; results are
+        still returned in document order.
+        """
+        markdown_docs = [content for kind, name, content in documents if kind != 'diagram']
+        keys, results = self.lookup_renders(markdown_docs)
+        todo = [n for n, result in enumerate(results) if result is None]
+        
+        if workers and todo:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                fresh = list(pool.map(convert_markdown, [markdown_docs[n] for n in todo]))
+        else:
+            fresh = [self.process_markdown_content(markdown_docs[n]) for n in todo]
+        
+        for n, result in zip(todo, fresh):
+            results[n] = result
+            self.store_render(keys[n], result)
+        
+        results = iter(results)
+        return [None if kind == 'diagram' else next(results)
+                for kind, name, content in documents]
+    
+    def generate_html(self, workers=None):
         """Generate the complete HTML report"""
+        print("Reading documentation files...")
+        documents = self.load_documents()
+        
+        if workers:
+            print(f"Converting markdown documents with {workers} worker processes...")
+        else:
+            print("Converting markdown documents...")
+        converted = self.convert_documents(documents, workers)
+        
+        return self.assemble_html(documents, converted)
+    
+    def check_determinism(self, workers):
+        """Render serially and in parallel and compare the HTML byte for byte"""
+        documents = self.load_documents()
+        
+        # Compare real conversions, not cached ones
+        cache, self.render_cache = self.render_cache, None
+        try:
+            serial = self.assemble_html(documents, self.convert_documents(documents)).encode('utf-8')
+            parallel = self.assemble_html(documents, self.convert_documents(documents, workers)).encode('utf-8')
+        finally:
+            self.render_cache = cache
+        
+        if serial == parallel:
+            print(f"✅ Serial and parallel ({workers} workers) output are identical ({len(serial):,} bytes)")
+            return True
+        
+        offset = next((i for i, (a, b) in enumerate(zip(serial, parallel)) if a != b),
+                      min(len(serial), len(parallel)))
+        print(f"❌ Serial and parallel output differ at byte {offset:,} "
+              f"(serial {len(serial):,} bytes, parallel {len(parallel):,} bytes)")
+        print(f"   serial:   {serial[offset:offset + 80]!r}")
+        print(f"   parallel: {parallel[offset:offset + 80]!r}")
+        return False
+    
+    def assemble_html(self, documents, converted):
+        """Build the report from the documents and their converted results"""
         sections = {
             'main': [],
             'subsystems': [],
@@ -279,70 +467,68 @@ class SubsystemsReportGenerator:
         
         all_content = []
         all_mermaid_diagrams = []
-        
-        file_order = self.get_file_order()
-        
-        # Process main documentation files
-        print("Processing main documentation files...")
-        for filename in file_order['main_docs']:
-            filepath = self.base_path / filename
-            if filepath.exists():
-                content = self.read_file(filepath)
-                section_id = self.create_section_id(filename)
-                title = self.extract_title(content, filename)
+        search_index = SearchIndexBuilder()
+        patterns = self.load_inventory_patterns()
+        program_xref = self.load_program_xref(patterns)
+        change_impact = self.load_change_impact(patterns)
+        data_dictionary = self.load_data_dictionary()
+        
+        for (kind, name, content), result in zip(documents, converted):
+            if kind == 'main':
+                # Main documentation file
+                section_id = self.create_section_id(name)
+                title = self.extract_title(content, name)
                 sections['main'].append((section_id, title))
                 
-                html_content, mermaid_diagrams = self.process_markdown_content(content)
+                html_content, mermaid_diagrams = result
                 all_mermaid_diagrams.extend(mermaid_diagrams)
+                search_index.add_html(html_content, section_id, title)
                 
                 all_content.append(f'''
                 <section id="{section_id}" class="doc-section">
                     <div class="section-header">
                         <h1>{title}</h1>
-                        <div class="section-meta">Source: {filename}</div>
+                        <div class="section-meta">Source: {name}</div>
                     </div>
                     <div class="section-content">
                         {html_content}
                     </div>
                 </section>
                 ''')
-        
-        # Process subsystem specifications
-        print("Processing subsystem specifications...")
-        subsystems_path = self.base_path / "Subsystems"
-        for subsystem in file_order['subsystems']:
-            spec_file = subsystems_path / subsystem / f"{subsystem}_SPECIFICATION.md"
-            if spec_file.exists():
-                content = self.read_file(spec_file)
-                section_id = f"subsystem-{subsystem.lower().replace('_', '-')}"
-                title = self.extract_title(content, spec_file.name)
+            
+            elif kind == 'subsystem':
+                # Subsystem specification
+                section_id = f"subsystem-{name.lower().replace('_', '-')}"
+                title = self.extract_title(content, f"{name}_SPECIFICATION.md")
                 sections['subsystems'].append((section_id, title))
                 
-                html_content, mermaid_diagrams = self.process_markdown_content(content)
+                html_content, mermaid_diagrams = result
                 all_mermaid_diagrams.extend(mermaid_diagrams)
+                if program_xref is not None:
+                    html_content += program_xref.section_html(name)
+                if change_impact is not None:
+                    html_content += change_impact.section_html(name)
+                html_content += data_dictionary.section_html(name)
+                search_index.add_html(html_content, section_id, title)
                 
                 all_content.append(f'''
                 <section id="{section_id}" class="doc-section subsystem-spec">
                     <div class="section-header">
                         <h1>{title}</h1>
-                        <div class="section-meta">Subsystem: {subsystem}</div>
+                        <div class="section-meta">Subsystem: {name}</div>
                     </div>
                     <div class="section-content">
                         {html_content}
                     </div>
                 </section>
                 ''')
-        
-        # Process diagram files
-        print("Processing architecture diagrams...")
-        diagrams_path = self.base_path / "Diagrams"
-        for diagram_file in file_order['diagrams']:
-            filepath = diagrams_path / diagram_file
-            if filepath.exists():
-                content = self.read_file(filepath)
-                section_id = f"diagram-{self.create_section_id(diagram_file)}"
-                title = self.extract_title(content, diagram_file)
+            
+            else:
+                # Architecture diagram file
+                section_id = f"diagram-{self.create_section_id(name)}"
+                title = self.extract_title(content, name)
                 sections['diagrams'].append((section_id, title))
+                search_index.add_html('', section_id, title)
                 
                 # For pure Mermaid files, wrap the entire content
                 diagram_id = f"mermaid-{section_id}"
@@ -592,6 +778,58 @@ class SubsystemsReportGenerator:
             border-bottom: none;
         }}
         
+        /* Program Cross-Reference */
+        .xref-table td {{
+            vertical-align: top;
+            padding: 0.6rem 0.9rem;
+            font-size: 0.85rem;
+        }}
+        
+        .xref-path {{
+            color: #888;
+            font-size: 0.75rem;
+        }}
+        
+        .xref-external {{
+            font-weight: 600;
+            color: #764ba2;
+        }}
+        
+        .xref-unresolved {{
+            color: #999;
+            font-style: italic;
+        }}
+        
+        .impact-layers li {{
+            margin-bottom: 0.4rem;
+            line-height: 1.8;
+        }}
+        
+        /* Data Dictionary */
+        .layout-table td {{
+            padding: 0.3rem 0.9rem;
+            font-size: 0.8rem;
+        }}
+        
+        .layout-number, .layout-level {{
+            text-align: right;
+            font-variant-numeric: tabular-nums;
+        }}
+        
+        .layout-group td {{
+            background-color: #f3f0fa;
+            font-weight: 600;
+        }}
+        
+        .layout-redefines td {{
+            color: #999;
+        }}
+        
+        .layout-note {{
+            font-size: 0.75rem;
+            font-style: italic;
+        }}
+        
         /* Code Blocks */
         pre {{
             background-color: var(--code-background);
@@ -826,6 +1064,8 @@ class SubsystemsReportGenerator:
         ::-webkit-scrollbar-thumb:hover {{
             background: var(--primary-color);
         }}
+        
+        {SEARCH_CSS}
     </style>
 </head>
 <body>
@@ -850,28 +1090,18 @@ class SubsystemsReportGenerator:
         </main>
     </div>
     
+    {search_script(search_index)}
     <script>
         // Initialize Mermaid
-        mermaid.initialize({{ 
-            theme: 'default',
-            themeVariables: {{
-                primaryColor: '#2c3e50',
-                primaryTextColor: '#fff',
-                primaryBorderColor: '#7C0000',
-                lineColor: '#5D5D5D',
-                secondaryColor: '#3498db',
-                tertiaryColor: '#e74c3c'
-            }},
-            flowchart: {{
-                useMaxWidth: true,
-                htmlLabels: true,
-                curve: 'basis'
-            }}
-        }});
+        if (window.mermaid) {{
+            mermaid.initialize({self.mermaid_config_js()});
+        }}
         
         // Render all Mermaid diagrams
         document.addEventListener('DOMContentLoaded', function() {{
-            mermaid.init();
+            if (window.mermaid) {{
+                mermaid.init();
+            }}
         }});
         
         // Add active section highlighting in TOC
@@ -902,7 +1132,29 @@ class SubsystemsReportGenerator:
         
         return html_template
     
-    def generate_report(self):
+    def mermaid_config_js(self):
+        """MERMAID_CONFIG as a JavaScript object literal for the template"""
+        return json.dumps(self.MERMAID_CONFIG, indent=4).replace('\n', '\n' + ' ' * 12)
+    
+    def prerender_mermaid(self, html_content):
+        """Inline build-time SVG for the diagrams, when a Mermaid renderer is installed"""
+        prerenderer = make_prerenderer(self.MERMAID_CONFIG, str(self.base_path / SVG_CACHE_DIR))
+        if prerenderer is None:
+            return html_content
+        print("Pre-rendering Mermaid diagrams...")
+        html_content = prerenderer.prerender_html(html_content)
+        print(f"Mermaid SVG cache: {prerenderer.stats()}")
+        return html_content
+    
+    def write_report(self, html_content):
+        """Write the generated HTML to the output file"""
+        if self.prerender_diagrams:
+            html_content = self.prerender_mermaid(html_content)
+        print(f"Writing output to {self.output_file}...")
+        with open(self.output_file, 'w', encoding='utf-8') as f:
+            f.write(html_content)
+    
+    def generate_report(self, workers=None):
         """Main method to generate the complete report"""
         print("ACAS Subsystems Documentation Report Generator")
         print("=" * 50)
@@ -912,22 +1164,76 @@ class SubsystemsReportGenerator:
         
         try:
             print("Generating HTML report...")
-            html_content = self.generate_html()
+            html_content = self.generate_html(workers)
             
-            print(f"Writing output to {self.output_file}...")
-            with open(self.output_file, 'w', encoding='utf-8') as f:
-                f.write(html_content)
+            self.write_report(html_content)
             
             print("\n✅ Report generated successfully!")
             print(f"📄 Output file: {self.output_file}")
             print(f"📏 File size: {os.path.getsize(self.output_file) / 1024:.2f} KB")
             print("\n🌐 Open the HTML file in a web browser to view the complete documentation.")
+            if self.render_cache is not None:
+                print(f"🗄️  Render cache: {self.render_cache.stats()}")
             
         except Exception as e:
             print(f"\n❌ Error generating report: {e}")
             raise
 
 
+def convert_markdown(content):
+    """Convert one markdown document; run in build_docs.py worker processes"""
+    return SubsystemsReportGenerator().process_markdown_content(content)
+
+
+def plan_build():
+    """Return (jobs, finish) for build_docs.py
+
+    jobs lists the (function name, args) conversions for documents missing
+    from the render cache, in document order; finish takes their results in
+    the same order and writes the report.
+    """
+    generator = SubsystemsReportGenerator(cache_file=RENDER_CACHE_FILE,
+                                           prerender_diagrams=prerender_enabled())
+    documents = generator.load_documents()
+    markdown_docs = [content for kind, name, content in documents if kind != 'diagram']
+    keys, results = generator.lookup_renders(markdown_docs)
+    todo = [n for n, result in enumerate(results) if result is None]
+    jobs = [('convert_markdown', (markdown_docs[n],)) for n in todo]
+    
+    def finish(fresh):
+        for n, result in zip(todo, fresh):
+            results[n] = result
+            generator.store_render(keys[n], result)
+        converted = iter(results)
+        converted = [None if kind == 'diagram' else next(converted)
+                     for kind, name, content in documents]
+        generator.write_report(generator.assemble_html(documents, converted))
+        print(f"Render cache: {generator.render_cache.stats()}")
+        return generator.output_file
+    
+    return jobs, finish
+
+
 if __name__ == "__main__":
-    generator = SubsystemsReportGenerator()
-    generator.generate_report()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--parallel', action='store_true',
+                        help='convert the markdown documents in a process pool')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help='worker processes for --parallel (default: number of CPUs)')
+    parser.add_argument('--check-determinism', action='store_true',
+                        help='render serially and in parallel, compare the HTML and exit')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='convert every document and re-read the COBOL analysis and copybooks instead of using the caches')
+    parser.add_argument('--cache-max-mb', type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                        help='render cache size limit before LRU eviction (default: %(default)s MB)')
+    parser.add_argument('--prerender-diagrams', action='store_true', default=prerender_enabled(),
+                        help='render Mermaid diagrams to inline SVG at build time (needs mmdc)')
+    args = parser.parse_args()
+    
+    generator = SubsystemsReportGenerator(cache_file=None if args.no_cache else RENDER_CACHE_FILE,
+                                          prerender_diagrams=args.prerender_diagrams)
+    if generator.render_cache is not None:
+        generator.render_cache.max_bytes = args.cache_max_mb * 1024 * 1024
+    if args.check_determinism:
+        sys.exit(0 if generator.check_determinism(max(args.workers, 2)) else 1)
+    generator.generate_report(args.workers if args.parallel else None)
\ No newline at end of file
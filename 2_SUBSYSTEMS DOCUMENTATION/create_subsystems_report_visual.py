@@ -4,17 +4,85 @@ Create a comprehensive HTML report from ACAS Subsystems Identification documenta
 Converts ASCII art diagrams to visual Mermaid diagrams.
 """
 
+import argparse
+import hashlib
+import json
 import os
 import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import markdown2
 from datetime import datetime
 import html
+from ascii_diagram import ascii_to_mermaid
+from inline_arrows import convert_inline_arrows
+from call_graph import CALL_GRAPH_FILE, ChangeImpact, load_call_graph
+from program_xref import (ANALYSIS_FILE, INVENTORY_DOC, LINE_COUNT_CACHE_FILE, XREF_CACHE_FILE, ProgramXref,
+                          inventory_patterns, load_index)
+from render_cache import DEFAULT_MAX_BYTES, RenderCache
+
+# Build helpers shared with the other generators live at the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from mermaid_svg import SVG_CACHE_DIR, make_prerenderer, prerender_enabled
+from search_index import SEARCH_BOX, SEARCH_CSS, SearchIndexBuilder, search_script
+from cobol_scanner import load_line_counts
+from cobol_scanner.layout import load_layouts
+from data_dictionary import LAYOUT_CACHE_FILE, DataDictionary, copybook_paths
+
+RENDER_CACHE_FILE = ".render_cache.sqlite"
+
+# Any edit to this script or its helper modules invalidates cached renders
+GENERATOR_DIGEST = hashlib.sha256(b''.join(
+    (Path(__file__).parent / name).read_bytes()
+    for name in (Path(__file__).name, "ascii_diagram.py", "inline_arrows.py")
+)).hexdigest()
+
+# Opening line of a fenced code block, with its language (if any)
+CODE_FENCE_RE = re.compile(r'^[ \t]*```[ \t]*([\w+-]*)[ \t]*$')
 
 class SubsystemsReportGenerator:
-    def __init__(self):
+    MARKDOWN_EXTRAS = ['tables', 'fenced-code-blocks', 'header-ids', 'toc', 'footnotes']
+    MERMAID_CONFIG = {
+        'startOnLoad': False,
+        'theme': 'default',
+        'themeVariables': {
+            'primaryColor': '#2c3e50',
+            'primaryTextColor': '#fff',
+            'primaryBorderColor': '#7C0000',
+            'lineColor': '#5D5D5D',
+            'secondaryColor': '#3498db',
+            'tertiaryColor': '#e74c3c',
+            'background': '#fff',
+            'mainBkg': '#4a9eff',
+            'secondBkg': '#00d4ff',
+            'tertiaryBkg': '#4ecdc4'
+        },
+        'flowchart': {
+            'useMaxWidth': True,
+            'htmlLabels': True,
+            'curve': 'basis',
+            'padding': 20
+        },
+        'sequence': {
+            'diagramMarginX': 50,
+            'diagramMarginY': 10,
+            'boxTextMargin': 5,
+            'noteMargin': 10,
+            'messageMargin': 35
+        }
+    }
+    # Diagrams laid out at once as they scroll into view
+    MERMAID_RENDER_CONCURRENCY = 2
+    
+    def __init__(self, output_file="ACAS_Subsystems_Report.html", cache_file=None, prerender_diagrams=False):
         self.base_path = Path(__file__).parent
-        self.output_file = self.base_path / "ACAS_Subsystems_Report.html"
+        self.output_file = self.base_path / output_file
+        self.render_cache = RenderCache(self.base_path / cache_file) if cache_file else None
+        self.xref_cache = self.base_path / XREF_CACHE_FILE if cache_file else None
+        self.layout_cache = self.base_path / LAYOUT_CACHE_FILE if cache_file else None
+        self.line_count_cache = self.base_path / LINE_COUNT_CACHE_FILE if cache_file else None
+        self.prerender_diagrams = prerender_diagrams
         
     def get_file_order(self):
         """Define the order of files for the report"""
@@ -61,227 +129,57 @@ class SubsystemsReportGenerator:
             return ""
     
     def convert_ascii_to_mermaid(self, ascii_content):
-        """Convert ASCII art diagrams to Mermaid format"""
-        lines = ascii_content.strip().split('\n')
-        
-        # Detect type of diagram and convert
-        if 'SYS_ADMIN' in ascii_content and ('GL_CORE' in ascii_content or 'IRS_CORE' in ascii_content):
-            # This is the subsystem dependency graph
-            return self.convert_dependency_graph_to_mermaid(ascii_content)
-        elif '→' in ascii_content or '->' in ascii_content:
-            # This is a flow diagram
-            return self.convert_flow_diagram_to_mermaid(ascii_content)
-        elif '│' in ascii_content and '├' in ascii_content:
-            # This is a tree or hierarchical diagram
-            return self.convert_hierarchy_to_mermaid(ascii_content)
-        else:
-            # Default: try to parse as a box diagram
-            return self.convert_box_diagram_to_mermaid(ascii_content)
-    
-    def convert_dependency_graph_to_mermaid(self, ascii_content):
-        """Convert the subsystem dependency graph to Mermaid"""
-        mermaid = """graph TB
-    SYS[SYS_ADMIN<br/>System Administration]
-    
-    GL[GL_CORE<br/>General Ledger]
-    IRS[IRS_CORE<br/>IRS Ledger]
-    SL[SL_MGMT<br/>Sales Ledger]
-    PL[PL_MGMT<br/>Purchase Ledger]
-    ST[ST_CTRL<br/>Stock Control]
-    
-    BATCH[BATCH_FW & Posting Files]
+        """Convert an ASCII art diagram to Mermaid (None if it has no structure)"""
+        return ascii_to_mermaid(ascii_content.strip('\n'))
     
-    SYS --> GL
-    SYS --> IRS
-    SYS --> SL
-    SYS --> PL
-    SYS --> ST
+    def mermaid_div(self, diagram_id, source):
+        """Placeholder div for a diagram, rendered in the browser when it scrolls into view"""
+        diagram_hash = hashlib.sha256(source.encode('utf-8')).hexdigest()[:16]
+        return (f'<div class="mermaid" id="{diagram_id}" data-diagram-hash="{diagram_hash}">'
+                f'{html.escape(source)}</div>')
     
-    SL --> BATCH
-    PL --> BATCH
-    
-    BATCH --> GL
-    BATCH --> IRS
-    
-    style SYS fill:#4a9eff,stroke:#333,stroke-width:2px,color:#fff
-    style GL fill:#667eea,stroke:#333,stroke-width:2px,color:#fff
-    style IRS fill:#667eea,stroke:#333,stroke-width:2px,color:#fff
-    style SL fill:#00d4ff,stroke:#333,stroke-width:2px,color:#fff
-    style PL fill:#00d4ff,stroke:#333,stroke-width:2px,color:#fff
-    style ST fill:#4ecdc4,stroke:#333,stroke-width:2px,color:#fff
-    style BATCH fill:#ffe66d,stroke:#333,stroke-width:2px,color:#333"""
-        return mermaid
-    
-    def convert_flow_diagram_to_mermaid(self, ascii_content):
-        """Convert flow diagrams with arrows to Mermaid"""
-        # Parse the flow and create appropriate Mermaid
-        if 'Customer Orders' in ascii_content and 'SL_MGMT' in ascii_content:
-            return """graph TB
-    subgraph "Sales Flow"
-        CO[Customer Orders] --> SL[SL_MGMT]
-        SL --> SU[Stock Updates]
-        SU --> ST[ST_CTRL]
-        SL --> P1[Postings]
-        P1 --> GL[GL_CORE/IRS_CORE]
-    end
-    
-    subgraph "Purchase Flow"
-        SO[Supplier Orders] --> PL[PL_MGMT]
-        PL --> SU2[Stock Updates]
-        SU2 --> ST
-        PL --> P2[Postings]
-        P2 --> GL
-    end
-    
-    style CO fill:#4a9eff,stroke:#333,stroke-width:2px,color:#fff
-    style SO fill:#4a9eff,stroke:#333,stroke-width:2px,color:#fff
-    style SL fill:#00d4ff,stroke:#333,stroke-width:2px,color:#fff
-    style PL fill:#00d4ff,stroke:#333,stroke-width:2px,color:#fff
-    style ST fill:#4ecdc4,stroke:#333,stroke-width:2px,color:#fff
-    style GL fill:#667eea,stroke:#333,stroke-width:2px,color:#fff
-    style SU fill:#ffe66d,stroke:#333,stroke-width:2px,color:#333
-    style SU2 fill:#ffe66d,stroke:#333,stroke-width:2px,color:#333
-    style P1 fill:#ff6b6b,stroke:#333,stroke-width:2px,color:#fff
-    style P2 fill:#ff6b6b,stroke:#333,stroke-width:2px,color:#fff"""
-        else:
-            # Generic flow - try to parse arrows
-            return self.parse_generic_flow(ascii_content)
-    
-    def convert_hierarchy_to_mermaid(self, ascii_content):
-        """Convert hierarchical diagrams to Mermaid"""
-        # For the High-Level Architecture diagram
-        if 'ACAS SYSTEM' in ascii_content:
-            return """graph TB
-    subgraph "ACAS SYSTEM"
-        subgraph "PRESENTATION LAYER"
-            ACAS[ACAS Menu]
-            IRS_M[IRS Menu]
-            SALES[SALES Menu]
-            PURCH[PURCHASE Menu]
-            STOCK[STOCK Menu]
-        end
-        
-        subgraph "BUSINESS LOGIC LAYER"
-            GL_CORE[GL_CORE<br/>gl020-gl120]
-            IRS_CORE[IRS_CORE<br/>irs010-irs090]
-            SL_MGMT[SL_MGMT<br/>sl010-sl970]
-            PL_MGMT[PL_MGMT<br/>pl010-pl970]
-            ST_CTRL[ST_CTRL<br/>st010-st150]
+    def process_code_fences(self, content):
+        """Visit every fenced code block once: Mermaid blocks and ASCII art
+        diagrams become Mermaid divs, other code is left for markdown2"""
+        lines = content.split('\n')
+        output = []
+        mermaid_diagrams = []
+        ascii_count = 0
+        i = 0
+        while i < len(lines):
+            fence = CODE_FENCE_RE.match(lines[i])
+            if not fence:
+                output.append(lines[i])
+                i += 1
+                continue
             
-            subgraph "BATCH & PERIOD"
-                BATCH[BATCH_FW & PERIOD_PROC<br/>xl150, gl070-072, sl060, pl060, irs090]
-            end
-        end
-        
-        subgraph "DATA ACCESS LAYER"
-            DAL1[File Handlers: acas000-acas032]
-            DAL2[DB Modules: *MT.cbl, salesMT, purchMT, stockMT, etc.]
-        end
-        
-        subgraph "COMMON & SYSTEM"
-            COMMON[COMMON FILES]
-            SYS[RDBMS/MariaDB]
-        end
-    end
-    
-    ACAS --> GL_CORE
-    IRS_M --> IRS_CORE
-    SALES --> SL_MGMT
-    PURCH --> PL_MGMT
-    STOCK --> ST_CTRL
-    
-    GL_CORE --> BATCH
-    IRS_CORE --> BATCH
-    SL_MGMT --> BATCH
-    PL_MGMT --> BATCH
-    ST_CTRL --> BATCH
-    
-    BATCH --> DAL1
-    BATCH --> DAL2
-    
-    DAL1 --> COMMON
-    DAL2 --> SYS
-    
-    style ACAS fill:#4a9eff,stroke:#333,stroke-width:2px,color:#fff
-    style IRS_M fill:#4a9eff,stroke:#333,stroke-width:2px,color:#fff
-    style SALES fill:#4a9eff,stroke:#333,stroke-width:2px,color:#fff
-    style PURCH fill:#4a9eff,stroke:#333,stroke-width:2px,color:#fff
-    style STOCK fill:#4a9eff,stroke:#333,stroke-width:2px,color:#fff"""
-        else:
-            return self.parse_generic_hierarchy(ascii_content)
-    
-    def convert_box_diagram_to_mermaid(self, ascii_content):
-        """Convert box diagrams to Mermaid"""
-        # Generic conversion - create a simple flowchart
-        return """graph TB
-    A[Component A] --> B[Component B]
-    B --> C[Component C]
-    
-    style A fill:#4a9eff,stroke:#333,stroke-width:2px,color:#fff
-    style B fill:#00d4ff,stroke:#333,stroke-width:2px,color:#fff
-    style C fill:#4ecdc4,stroke:#333,stroke-width:2px,color:#fff"""
-    
-    def parse_generic_flow(self, content):
-        """Parse generic flow diagrams"""
-        # Simple parser for arrow-based flows
-        return """graph LR
-    Start[Start] --> Process[Process] --> End[End]
-    
-    style Start fill:#4a9eff,stroke:#333,stroke-width:2px,color:#fff
-    style Process fill:#00d4ff,stroke:#333,stroke-width:2px,color:#fff
-    style End fill:#4ecdc4,stroke:#333,stroke-width:2px,color:#fff"""
-    
-    def parse_generic_hierarchy(self, content):
-        """Parse generic hierarchy diagrams"""
-        return """graph TD
-    Root[Root] --> Child1[Child 1]
-    Root --> Child2[Child 2]
-    
-    style Root fill:#4a9eff,stroke:#333,stroke-width:2px,color:#fff
-    style Child1 fill:#00d4ff,stroke:#333,stroke-width:2px,color:#fff
-    style Child2 fill:#4ecdc4,stroke:#333,stroke-width:2px,color:#fff"""
-    
-    def extract_mermaid_diagrams(self, content):
-        """Extract Mermaid diagram blocks and replace with div placeholders"""
-        mermaid_pattern = r'```mermaid\n(.*?)\n```'
-        diagrams = []
-        
-        def replace_mermaid(match):
-            diagram_content = match.group(1)
-            diagram_id = f"mermaid-diagram-{len(diagrams)}"
-            diagrams.append((diagram_id, diagram_content))
-            return f'<div class="mermaid" id="{diagram_id}">{html.escape(diagram_content)}</div>'
-        
-        content = re.sub(mermaid_pattern, replace_mermaid, content, flags=re.DOTALL)
-        return content, diagrams
-    
-    def process_ascii_art_diagrams(self, content):
-        """Convert ASCII art diagrams to Mermaid"""
-        ascii_diagrams = []
-        diagram_counter = 0
-        
-        def replace_ascii_diagram(match):
-            nonlocal diagram_counter
-            ascii_content = match.group(1)
+            end = i + 1
+            while end < len(lines) and not lines[end].lstrip().startswith('```'):
+                end += 1
+            if end == len(lines):
+                # Unclosed fence: nothing more to convert
+                output.extend(lines[i:])
+                break
             
-            # Check if this is an ASCII diagram (not code)
-            if self.is_ascii_diagram(ascii_content):
-                # Convert to Mermaid
-                mermaid_content = self.convert_ascii_to_mermaid(ascii_content)
-                diagram_id = f"ascii-to-mermaid-{diagram_counter}"
-                diagram_counter += 1
-                
-                # Return Mermaid div
-                return f'<div class="mermaid" id="{diagram_id}">{html.escape(mermaid_content)}</div>'
+            block = '\n'.join(lines[i + 1:end])
+            language = fence.group(1)
+            if language == 'mermaid':
+                diagram_id = f"mermaid-diagram-{len(mermaid_diagrams)}"
+                mermaid_diagrams.append((diagram_id, block))
+                output.append(self.mermaid_div(diagram_id, block))
+            elif not language and self.is_ascii_diagram(block):
+                mermaid_content = self.convert_ascii_to_mermaid(block)
+                if mermaid_content is None:
+                    output.extend(lines[i:end + 1])
+                else:
+                    diagram_id = f"ascii-to-mermaid-{ascii_count}"
+                    ascii_count += 1
+                    output.append(self.mermaid_div(diagram_id, mermaid_content))
             else:
-                # Return as regular code block
-                return match.group(0)
-        
-        # Replace ASCII art blocks
-        content = re.sub(r'```\n((?:[^\n]*[┌┐└┘├┤┬┴┼─│→←↑↓].*\n?)+)```', 
-                        replace_ascii_diagram, content, flags=re.MULTILINE)
+                output.extend(lines[i:end + 1])
+            i = end + 1
         
-        return content
+        return '\n'.join(output), mermaid_diagrams
     
     def is_ascii_diagram(self, content):
         """Check if content is an ASCII diagram"""
@@ -301,86 +199,20 @@ class SubsystemsReportGenerator:
     
     def process_markdown_content(self, content):
         """Process markdown content with special handling"""
-        # First, extract existing Mermaid diagrams
-        content, mermaid_diagrams = self.extract_mermaid_diagrams(content)
-        
-        # Then, convert ASCII art diagrams to Mermaid
-        content = self.process_ascii_art_diagrams(content)
+        # Mermaid and ASCII art diagrams out of the fenced code blocks
+        content, mermaid_diagrams = self.process_code_fences(content)
         
         # Convert markdown to HTML
-        html_content = markdown2.markdown(content, extras=[
-            'tables', 'fenced-code-blocks', 'header-ids', 'toc', 'footnotes'
-        ])
-        
-        # Post-process HTML to convert any remaining ASCII art
-        html_content = self.post_process_html_for_ascii(html_content)
-        
-        return html_content, mermaid_diagrams
-    
-    def post_process_html_for_ascii(self, html_content):
-        """Post-process HTML to convert ASCII art in code blocks to Mermaid"""
-        diagram_counter = 0
-        
-        def replace_code_block(match):
-            nonlocal diagram_counter
-            code_content = match.group(1)
-            # Unescape HTML entities
-            code_content = html.unescape(code_content)
-            
-            if self.is_ascii_diagram(code_content):
-                # Convert to Mermaid
-                mermaid_content = self.convert_ascii_to_mermaid(code_content)
-                diagram_id = f"ascii-converted-{diagram_counter}"
-                diagram_counter += 1
-                return f'<div class="mermaid" id="{diagram_id}">{html.escape(mermaid_content)}</div>'
-            else:
-                return match.group(0)
+        html_content = markdown2.markdown(content, extras=self.MARKDOWN_EXTRAS)
         
-        # Replace <pre><code> blocks
-        html_content = re.sub(
-            r'<pre><code>(.*?)</code></pre>',
-            replace_code_block,
-            html_content,
-            flags=re.DOTALL
-        )
-        
-        # Also convert inline arrow notations to styled spans
+        # Convert inline arrow notations to styled spans
         html_content = self.convert_inline_arrows(html_content)
         
-        return html_content
+        return html_content, mermaid_diagrams
     
     def convert_inline_arrows(self, html_content):
         """Convert inline arrow notations to styled elements"""
-        # Pattern to match arrows in various contexts
-        arrow_pattern = r'(\w+(?:_\w+)?)\s*→\s*(\w+(?:_\w+)?)'
-        
-        def replace_arrow(match):
-            from_node = match.group(1)
-            to_node = match.group(2)
-            # Return a styled span that looks like a flow
-            return f'<span class="inline-flow">{from_node} ➔ {to_node}</span>'
-        
-        # Skip replacements inside existing tags
-        parts = []
-        last_end = 0
-        
-        # Find all tag positions
-        for tag_match in re.finditer(r'<[^>]+>', html_content):
-            start, end = tag_match.span()
-            # Process content before the tag
-            content_before = html_content[last_end:start]
-            processed = re.sub(arrow_pattern, replace_arrow, content_before)
-            parts.append(processed)
-            # Add the tag itself
-            parts.append(html_content[start:end])
-            last_end = end
-        
-        # Process remaining content
-        remaining = html_content[last_end:]
-        processed = re.sub(arrow_pattern, replace_arrow, remaining)
-        parts.append(processed)
-        
-        return ''.join(parts)
+        return convert_inline_arrows(html_content)
     
     def generate_toc(self, sections):
         """Generate table of contents"""
@@ -388,6 +220,7 @@ class SubsystemsReportGenerator:
         toc_html.append('<div class="toc-header">')
         toc_html.append('<h1>🏗️ ACAS Subsystems</h1>')
         toc_html.append('<p>Architecture Documentation</p>')
+        toc_html.append(SEARCH_BOX)
         toc_html.append('</div>')
         
         # Main Architecture Documents
@@ -436,8 +269,147 @@ class SubsystemsReportGenerator:
         
         return title.title()
     
-    def generate_html(self):
+    def load_documents(self):
+        """Read every report document in order as (kind, name, content) tuples"""
+        file_order = self.get_file_order()
+        documents = []
+        
+        # Main documentation files
+        for filename in file_order['main_docs']:
+            filepath = self.base_path / filename
+            if filepath.exists():
+                documents.append(('main', filename, self.read_file(filepath)))
+        
+        # Subsystem specifications
+        subsystems_path = self.base_path / "Subsystems"
+        for subsystem in file_order['subsystems']:
+            spec_file = subsystems_path / subsystem / f"{subsystem}_SPECIFICATION.md"
+            if spec_file.exists():
+                documents.append(('subsystem', subsystem, self.read_file(spec_file)))
+        
+        # Diagram files (pure Mermaid, not converted)
+        diagrams_path = self.base_path / "Diagrams"
+        for diagram_file in file_order['diagrams']:
+            filepath = diagrams_path / diagram_file
+            if filepath.exists():
+                documents.append(('diagram', diagram_file, self.read_file(filepath)))
+        
+        return documents
+    
+    def load_inventory_patterns(self):
+        """Program name patterns per subsystem from the subsystem inventory"""
+        return inventory_patterns(self.read_file(self.base_path / INVENTORY_DOC))
+    
+    def load_program_xref(self, patterns):
+        """Program cross-reference from the COBOL parser's analysis, or None without it"""
+        if not os.path.exists(ANALYSIS_FILE):
+            print(f"Skipping program cross-reference: {ANALYSIS_FILE} not found")
+            return None
+        index, cached = load_index(ANALYSIS_FILE, self.xref_cache)
+        print(f"Program cross-reference: {len(index.names)} programs "
+              f"{'from cache' if cached else 'parsed from structure-analysis.json'}")
+        line_counts, expanded = load_line_counts(index.paths, self.line_count_cache)
+        print(f"Expanded the COPY statements of {len(line_counts)} programs, "
+              f"{len(line_counts) - expanded} from cache")
+        return ProgramXref(index, patterns, line_counts)
+    
+    def load_change_impact(self, patterns):
+        """Change impact analysis of the COBOL call graph, or None without it"""
+        if not os.path.exists(CALL_GRAPH_FILE):
+            print(f"Skipping change impact: {CALL_GRAPH_FILE} not found")
+            return None
+        graph = load_call_graph(CALL_GRAPH_FILE)
+        print(f"Change impact: {len(graph.names)} programs, {len(graph.targets)} calls")
+        return ChangeImpact(graph, patterns)
+    
+    def load_data_dictionary(self):
+        """Record layouts compiled from the copybooks of the files each subsystem owns"""
+        layouts, compiled = load_layouts(copybook_paths(), self.layout_cache)
+        print(f"Data dictionary: {len(layouts)} copybooks, {compiled} compiled, "
+              f"{len(layouts) - compiled} from cache")
+        return DataDictionary(layouts)
+    
+    def render_cache_key(self, content):
+        """Cache key: document text, markdown2 version, extras and this generator's source"""
+        return RenderCache.make_key(content, markdown2.__version__,
+                                    ','.join(self.MARKDOWN_EXTRAS), GENERATOR_DIGEST)
+    
+    def lookup_renders(self, markdown_docs):
+        """Return (cache keys, cached results) with None for every cache miss"""
+        if self.render_cache is None:
+            return [None] * len(markdown_docs), [None] * len(markdown_docs)
+        keys = [self.render_cache_key(content) for content in markdown_docs]
+        return keys, [self.render_cache.get(key) for key in keys]
+    
+    def store_render(self, key, result):
+        """Save a freshly converted document in the render cache"""
+        if self.render_cache is not None:
+            self.render_cache.put(key, *result)
+    
+    def convert_documents(self, documents, workers=None):
+        """Convert each markdown document to (html, mermaid diagrams), in document order
+        
+        Documents found in the render cache are reused. With workers set, the
+        remaining independent conversions run in a process pool; results are
+        still returned in document order.
+        """
+        markdown_docs = [content for kind, name, content in documents if kind != 'diagram']
+        keys, results = self.lookup_renders(markdown_docs)
+        todo = [n for n, result in enumerate(results) if result is None]
+        
+        if workers and todo:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                fresh = list(pool.map(convert_markdown, [markdown_docs[n] for n in todo]))
+        else:
+            fresh = [self.process_markdown_content(markdown_docs[n]) for n in todo]
+        
+        for n, result in zip(todo, fresh):
+            results[n] = result
+            self.store_render(keys[n], result)
+        
+        results = iter(results)
+        return [None if kind == 'diagram' else next(results)
+                for kind, name, content in documents]
+    
+    def generate_html(self, workers=None):
         """Generate the complete HTML report"""
+        print("Reading documentation files...")
+        documents = self.load_documents()
+        
+        if workers:
+            print(f"Converting markdown documents with {workers} worker processes...")
+        else:
+            print("Converting markdown documents...")
+        converted = self.convert_documents(documents, workers)
+        
+        return self.assemble_html(documents, converted)
+    
+    def check_determinism(self, workers):
+        """Render serially and in parallel and compare the HTML byte for byte"""
+        documents = self.load_documents()
+        
+        # Compare real conversions, not cached ones
+        cache, self.render_cache = self.render_cache, None
+        try:
+            serial = self.assemble_html(documents, self.convert_documents(documents)).encode('utf-8')
+            parallel = self.assemble_html(documents, self.convert_documents(documents, workers)).encode('utf-8')
+        finally:
+            self.render_cache = cache
+        
+        if serial == parallel:
+            print(f"✅ Serial and parallel ({workers} workers) output are identical ({len(serial):,} bytes)")
+            return True
+        
+        offset = next((i for i, (a, b) in enumerate(zip(serial, parallel)) if a != b),
+                      min(len(serial), len(parallel)))
+        print(f"❌ Serial and parallel output differ at byte {offset:,} "
+              f"(serial {len(serial):,} bytes, parallel {len(parallel):,} bytes)")
+        print(f"   serial:   {serial[offset:offset + 80]!r}")
+        print(f"   parallel: {parallel[offset:offset + 80]!r}")
+        return False
+    
+    def assemble_html(self, documents, converted):
+        """Build the report from the documents and their converted results"""
         sections = {
             'main': [],
             'subsystems': [],
@@ -446,70 +418,68 @@ class SubsystemsReportGenerator:
         
         all_content = []
         all_mermaid_diagrams = []
-        
-        file_order = self.get_file_order()
-        
-        # Process main documentation files
-        print("Processing main documentation files...")
-        for filename in file_order['main_docs']:
-            filepath = self.base_path / filename
-            if filepath.exists():
-                content = self.read_file(filepath)
-                section_id = self.create_section_id(filename)
-                title = self.extract_title(content, filename)
+        search_index = SearchIndexBuilder()
+        patterns = self.load_inventory_patterns()
+        program_xref = self.load_program_xref(patterns)
+        change_impact = self.load_change_impact(patterns)
+        data_dictionary = self.load_data_dictionary()
+        
+        for (kind, name, content), result in zip(documents, converted):
+            if kind == 'main':
+                # Main documentation file
+                section_id = self.create_section_id(name)
+                title = self.extract_title(content, name)
                 sections['main'].append((section_id, title))
                 
-                html_content, mermaid_diagrams = self.process_markdown_content(content)
+                html_content, mermaid_diagrams = result
                 all_mermaid_diagrams.extend(mermaid_diagrams)
+                search_index.add_html(html_content, section_id, title)
                 
                 all_content.append(f'''
                 <section id="{section_id}" class="doc-section">
                     <div class="section-header">
                         <h1>{title}</h1>
-                        <div class="section-meta">Source: {filename}</div>
+                        <div class="section-meta">Source: {name}</div>
                     </div>
                     <div class="section-content">
                         {html_content}
                     </div>
                 </section>
                 ''')
-        
-        # Process subsystem specifications
-        print("Processing subsystem specifications...")
-        subsystems_path = self.base_path / "Subsystems"
-        for subsystem in file_order['subsystems']:
-            spec_file = subsystems_path / subsystem / f"{subsystem}_SPECIFICATION.md"
-            if spec_file.exists():
-                content = self.read_file(spec_file)
-                section_id = f"subsystem-{subsystem.lower().replace('_', '-')}"
-                title = self.extract_title(content, spec_file.name)
+            
+            elif kind == 'subsystem':
+                # Subsystem specification
+                section_id = f"subsystem-{name.lower().replace('_', '-')}"
+                title = self.extract_title(content, f"{name}_SPECIFICATION.md")
                 sections['subsystems'].append((section_id, title))
                 
-                html_content, mermaid_diagrams = self.process_markdown_content(content)
+                html_content, mermaid_diagrams = result
                 all_mermaid_diagrams.extend(mermaid_diagrams)
+                if program_xref is not None:
+                    html_content += program_xref.section_html(name)
+                if change_impact is not None:
+                    html_content += change_impact.section_html(name)
+                html_content += data_dictionary.section_html(name)
+                search_index.add_html(html_content, section_id, title)
                 
                 all_content.append(f'''
                 <section id="{section_id}" class="doc-section subsystem-spec">
                     <div class="section-header">
                         <h1>{title}</h1>
-                        <div class="section-meta">Subsystem: {subsystem}</div>
+                        <div class="section-meta">Subsystem: {name}</div>
                     </div>
                     <div class="section-content">
                         {html_content}
                     </div>
                 </section>
                 ''')
-        
-        # Process diagram files
-        print("Processing architecture diagrams...")
-        diagrams_path = self.base_path / "Diagrams"
-        for diagram_file in file_order['diagrams']:
-            filepath = diagrams_path / diagram_file
-            if filepath.exists():
-                content = self.read_file(filepath)
-                section_id = f"diagram-{self.create_section_id(diagram_file)}"
-                title = self.extract_title(content, diagram_file)
+            
+            else:
+                # Architecture diagram file
+                section_id = f"diagram-{self.create_section_id(name)}"
+                title = self.extract_title(content, name)
                 sections['diagrams'].append((section_id, title))
+                search_index.add_html('', section_id, title)
                 
                 # For pure Mermaid files, wrap the entire content
                 diagram_id = f"mermaid-{section_id}"
@@ -523,7 +493,7 @@ class SubsystemsReportGenerator:
                     </div>
                     <div class="section-content">
                         <div class="mermaid-container">
-                            <div class="mermaid" id="{diagram_id}">{html.escape(content)}</div>
+                            {self.mermaid_div(diagram_id, content)}
                         </div>
                     </div>
                 </section>
@@ -533,11 +503,11 @@ class SubsystemsReportGenerator:
         toc_html = self.generate_toc(sections)
         
         # Create complete HTML document
-        html_template = self.create_html_template(toc_html, all_content)
+        html_template = self.create_html_template(toc_html, all_content, search_index)
         
         return html_template
     
-    def create_html_template(self, toc_html, all_content):
+    def create_html_template(self, toc_html, all_content, search_index):
         """Create the HTML template with styles"""
         return f'''
 <!DOCTYPE html>
@@ -765,6 +735,58 @@ class SubsystemsReportGenerator:
             border-bottom: none;
         }}
         
+        /* Program Cross-Reference */
+        .xref-table td {{
+            vertical-align: top;
+            padding: 0.6rem 0.9rem;
+            font-size: 0.85rem;
+        }}
+        
+        .xref-path {{
+            color: #888;
+            font-size: 0.75rem;
+        }}
+        
+        .xref-external {{
+            font-weight: 600;
+            color: #764ba2;
+        }}
+        
+        .xref-unresolved {{
+            color: #999;
+            font-style: italic;
+        }}
+        
+        .impact-layers li {{
+            margin-bottom: 0.4rem;
+            line-height: 1.8;
+        }}
+        
+        /* Data Dictionary */
+        .layout-table td {{
+            padding: 0.3rem 0.9rem;
+            font-size: 0.8rem;
+        }}
+        
+        .layout-number, .layout-level {{
+            text-align: right;
+            font-variant-numeric: tabular-nums;
+        }}
+        
+        .layout-group td {{
+            background-color: #f3f0fa;
+            font-weight: 600;
+        }}
+        
+        .layout-redefines td {{
+            color: #999;
+        }}
+        
+        .layout-note {{
+            font-size: 0.75rem;
+            font-style: italic;
+        }}
+        
         /* Code Blocks */
         pre {{
             background-color: var(--code-background);
@@ -799,6 +821,11 @@ class SubsystemsReportGenerator:
             min-height: 200px;
         }}
         
+        /* Diagram source stays hidden until it is rendered (or fails to) */
+        .mermaid:not([data-processed]):not(.mermaid-error) {{
+            color: transparent;
+        }}
+        
         .mermaid-container {{
             background: #f8f9fa;
             border-radius: 8px;
@@ -922,6 +949,8 @@ class SubsystemsReportGenerator:
             border: 1px solid #90caf9;
             white-space: nowrap;
         }}
+        
+        {SEARCH_CSS}
     </style>
 </head>
 <body>
@@ -946,41 +975,105 @@ class SubsystemsReportGenerator:
         </main>
     </div>
     
+    {search_script(search_index)}
     <script>
         // Initialize Mermaid with custom theme
-        mermaid.initialize({{ 
-            theme: 'default',
-            themeVariables: {{
-                primaryColor: '#2c3e50',
-                primaryTextColor: '#fff',
-                primaryBorderColor: '#7C0000',
-                lineColor: '#5D5D5D',
-                secondaryColor: '#3498db',
-                tertiaryColor: '#e74c3c',
-                background: '#fff',
-                mainBkg: '#4a9eff',
-                secondBkg: '#00d4ff',
-                tertiaryBkg: '#4ecdc4'
-            }},
-            flowchart: {{
-                useMaxWidth: true,
-                htmlLabels: true,
-                curve: 'basis',
-                padding: 20
-            }},
-            sequence: {{
-                diagramMarginX: 50,
-                diagramMarginY: 10,
-                boxTextMargin: 5,
-                noteMargin: 10,
-                messageMargin: 35
+        if (window.mermaid) {{
+            mermaid.initialize({self.mermaid_config_js()});
+        }}
+        
+        // Render diagrams lazily as they approach the viewport, a few at a
+        // time, reusing SVG rendered earlier in this browser session
+        const MAX_CONCURRENT_RENDERS = {self.MERMAID_RENDER_CONCURRENCY};
+        const SVG_CACHE_PREFIX = 'acas-mermaid:';
+        const renderQueue = [];
+        let activeRenders = 0;
+        // Identical diagrams share a hash; number each render so concurrent
+        // renders of the same diagram never use the same element id
+        let renderCount = 0;
+        // Click handlers and links are bound by bindFunctions after each
+        // render, so diagrams with them never use the session cache
+        const INTERACTIVE_RE = /^\\s*(?:click|link|callback)\\s/m;
+        
+        function cachedSvg(hash) {{
+            try {{
+                return sessionStorage.getItem(SVG_CACHE_PREFIX + hash);
+            }} catch (e) {{
+                return null;
             }}
-        }});
+        }}
         
-        // Render all Mermaid diagrams
-        document.addEventListener('DOMContentLoaded', function() {{
-            mermaid.init();
-        }});
+        function storeSvg(hash, svg) {{
+            try {{
+                sessionStorage.setItem(SVG_CACHE_PREFIX + hash, svg);
+            }} catch (e) {{
+                // Storage full or disabled: the diagram just renders again next time
+            }}
+        }}
+        
+        function showDiagram(element, svg) {{
+            element.innerHTML = svg;
+            element.setAttribute('data-processed', 'true');
+        }}
+        
+        async function renderDiagram(element) {{
+            const hash = element.dataset.diagramHash;
+            const source = element.textContent;
+            try {{
+                const {{ svg, bindFunctions }} = await mermaid.render(`mermaid-svg-${{hash}}-${{renderCount++}}`, source);
+                showDiagram(element, svg);
+                if (bindFunctions) {{
+                    bindFunctions(element);
+                }}
+                if (!INTERACTIVE_RE.test(source)) {{
+                    storeSvg(hash, svg);
+                }}
+            }} catch (error) {{
+                element.classList.add('mermaid-error');
+                console.error(`Mermaid diagram ${{element.id}} failed to render`, error);
+            }}
+        }}
+        
+        function pumpRenderQueue() {{
+            while (activeRenders < MAX_CONCURRENT_RENDERS && renderQueue.length > 0) {{
+                const element = renderQueue.shift();
+                activeRenders++;
+                renderDiagram(element).finally(() => {{
+                    activeRenders--;
+                    // Yield to the browser between renders
+                    setTimeout(pumpRenderQueue, 0);
+                }});
+            }}
+        }}
+        
+        function requestRender(element) {{
+            const svg = INTERACTIVE_RE.test(element.textContent) ? null : cachedSvg(element.dataset.diagramHash);
+            if (svg !== null) {{
+                showDiagram(element, svg);
+                return;
+            }}
+            renderQueue.push(element);
+            pumpRenderQueue();
+        }}
+        
+        // Diagrams pre-rendered at build time are already marked processed
+        const diagrams = document.querySelectorAll('.mermaid[data-diagram-hash]:not([data-processed])');
+        if (!window.mermaid) {{
+            // Offline without pre-rendered SVG: show the diagram source
+            diagrams.forEach(element => element.classList.add('mermaid-error'));
+        }} else if ('IntersectionObserver' in window) {{
+            const diagramObserver = new IntersectionObserver(entries => {{
+                entries.forEach(entry => {{
+                    if (entry.isIntersecting) {{
+                        diagramObserver.unobserve(entry.target);
+                        requestRender(entry.target);
+                    }}
+                }});
+            }}, {{ rootMargin: '200px 0px' }});
+            diagrams.forEach(element => diagramObserver.observe(element));
+        }} else {{
+            diagrams.forEach(requestRender);
+        }}
         
         // Add active section highlighting in TOC
         const mainContent = document.querySelector('.main-content');
@@ -1008,7 +1101,29 @@ class SubsystemsReportGenerator:
 </html>
         '''
     
-    def generate_report(self):
+    def mermaid_config_js(self):
+        """MERMAID_CONFIG as a JavaScript object literal for the template"""
+        return json.dumps(self.MERMAID_CONFIG, indent=4).replace('\n', '\n' + ' ' * 12)
+    
+    def prerender_mermaid(self, html_content):
+        """Inline build-time SVG for the diagrams, when a Mermaid renderer is installed"""
+        prerenderer = make_prerenderer(self.MERMAID_CONFIG, str(self.base_path / SVG_CACHE_DIR))
+        if prerenderer is None:
+            return html_content
+        print("Pre-rendering Mermaid diagrams...")
+        html_content = prerenderer.prerender_html(html_content)
+        print(f"Mermaid SVG cache: {prerenderer.stats()}")
+        return html_content
+    
+    def write_report(self, html_content):
+        """Write the generated HTML to the output file"""
+        if self.prerender_diagrams:
+            html_content = self.prerender_mermaid(html_content)
+        print(f"Writing output to {self.output_file}...")
+        with open(self.output_file, 'w', encoding='utf-8') as f:
+            f.write(html_content)
+    
+    def generate_report(self, workers=None):
         """Main method to generate the complete report"""
         print("ACAS Subsystems Documentation Report Generator")
         print("=" * 50)
@@ -1018,16 +1133,16 @@ class SubsystemsReportGenerator:
         
         try:
             print("Generating HTML report with visual diagrams...")
-            html_content = self.generate_html()
+            html_content = self.generate_html(workers)
             
-            print(f"Writing output to {self.output_file}...")
-            with open(self.output_file, 'w', encoding='utf-8') as f:
-                f.write(html_content)
+            self.write_report(html_content)
             
             print("\n✅ Report generated successfully!")
             print(f"📄 Output file: {self.output_file}")
             print(f"📏 File size: {os.path.getsize(self.output_file) / 1024:.2f} KB")
             print("\n🌐 Open the HTML file in a web browser to view the complete documentation.")
+            if self.render_cache is not None:
+                print(f"🗄️  Render cache: {self.render_cache.stats()}")
             print("📊 ASCII art diagrams have been converted to visual Mermaid diagrams!")
             
         except Exception as e:
@@ -1035,6 +1150,61 @@ class SubsystemsReportGenerator:
             raise
 
 
+def convert_markdown(content):
+    """Convert one markdown document; run in build_docs.py worker processes"""
+    return SubsystemsReportGenerator().process_markdown_content(content)
+
+
+def plan_build():
+    """Return (jobs, finish) for build_docs.py
+
+    jobs lists the (function name, args) conversions for documents missing
+    from the render cache, in document order; finish takes their results in
+    the same order and writes the report.
+    The visual report is written next to the standard one rather than over it.
+    """
+    generator = SubsystemsReportGenerator("ACAS_Subsystems_Report_Visual.html", cache_file=RENDER_CACHE_FILE,
+                                          prerender_diagrams=prerender_enabled())
+    documents = generator.load_documents()
+    markdown_docs = [content for kind, name, content in documents if kind != 'diagram']
+    keys, results = generator.lookup_renders(markdown_docs)
+    todo = [n for n, result in enumerate(results) if result is None]
+    jobs = [('convert_markdown', (markdown_docs[n],)) for n in todo]
+    
+    def finish(fresh):
+        for n, result in zip(todo, fresh):
+            results[n] = result
+            generator.store_render(keys[n], result)
+        converted = iter(results)
+        converted = [None if kind == 'diagram' else next(converted)
+                     for kind, name, content in documents]
+        generator.write_report(generator.assemble_html(documents, converted))
+        print(f"Render cache: {generator.render_cache.stats()}")
+        return generator.output_file
+    
+    return jobs, finish
+
+
 if __name__ == "__main__":
-    generator = SubsystemsReportGenerator()
-    generator.generate_report()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--parallel', action='store_true',
+                        help='convert the markdown documents in a process pool')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help='worker processes for --parallel (default: number of CPUs)')
+    parser.add_argument('--check-determinism', action='store_true',
+                        help='render serially and in parallel, compare the HTML and exit')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='convert every document and re-read the COBOL analysis and copybooks instead of using the caches')
+    parser.add_argument('--cache-max-mb', type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                        help='render cache size limit before LRU eviction (default: %(default)s MB)')
+    parser.add_argument('--prerender-diagrams', action='store_true', default=prerender_enabled(),
+                        help='render Mermaid diagrams to inline SVG at build time (needs mmdc)')
+    args = parser.parse_args()
+    
+    generator = SubsystemsReportGenerator(cache_file=None if args.no_cache else RENDER_CACHE_FILE,
+                                          prerender_diagrams=args.prerender_diagrams)
+    if generator.render_cache is not None:
+        generator.render_cache.max_bytes = args.cache_max_mb * 1024 * 1024
+    if args.check_determinism:
+        sys.exit(0 if generator.check_determinism(max(args.workers, 2)) else 1)
+    generator.generate_report(args.workers if args.parallel else None)
\ No newline at end of file
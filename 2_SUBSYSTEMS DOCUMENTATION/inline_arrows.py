@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Rewrite inline "A → B" flows in rendered HTML as styled spans.
+
+A streaming html.parser pass copies the markup through unchanged and runs the
+arrow pattern once over each text run between tags. Text inside <pre>, <code>,
+<script>, <style> and Mermaid diagram divs is left alone, so code samples and
+diagram sources keep their arrows.
+"""
+
+import re
+from html.parser import HTMLParser
+
+ARROW_RE = re.compile(r'(\w+(?:_\w+)?)\s*→\s*(\w+(?:_\w+)?)')
+
+# Elements whose text is copied verbatim
+PROTECTED_TAGS = frozenset(('pre', 'code', 'script', 'style'))
+
+def replace_arrow(match):
+    """Styled span that looks like a flow"""
+    return f'<span class="inline-flow">{match.group(1)} ➔ {match.group(2)}</span>'
+
+def is_protected(tag, attrs):
+    """True for elements whose text must not be rewritten"""
+    if tag in PROTECTED_TAGS:
+        return True
+    if tag == 'div':
+        for name, value in attrs:
+            if name == 'class' and value and 'mermaid' in value.split():
+                return True
+    return False
+
+class InlineArrowRewriter(HTMLParser):
+    """Copies HTML through, rewriting arrows in unprotected text.
+
+    Feed it the document in one piece or in chunks; the rewritten HTML
+    collects in `pieces`. The handlers only classify each construct: its
+    bytes are copied from the input in updatepos(), which HTMLParser calls
+    with the span of every construct it consumes, so tags, comments,
+    declarations and references come out exactly as written.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.pieces = []
+        self.text = []
+        self.protected_tag = None
+        self.protected_depth = 0
+        self.in_text = False
+
+    def flush_text(self):
+        """Emit the pending text run, rewritten unless protected"""
+        if not self.text:
+            return
+        text = ''.join(self.text)
+        self.text = []
+        if self.protected_tag is None and '→' in text:
+            text = ARROW_RE.sub(replace_arrow, text)
+        self.pieces.append(text)
+
+    def updatepos(self, i, j):
+        if i < j:
+            span = self.rawdata[i:j]
+            if self.in_text:
+                self.text.append(span)
+            else:
+                self.flush_text()
+                self.pieces.append(span)
+        self.in_text = False
+        return super().updatepos(i, j)
+
+    def handle_starttag(self, tag, attrs):
+        # Text before the tag is judged by the protection outside it
+        self.flush_text()
+        if self.protected_tag is None:
+            if is_protected(tag, attrs):
+                self.protected_tag = tag
+                self.protected_depth = 1
+        elif tag == self.protected_tag:
+            self.protected_depth += 1
+
+    def handle_endtag(self, tag):
+        self.flush_text()
+        if tag == self.protected_tag:
+            self.protected_depth -= 1
+            if self.protected_depth == 0:
+                self.protected_tag = None
+
+    # Text, including entity and character references, is buffered so each
+    # run between two tags is matched once, as a whole
+    def handle_data(self, data):
+        self.in_text = True
+
+    def handle_entityref(self, name):
+        self.in_text = True
+
+    def handle_charref(self, name):
+        self.in_text = True
+
+    def close(self):
+        super().close()
+        self.flush_text()
+
+def convert_inline_arrows(html_content):
+    """Rewrite inline arrows outside code and diagrams in one parser pass"""
+    last_arrow = html_content.rfind('→')
+    if last_arrow < 0:
+        return html_content
+
+    # Nothing after the text run holding the last arrow can change, so the
+    # parser stops at the next tag and the tail is copied through as is
+    cut = html_content.find('<', last_arrow)
+    if cut < 0:
+        cut = len(html_content)
+    rewriter = InlineArrowRewriter()
+    rewriter.feed(html_content[:cut])
+    rewriter.flush_text()
+    rewriter.pieces.append(rewriter.rawdata)
+    rewriter.pieces.append(html_content[cut:])
+    return ''.join(rewriter.pieces)
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Measure time-to-interactive of generated subsystem reports in a headless browser.
+
+Each report is served from a local HTTP server and loaded in headless Chromium,
+first in a fresh browser context (cold: nothing in sessionStorage), then
+reloaded in the same tab (warm: rendered diagrams come from sessionStorage).
+Time-to-interactive is when the last long main-thread task (over 50 ms) ended,
+or DOMContentLoaded if that is later, once the page has stayed quiet for the
+quiet window.
+
+Requires Playwright:
+    pip install playwright && playwright install chromium
+
+Usage:
+    python3 measure_report_tti.py [REPORT.html ...] [--runs N] [--mermaid-js PATH]
+"""
+
+import argparse
+import functools
+import http.server
+import os
+import statistics
+import threading
+
+MERMAID_CDN = "https://cdn.jsdelivr.net/npm/mermaid@10/dist/mermaid.min.js"
+
+# Installed before any page script runs, so no long task is missed
+LONG_TASK_OBSERVER = """
+window.__longTaskEnds = [];
+new PerformanceObserver(list => {
+    for (const entry of list.getEntries()) {
+        window.__longTaskEnds.push(entry.startTime + entry.duration);
+    }
+}).observe({type: 'longtask', buffered: true});
+"""
+
+PAGE_STATE = """() => ({
+    now: performance.now(),
+    lastBusy: Math.max(
+        performance.getEntriesByType('navigation')[0].domContentLoadedEventEnd,
+        ...window.__longTaskEnds),
+    diagrams: document.querySelectorAll('.mermaid').length,
+    rendered: document.querySelectorAll('.mermaid svg').length
+})"""
+
+class QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+def start_server(directory):
+    """Serve directory on a free localhost port from a background thread"""
+    handler = functools.partial(QuietHandler, directory=directory)
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def wait_until_interactive(page, quiet_ms, timeout_ms):
+    """Poll until no long task has ended for quiet_ms; return the page state"""
+    while True:
+        state = page.evaluate(PAGE_STATE)
+        if state['now'] - state['lastBusy'] >= quiet_ms or state['now'] >= timeout_ms:
+            return state
+        page.wait_for_timeout(100)
+
+def measure(browser, url, args):
+    """One cold load and one warm reload of url: [(tti ms, rendered, diagrams), ...]"""
+    context = browser.new_context(viewport={'width': 1400, 'height': 900})
+    if args.mermaid_js:
+        context.route(MERMAID_CDN, lambda route: route.fulfill(
+            path=args.mermaid_js, content_type='application/javascript'))
+    context.add_init_script(LONG_TASK_OBSERVER)
+    page = context.new_page()
+
+    results = []
+    for load in (lambda: page.goto(url, wait_until='load'),
+                 lambda: page.reload(wait_until='load')):
+        load()
+        state = wait_until_interactive(page, args.quiet_window, args.timeout * 1000)
+        results.append((state['lastBusy'], state['rendered'], state['diagrams']))
+    context.close()
+    return results
+
+def main():
+    """Load each report --runs times and print median cold and warm TTI"""
+    parser = argparse.ArgumentParser(description='Measure report time-to-interactive in headless Chromium')
+    parser.add_argument('reports', nargs='*', default=['ACAS_Subsystems_Report.html'],
+                        help='generated HTML reports (default: ACAS_Subsystems_Report.html)')
+    parser.add_argument('--runs', type=int, default=3,
+                        help='page loads per report, the median is reported (default: 3)')
+    parser.add_argument('--quiet-window', type=int, default=2000,
+                        help='ms without long tasks before the page counts as interactive (default: 2000)')
+    parser.add_argument('--timeout', type=int, default=60,
+                        help='give up waiting for a quiet window after this many seconds (default: 60)')
+    parser.add_argument('--mermaid-js', metavar='PATH',
+                        help='serve this local mermaid.min.js instead of fetching it from the CDN')
+    args = parser.parse_args()
+
+    try:
+        from playwright.sync_api import sync_playwright
+    except ImportError:
+        parser.error('Playwright is required: pip install playwright && playwright install chromium')
+
+    with sync_playwright() as playwright:
+        browser = playwright.chromium.launch(headless=True)
+        try:
+            for report in args.reports:
+                path = os.path.abspath(report)
+                server = start_server(os.path.dirname(path))
+                url = f"http://127.0.0.1:{server.server_port}/{os.path.basename(path)}"
+                try:
+                    runs = [measure(browser, url, args) for _ in range(args.runs)]
+                finally:
+                    server.shutdown()
+
+                print(report)
+                for n, name in enumerate(('cold', 'warm')):
+                    tti = statistics.median(run[n][0] for run in runs)
+                    rendered, diagrams = runs[-1][n][1:]
+                    print(f"  {name}: TTI {tti:8.1f} ms, {rendered}/{diagrams} diagrams rendered")
+        finally:
+            browser.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Program cross-reference sections for the subsystem reports.
+
+The COBOL parser's structure-analysis.json is streamed one program at a time
+with an incremental JSON reader, never loaded whole, into dict-of-arrays
+indexes: program -> callers, copybook -> users, file -> programs. Programs
+are assigned to subsystems from the program tables and lists in
+01_SUBSYSTEM_INVENTORY.md, and each subsystem gets an HTML cross-reference
+section.
+
+The indexes are pickled next to the report, stamped with the analysis file's
+size and modification time, so builds skip re-parsing until it changes.
+"""
+
+import hashlib
+import html
+import json
+import os
+import pickle
+import re
+from array import array
+from fnmatch import fnmatchcase
+
+ANALYSIS_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                             '0_COBOL PARSER', 'analysis-results', 'structure-analysis.json')
+INVENTORY_DOC = '01_SUBSYSTEM_INVENTORY.md'
+XREF_CACHE_FILE = '.xref_cache.pickle'
+# Per-program line counts with copybooks expanded (cobol_scanner.load_line_counts)
+LINE_COUNT_CACHE_FILE = '.line_count_cache.pickle'
+CHUNK_SIZE = 64 * 1024
+
+# Any edit to this module invalidates pickled indexes
+with open(__file__, 'rb') as _source:
+    MODULE_DIGEST = hashlib.sha256(_source.read()).hexdigest()
+
+JSON_WHITESPACE = ' \t\r\n'
+
+class JsonStream:
+    """Incremental reader over a JSON text file: values are decoded one at a
+    time from a buffer that holds little more than the current value"""
+
+    def __init__(self, f, chunk_size=CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def fill(self):
+        """Append the next chunk, dropping consumed text; False at end of file"""
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        if self.pos > self.chunk_size:
+            self.buffer = self.buffer[self.pos:]
+            self.pos = 0
+        self.buffer += chunk
+        return True
+
+    def peek(self):
+        """Skip whitespace and return the next character ('' at end of file)"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in JSON_WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                return ''
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"expected {char!r} in {getattr(self.f, 'name', 'JSON stream')}")
+        self.pos += 1
+
+    def accept(self, char):
+        """Consume char if it comes next"""
+        if self.peek() == char:
+            self.pos += 1
+            return True
+        return False
+
+    def value(self):
+        """Decode the next complete value"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                # Most likely cut off at the end of the buffer
+                if not self.fill():
+                    raise
+                continue
+            # A number running into the end of the buffer may not be complete
+            if end == len(self.buffer) and not self.eof and self.fill():
+                continue
+            self.pos = end
+            return value
+
+def iter_array_items(f, keys):
+    """Yield (key, element) for the elements of the top-level arrays named in
+    keys, one element at a time; other members are decoded and dropped"""
+    stream = JsonStream(f)
+    stream.expect('{')
+    if stream.accept('}'):
+        return
+    while True:
+        key = stream.value()
+        stream.expect(':')
+        if key in keys and stream.accept('['):
+            if not stream.accept(']'):
+                while True:
+                    yield key, stream.value()
+                    if not stream.accept(','):
+                        break
+                stream.expect(']')
+        else:
+            stream.value()
+        if not stream.accept(','):
+            break
+    stream.expect('}')
+
+def program_name(filename):
+    """Program name as other programs CALL it: the file stem, lower case"""
+    return os.path.splitext(filename)[0].lower()
+
+def file_name(entry):
+    """File name from a SELECT clause or FD entry"""
+    return entry[len('SELECT '):].upper() if entry.upper().startswith('SELECT ') else entry.upper()
+
+class ProgramIndex:
+    """Cross-reference indexes over the analysed programs
+
+    Programs are numbered in file order. Per-program facts are lists indexed
+    by that number; the reverse indexes map a name to an array of numbers.
+    """
+
+    def __init__(self):
+        self.names = []
+        self.paths = []
+        self.calls = []
+        self.copies = []
+        self.files = []
+        self.paragraphs = array('i')
+        self.by_name = {}
+        self.callers = {}
+
+    @staticmethod
+    def add_to(index, key, number):
+        numbers = index.get(key)
+        if numbers is None:
+            numbers = index[key] = array('i')
+        if not numbers or numbers[-1] != number:
+            numbers.append(number)
+
+    def add_program(self, program):
+        """Index one program entry of structure-analysis.json"""
+        number = len(self.names)
+        name = program_name(program['name'])
+        calls = tuple(dict.fromkeys(call.lower() for call in program.get('calls', ())))
+        copies = tuple(dict.fromkeys(copy.upper() for copy in program.get('copies', ())))
+        files = tuple(dict.fromkeys(file_name(entry) for entry in program.get('files', ())))
+        self.names.append(name)
+        self.paths.append(program.get('path', program['name']))
+        self.calls.append(calls)
+        self.copies.append(copies)
+        self.files.append(files)
+        self.paragraphs.append(len(program.get('paragraphs', ())))
+
+        self.add_to(self.by_name, name, number)
+        for call in calls:
+            self.add_to(self.callers, call, number)
+
+    def matching(self, patterns):
+        """Numbers of the programs whose names match any of the glob patterns"""
+        return [number for number, name in enumerate(self.names)
+                if any(fnmatchcase(name, pattern) for pattern in patterns)]
+
+def parse_index(analysis_path):
+    """Build a ProgramIndex by streaming the analysis file"""
+    index = ProgramIndex()
+    with open(analysis_path, 'r', encoding='utf-8') as f:
+        for _, program in iter_array_items(f, ('programs',)):
+            index.add_program(program)
+    return index
+
+def load_index(analysis_path=ANALYSIS_FILE, cache_path=None):
+    """Return (ProgramIndex, True if it came from the pickle cache)"""
+    stat = os.stat(analysis_path)
+    stamp = (MODULE_DIGEST, os.path.abspath(analysis_path), stat.st_size, stat.st_mtime_ns)
+    if cache_path is not None:
+        try:
+            with open(cache_path, 'rb') as f:
+                cached_stamp, index = pickle.load(f)
+            if cached_stamp == stamp:
+                return index, True
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+            pass
+
+    index = parse_index(analysis_path)
+    if cache_path is not None:
+        # Write then rename, so an interrupted build never leaves half a pickle
+        temp_path = f'{cache_path}.tmp'
+        with open(temp_path, 'wb') as f:
+            pickle.dump((stamp, index), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, cache_path)
+    return index, False
+
+SUBSYSTEM_HEADING_RE = re.compile(r'^###\s+\d+\.\s+([A-Z_]+)\s+-')
+BOLD_LABEL_RE = re.compile(r'^\*\*([^*]+)\*\*')
+PAREN_LIST_RE = re.compile(r'\(([^)]*)\)')
+PROGRAM_RANGE_RE = re.compile(r'^([a-z]+)(\d+)-\1(\d+)$')
+PROGRAM_NAME_RE = re.compile(r'^\*?[a-z][\w-]*$')
+
+def list_patterns(text):
+    """Glob patterns from a parenthesised program list such as
+    "(gl090, irs040)", "(acas001-acas032)" or "(*LD, *UNL programs)" """
+    patterns = []
+    for piece in text.split(','):
+        words = piece.split()
+        if not words:
+            continue
+        word = words[0].lower()
+        match = PROGRAM_RANGE_RE.match(word)
+        if match:
+            prefix, first, last = match.groups()
+            patterns.extend(f'{prefix}{n:0{len(first)}d}' for n in range(int(first), int(last) + 1))
+        elif PROGRAM_NAME_RE.match(word):
+            patterns.append(word)
+    return patterns
+
+def inventory_patterns(inventory_text):
+    """{subsystem code: program name glob patterns} from the subsystem inventory
+
+    Programs come from the first column of Program/Module tables under each
+    "### N. CODE - Name" heading, and from parenthesised lists in the bullets
+    under its **...Programs** and **Components** labels.
+    """
+    patterns = {}
+    current = None
+    label = ''
+    in_table = False
+    for line in inventory_text.split('\n'):
+        stripped = line.strip()
+        if stripped.startswith('#'):
+            match = SUBSYSTEM_HEADING_RE.match(stripped)
+            current = match.group(1) if match else None
+            if current:
+                patterns.setdefault(current, [])
+            label = ''
+            in_table = False
+            continue
+        if current is None:
+            continue
+        if stripped.startswith('|'):
+            cells = [cell.strip() for cell in stripped.strip('|').split('|')]
+            if cells[0] in ('Program', 'Module'):
+                in_table = True
+            elif in_table and not set(cells[0]) <= set('-: '):
+                patterns[current].extend(list_patterns(cells[0]))
+            continue
+        in_table = False
+        match = BOLD_LABEL_RE.match(stripped)
+        if match:
+            label = match.group(1)
+        elif stripped.startswith('- ') and ('Programs' in label or label == 'Components'):
+            for group in PAREN_LIST_RE.findall(stripped):
+                patterns[current].extend(list_patterns(group))
+    return {code: list(dict.fromkeys(found)) for code, found in patterns.items()}
+
+class ProgramXref:
+    """Renders per-subsystem cross-reference sections from a ProgramIndex"""
+
+    def __init__(self, index, patterns, line_counts=None):
+        """line_counts: {source path: (code lines, code lines with copybooks expanded)}"""
+        self.index = index
+        self.members = {code: index.matching(found) for code, found in patterns.items()}
+        self.line_counts = line_counts or {}
+
+    def program_links(self, names, inside):
+        """Comma-separated program names; those outside the subsystem marked"""
+        links = []
+        for name in names:
+            if name not in self.index.by_name:
+                links.append(f'<span class="xref-unresolved">{html.escape(name.upper())}</span>')
+            elif name in inside:
+                links.append(f'<code>{html.escape(name)}</code>')
+            else:
+                links.append(f'<code class="xref-external">{html.escape(name)}</code>')
+        return ', '.join(links) or '—'
+
+    def section_html(self, code):
+        """Cross-reference section for one subsystem ('' if it has no analysed programs)"""
+        members = self.members.get(code)
+        if not members:
+            return ''
+        index = self.index
+        inside = {index.names[number] for number in members}
+        outside_callers = set()
+        outside_callees = set()
+        own_lines = expanded_lines = 0
+        rows = []
+        for number in members:
+            name = index.names[number]
+            callers = list(dict.fromkeys(index.names[caller] for caller in index.callers.get(name, ())))
+            outside_callers.update(caller for caller in callers if caller not in inside)
+            outside_callees.update(call for call in index.calls[number]
+                                   if call in index.by_name and call not in inside)
+            copies = ', '.join(html.escape(copy) for copy in index.copies[number]) or '—'
+            files = ', '.join(html.escape(entry) for entry in index.files[number]) or '—'
+            counts = self.line_counts.get(index.paths[number])
+            if counts:
+                own_lines += counts[0]
+                expanded_lines += counts[1]
+                lines = f'{counts[0]:,} / {counts[1]:,}'
+            else:
+                lines = '—'
+            rows.append(f'<tr><td><code>{html.escape(name)}</code>'
+                        f'<div class="xref-path">{html.escape(index.paths[number])}</div></td>'
+                        f'<td>{self.program_links(index.calls[number], inside)}</td>'
+                        f'<td>{self.program_links(callers, inside)}</td>'
+                        f'<td>{copies}</td><td>{files}</td><td>{index.paragraphs[number]}</td>'
+                        f'<td>{lines}</td></tr>')
+
+        anchor = 'xref-' + code.lower().replace('_', '-')
+        lines_text = ''
+        if expanded_lines:
+            lines_text = (f'\nWith their COPY statements expanded they span {expanded_lines:,} code lines, '
+                          f'{own_lines:,} of them in their own source.')
+        return f'''
+<div class="xref-section">
+<h2 id="{anchor}">Program Cross-Reference</h2>
+<p>{len(members)} analysed programs belong to {code} in the subsystem inventory.
+{len(outside_callers)} programs in other subsystems call into it; it calls
+{len(outside_callees)} programs outside it (<code class="xref-external">marked</code>).{lines_text}</p>
+<table class="xref-table">
+<thead><tr><th>Program</th><th>Calls</th><th>Called by</th><th>Copybooks</th><th>Files</th><th>Paragraphs</th><th>Code lines / with copybooks</th></tr></thead>
+<tbody>
+{chr(10).join(rows)}
+</tbody>
+</table>
+</div>
+'''
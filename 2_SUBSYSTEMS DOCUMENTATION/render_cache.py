@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Persistent, content-addressed cache for rendered markdown documents.
+
+Entries live in a small SQLite database keyed by a SHA-256 over the
+document text plus everything else that changes the rendering (markdown2
+version, extras list, generator source). Least recently used entries are
+evicted once the stored HTML grows past a size limit.
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+class RenderCache:
+    def __init__(self, path, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.connection = sqlite3.connect(str(path))
+        self.connection.execute('''
+            CREATE TABLE IF NOT EXISTS renders (
+                key TEXT PRIMARY KEY,
+                html TEXT NOT NULL,
+                diagrams TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL
+            )
+        ''')
+        self.connection.commit()
+
+    @staticmethod
+    def make_key(content, *salt):
+        """SHA-256 over the salt values and the document content"""
+        digest = hashlib.sha256()
+        for value in salt:
+            digest.update(str(value).encode('utf-8'))
+            digest.update(b'\0')
+        digest.update(content.encode('utf-8'))
+        return digest.hexdigest()
+
+    def get(self, key):
+        """Return the cached (html, mermaid diagrams) for key, or None"""
+        row = self.connection.execute(
+            'SELECT html, diagrams FROM renders WHERE key = ?', (key,)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.connection.execute(
+            'UPDATE renders SET last_used = ? WHERE key = ?', (time.time(), key)
+        )
+        self.connection.commit()
+        html_content, diagrams = row
+        return html_content, [tuple(diagram) for diagram in json.loads(diagrams)]
+
+    def put(self, key, html_content, diagrams):
+        """Store a rendered document, then evict down to the size limit"""
+        size = len(html_content.encode('utf-8'))
+        self.connection.execute(
+            'INSERT OR REPLACE INTO renders (key, html, diagrams, size, last_used) '
+            'VALUES (?, ?, ?, ?, ?)',
+            (key, html_content, json.dumps(diagrams), size, time.time())
+        )
+        self.evict()
+        self.connection.commit()
+
+    def evict(self):
+        """Drop least recently used entries while the cache is over its limit"""
+        total = self.connection.execute(
+            'SELECT COALESCE(SUM(size), 0) FROM renders'
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        oldest = self.connection.execute(
+            'SELECT key, size FROM renders ORDER BY last_used'
+        ).fetchall()
+        for key, size in oldest:
+            if total <= self.max_bytes:
+                break
+            self.connection.execute('DELETE FROM renders WHERE key = ?', (key,))
+            total -= size
+            self.evictions += 1
+
+    def stats(self):
+        """One-line hit/miss summary"""
+        lookups = self.hits + self.misses
+        rate = f" ({self.hits / lookups:.0%} hit rate)" if lookups else ""
+        return f"{self.hits} hits, {self.misses} misses, {self.evictions} evictions{rate}"
+
+    def close(self):
+        self.connection.close()
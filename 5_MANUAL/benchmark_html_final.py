@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the Technical Manual HTML generator
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+import generate_html_final as gen
+
+def load_body(scale):
+    """Read MANUAL.md (without frontmatter) repeated `scale` times"""
+    text = gen.read_manual()
+    if text.startswith('---'):
+        end = text.find('---', 3)
+        text = text[end + 3:].strip()
+    return '\n\n'.join([text] * scale)
+
+def best_of(func, repeat):
+    """Return the best wall-clock time of `repeat` calls to func"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def bench_engine(args):
+    """Single-pass engine vs the legacy multi-pass converter"""
+    text = load_body(args.scale)
+    size_mb = len(text.encode('utf-8')) / 1024 / 1024
+    print(f"MANUAL.md x{args.scale}: {size_mb:.2f} MB")
+
+    legacy = best_of(lambda: gen.render_markdown_legacy(text), args.repeat)
+    engine = best_of(lambda: gen.render_markdown(text), args.repeat)
+    print(f"  legacy multi-pass : {legacy:8.3f} s ({size_mb / legacy:6.2f} MB/s)")
+    print(f"  single-pass engine: {engine:8.3f} s ({size_mb / engine:6.2f} MB/s)")
+    print(f"  speedup           : {legacy / engine:8.1f}x")
+
+def code_block_document(blocks):
+    """Build a synthetic manual section holding `blocks` COBOL snippets"""
+    parts = []
+    for n in range(blocks):
+        parts.append(f"### Program {n}\n\nThe snippet below shows paragraph AA{n:04d}.\n")
+        if n % 10 == 0:
+            parts.append(f"```mermaid\nflowchart TD\n    A{n} --> B{n}\n```\n")
+        else:
+            parts.append(f"```cobol\n       AA{n:04d}-MAIN.\n"
+                         f"           MOVE WS-KEY TO ST-KEY.\n"
+                         f"           PERFORM BB{n:04d}-READ.\n```\n")
+    return '\n'.join(parts)
+
+def replace_per_block(html_text, code_blocks):
+    """The previous restoration strategy: one str.replace per placeholder"""
+    for block_type, content, placeholder in code_blocks:
+        if block_type == 'mermaid':
+            replacement = f'<div class="mermaid">\n{content}\n</div>'
+        else:
+            lang, code = content
+            replacement = f'<pre><code class="language-{lang}">{gen.html_escape(code)}</code></pre>'
+        html_text = html_text.replace(placeholder, replacement)
+    return html_text
+
+def bench_placeholders(args):
+    """Placeholder restoration with 5,000 code blocks"""
+    text = code_block_document(args.blocks)
+    processed, code_blocks = gen.preprocess_markdown(text)
+    print(f"{len(code_blocks)} code blocks, {len(processed) / 1024:.0f} KB after extraction")
+
+    per_block = best_of(lambda: replace_per_block(processed, code_blocks), args.repeat)
+    one_scan = best_of(lambda: gen.restore_code_blocks(processed, code_blocks), args.repeat)
+    assert replace_per_block(processed, code_blocks) == gen.restore_code_blocks(processed, code_blocks)
+    print(f"  str.replace per block: {per_block:8.3f} s")
+    print(f"  single alternation   : {one_scan:8.3f} s")
+    print(f"  speedup              : {per_block / one_scan:8.1f}x")
+
+    legacy = best_of(lambda: gen.render_markdown_legacy(text), args.repeat)
+    print(f"  full legacy render   : {legacy:8.3f} s")
+
+DATA_DICTIONARY = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..',
+                               '1_FUNCTIONAL DOCUMENTATION', '03_ACAS_Data_Dictionary.md')
+
+def four_pass_inline(text):
+    """The previous inline transformer: four uncompiled re.sub calls"""
+    text = re.sub(r'\*\*([^*]+)\*\*', r'<strong>\1</strong>', text)
+    text = re.sub(r'\*([^*\n]+)\*', r'<em>\1</em>', text)
+    text = re.sub(r'`([^`]+)`', r'<code>\1</code>', text)
+    text = re.sub(r'\[([^\]]+)\]\(([^)]+)\)', r'<a href="\2">\1</a>', text)
+    return text
+
+def bench_inline(args):
+    """Inline transformer over the Data Dictionary table cells"""
+    with open(DATA_DICTIONARY, 'r', encoding='utf-8') as f:
+        cells = [cell for line in f if '|' in line for cell in gen.split_table_row(line)]
+    cells = cells * args.inline_repeat
+    print(f"{len(cells)} cells ({len(set(cells))} distinct)")
+
+    uncached = gen.process_inline_elements.__wrapped__
+    assert [four_pass_inline(c) for c in cells] == [uncached(c) for c in cells]
+
+    def cached():
+        gen.process_inline_elements.cache_clear()
+        for cell in cells:
+            gen.process_inline_elements(cell)
+
+    four_pass = best_of(lambda: [four_pass_inline(c) for c in cells], args.repeat)
+    one_scan = best_of(lambda: [uncached(c) for c in cells], args.repeat)
+    memo = best_of(cached, args.repeat)
+    info = gen.process_inline_elements.cache_info()
+    print(f"  four re.sub calls    : {four_pass * 1000:8.2f} ms")
+    print(f"  compiled single scan : {one_scan * 1000:8.2f} ms")
+    print(f"  single scan + LRU    : {memo * 1000:8.2f} ms "
+          f"({info.hits / (info.hits + info.misses):.0%} hit rate)")
+
+def bench_table(args):
+    """Rendering a 50,000-row program catalog table"""
+    lines = ['| Program | Module | Calls | Status |', '|:--------|:------:|------:|--------|']
+    for n in range(args.rows):
+        lines.append(f"| sl{n:05d} | Sales | {n % 17} | {'Yes' if n % 3 else '**No**'} |")
+    text = '\n'.join(lines)
+    print(f"{args.rows} rows, {len(text) / 1024:.0f} KB")
+
+    legacy = best_of(lambda: gen.parse_table(lines, 0), args.repeat)
+    engine = best_of(lambda: gen.render_markdown(text), args.repeat)
+    html_table, consumed = gen.parse_table(lines, 0)
+    assert consumed == len(lines) and html_table == gen.render_markdown(text)[0]
+    print(f"  parse_table       : {legacy:8.3f} s")
+    print(f"  single-pass engine: {engine:8.3f} s")
+
+def bench_incremental(args):
+    """Cold, no-op and one-section rebuilds through the section cache"""
+    # Give every copy its own headings so sections do not deduplicate
+    body = load_body(1)
+    parts = [body.replace('\n## ', f'\n## Part {n}: ') for n in range(args.scale)]
+    lines = '\n\n'.join(parts).split('\n')
+    size_mb = sum(len(line) + 1 for line in lines) / 1024 / 1024
+    print(f"MANUAL.md x{args.scale} with unique headings: {size_mb:.2f} MB")
+
+    def build(cache_dir, source):
+        cache = gen.SectionCache(cache_dir)
+        start = time.perf_counter()
+        for _ in gen.iter_html_manual(lambda: source, cache=cache):
+            pass
+        return time.perf_counter() - start, cache
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cold, cache = build(cache_dir, lines)
+        print(f"  cold build        : {cold:8.3f} s ({cache.misses} sections rendered)")
+        warm, cache = build(cache_dir, lines)
+        print(f"  no-op rebuild     : {warm:8.3f} s ({cache.hits} reused, {cache.misses} rendered)")
+        edited = list(lines)
+        edited[len(edited) // 2] += ' (edited)'
+        dirty, cache = build(cache_dir, edited)
+        print(f"  one section edited: {dirty:8.3f} s ({cache.hits} reused, {cache.misses} rendered)")
+
+# Child-process snippets for the RSS benchmark; each renders MANUAL.md from
+# the current directory and prints its peak RSS in KB (ru_maxrss on Linux)
+RSS_WHOLE_STRING = """
+import resource, sys
+sys.path.insert(0, sys.argv[1])
+import generate_html_final as gen
+html_content = gen.create_html_manual(gen.read_manual())
+with open('out.html', 'w', encoding='utf-8') as f:
+    f.write(html_content)
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+RSS_STREAMING = """
+import resource, sys
+sys.path.insert(0, sys.argv[1])
+import generate_html_final as gen
+with open('out.html', 'w', encoding='utf-8', buffering=gen.OUTPUT_BUFFER_SIZE) as f:
+    for chunk in gen.iter_html_manual(gen.read_manual_lines):
+        f.write(chunk)
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+def peak_rss(snippet, workdir):
+    """Run a render snippet in a fresh interpreter; return (peak RSS MB, seconds)"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-c', snippet, here], cwd=workdir,
+                            capture_output=True, text=True, check=True)
+    elapsed = time.perf_counter() - start
+    return int(result.stdout.strip()) / 1024, elapsed
+
+def bench_rss(args):
+    """Peak RSS of whole-string vs streaming output on a synthetic manual"""
+    section = load_body(1)
+    section_bytes = len(section.encode('utf-8'))
+    copies = max(1, round(args.rss_mb * 1024 * 1024 / section_bytes))
+
+    with tempfile.TemporaryDirectory() as workdir:
+        with open(os.path.join(workdir, 'MANUAL.md'), 'w', encoding='utf-8') as f:
+            f.write('---\ntitle: Synthetic manual\n---\n\n')
+            for _ in range(copies):
+                f.write(section)
+                f.write('\n\n')
+        size_mb = os.path.getsize(os.path.join(workdir, 'MANUAL.md')) / 1024 / 1024
+        print(f"synthetic manual: {size_mb:.1f} MB")
+
+        whole_rss, whole_time = peak_rss(RSS_WHOLE_STRING, workdir)
+        stream_rss, stream_time = peak_rss(RSS_STREAMING, workdir)
+        print(f"  whole-document string: peak RSS {whole_rss:8.1f} MB ({whole_time:.1f} s)")
+        print(f"  streaming chunks     : peak RSS {stream_rss:8.1f} MB ({stream_time:.1f} s)")
+
+BENCHMARKS = {
+    'engine': bench_engine,
+    'placeholders': bench_placeholders,
+    'rss': bench_rss,
+    'inline': bench_inline,
+    'table': bench_table,
+    'incremental': bench_incremental,
+}
+
+def main():
+    """Run the selected benchmarks"""
+    parser = argparse.ArgumentParser(description='Benchmark generate_html_final.py')
+    parser.add_argument('names', nargs='*', metavar='name',
+                        help=f"benchmarks to run: {', '.join(BENCHMARKS)} (default: all)")
+    parser.add_argument('--scale', type=int, default=100,
+                        help='how many times to repeat MANUAL.md (default: 100)')
+    parser.add_argument('--blocks', type=int, default=5000,
+                        help='code blocks in the placeholder benchmark (default: 5000)')
+    parser.add_argument('--rows', type=int, default=50000,
+                        help='rows in the table benchmark (default: 50000)')
+    parser.add_argument('--rss-mb', type=int, default=20,
+                        help='size of the synthetic manual for the RSS benchmark (default: 20)')
+    parser.add_argument('--inline-repeat', type=int, default=10,
+                        help='times to repeat the Data Dictionary cells (default: 10)')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='timing repetitions, best is reported (default: 3)')
+    args = parser.parse_args()
+    for name in args.names:
+        if name not in BENCHMARKS:
+            parser.error(f"unknown benchmark: {name}")
+
+    for name in args.names or BENCHMARKS:
+        print(f"== {name}: {BENCHMARKS[name].__doc__}")
+        BENCHMARKS[name](args)
+        print()
+
+if __name__ == '__main__':
+    main()
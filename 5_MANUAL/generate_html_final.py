@@ -3,14 +3,52 @@
 Final version of HTML generator with complete markdown parsing
 """
 
+import argparse
+import functools
+import hashlib
+import io
+import json
+import os
 import re
+import sys
 from datetime import datetime
 
+# Build helpers shared with the other generators live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from mermaid_svg import SVG_CACHE_DIR, drop_mermaid_script, make_prerenderer, prerender_enabled
+from search_index import SEARCH_BOX, SEARCH_CSS, SearchIndexBuilder, search_script
+
+OUTPUT_BUFFER_SIZE = 1024 * 1024
+CACHE_DIR = '.manual_cache'
+CACHE_VERSION = 1
+# Names of SectionCache entry files: <sha256 key>.html and <sha256 key>.toc.json
+CACHE_ENTRY_RE = re.compile(r'^([0-9a-f]{64})\.(?:html|toc\.json)$')
+
+MERMAID_CONFIG = {
+    'startOnLoad': True,
+    'theme': 'default',
+    'themeVariables': {
+        'primaryColor': '#0969da',
+        'primaryTextColor': '#fff',
+        'primaryBorderColor': '#0550ae',
+        'lineColor': '#57606a',
+        'secondaryColor': '#f6f8fa',
+        'tertiaryColor': '#dbeafe'
+    }
+}
+
 def read_manual():
     """Read the markdown manual"""
     with open('MANUAL.md', 'r', encoding='utf-8') as f:
         return f.read()
 
+def read_manual_lines():
+    """Yield the markdown manual line by line without loading it whole"""
+    with open('MANUAL.md', 'r', encoding='utf-8') as f:
+        yield from f
+
+PLACEHOLDER_RE = re.compile(r'\[\[(?:CODE|MERMAID)_\d+\]\]')
+
 def preprocess_markdown(text):
     """Preprocess markdown to handle special cases"""
     # First, extract all code blocks to protect them
@@ -97,21 +135,47 @@ def convert_lists(text):
     
     return '\n'.join(output)
 
+INLINE_CACHE_SIZE = 8192
+
+# One alternation for every inline element; bold is tried before italic so
+# `**x**` is never read as two italics, and code spans stay literal
+INLINE_RE = re.compile(
+    r'\*\*(?P<strong>[^*]+)\*\*'
+    r'|\*(?!\s)(?P<em>[^*\n]+)\*'
+    r'|`(?P<code>[^`]+)`'
+    r'|\[(?P<label>[^\]]+)\]\((?P<href>[^)]+)\)'
+)
+EMPHASIS_RE = re.compile(r'\*\*([^*]+)\*\*|\*([^*]+)\*')
+MARKUP_RE = re.compile(r'\*\*([^*]+)\*\*|\*([^*]+)\*|`([^`]+)`')
+ANCHOR_DROP_RE = re.compile(r'[^\w\s-]')
+ANCHOR_SPACE_RE = re.compile(r'\s+')
+
+def render_inline_match(match):
+    """Render one inline element found by INLINE_RE"""
+    kind = match.lastgroup
+    if kind == 'strong':
+        return f'<strong>{process_inline_elements(match.group(kind))}</strong>'
+    if kind == 'em':
+        return f'<em>{process_inline_elements(match.group(kind))}</em>'
+    if kind == 'code':
+        return f'<code>{match.group(kind)}</code>'
+    return f'<a href="{match.group("href")}">{process_inline_elements(match.group("label"))}</a>'
+
+@functools.lru_cache(maxsize=INLINE_CACHE_SIZE)
 def process_inline_elements(text):
-    """Process inline markdown elements"""
-    # Bold
-    text = re.sub(r'\*\*([^*]+)\*\*', r'<strong>\1</strong>', text)
-    
-    # Italic
-    text = re.sub(r'\*([^*\n]+)\*', r'<em>\1</em>', text)
-    
-    # Inline code
-    text = re.sub(r'`([^`]+)`', r'<code>\1</code>', text)
-    
-    # Links
-    text = re.sub(r'\[([^\]]+)\]\(([^)]+)\)', r'<a href="\2">\1</a>', text)
-    
-    return text
+    """Process inline markdown elements (bold, italic, code, links) in one scan"""
+    # Most table cells and plain lines carry no markup at all
+    if '*' not in text and '`' not in text and '[' not in text:
+        return text
+    return INLINE_RE.sub(render_inline_match, text)
+
+def strip_emphasis(text):
+    """Remove bold/italic markers, keeping their text"""
+    return EMPHASIS_RE.sub(lambda match: match.group(match.lastindex), text)
+
+def strip_inline_markup(text):
+    """Remove bold/italic/code markers, keeping their text"""
+    return MARKUP_RE.sub(lambda match: match.group(match.lastindex), text)
 
 def convert_markdown_to_html(text, code_blocks):
     """Convert markdown to HTML with better handling"""
@@ -162,12 +226,10 @@ def convert_markdown_to_html(text, code_blocks):
                 output.append('</p>')
                 in_paragraph = False
                 
-            table_html = parse_table(lines, i)
+            table_html, consumed = parse_table(lines, i)
             if table_html:
                 output.append(table_html)
-                # Skip table lines
-                while i < len(lines) and '|' in lines[i]:
-                    i += 1
+                i += consumed
                 continue
         
         # Code block placeholders
@@ -205,6 +267,11 @@ def convert_markdown_to_html(text, code_blocks):
     html_text = convert_lists(html_text)
     
     # Restore code blocks
+    return restore_code_blocks(html_text, code_blocks)
+
+def restore_code_blocks(html_text, code_blocks):
+    """Swap every code/Mermaid placeholder for its HTML in one scan"""
+    replacements = {}
     for block_type, content, placeholder in code_blocks:
         if block_type == 'mermaid':
             replacement = f'<div class="mermaid">\n{content}\n</div>'
@@ -214,10 +281,17 @@ def convert_markdown_to_html(text, code_blocks):
                 replacement = f'<pre><code class="language-{lang}">{html_escape(code)}</code></pre>'
             else:
                 replacement = f'<pre><code>{html_escape(code)}</code></pre>'
-        
-        html_text = html_text.replace(placeholder, replacement)
+        replacements[placeholder] = replacement
     
-    return html_text
+    if not replacements:
+        return html_text
+    
+    # One compiled alternation over the document instead of one
+    # str.replace per block (which is O(blocks x document size))
+    return PLACEHOLDER_RE.sub(
+        lambda match: replacements.get(match.group(0), match.group(0)),
+        html_text
+    )
 
 def html_escape(text):
     """Escape HTML special characters"""
@@ -231,57 +305,87 @@ def html_escape(text):
 def create_anchor(text):
     """Create URL-safe anchor from text"""
     # Remove markdown formatting
-    text = re.sub(r'\*\*([^*]+)\*\*', r'\1', text)
-    text = re.sub(r'\*([^*]+)\*', r'\1', text)
-    text = re.sub(r'`([^`]+)`', r'\1', text)
+    text = strip_inline_markup(text)
     
     # Convert to lowercase and replace spaces
     anchor = text.lower()
-    anchor = re.sub(r'[^\w\s-]', '', anchor)
-    anchor = re.sub(r'\s+', '-', anchor)
+    anchor = ANCHOR_DROP_RE.sub('', anchor)
+    anchor = ANCHOR_SPACE_RE.sub('-', anchor)
     anchor = anchor.strip('-')
     
     return anchor
 
+def split_table_row(line):
+    """Split a markdown table row into stripped, non-empty cells"""
+    return [cell.strip() for cell in line.split('|') if cell.strip()]
+
+def table_alignments(separator_line):
+    """Read :---, :---: and ---: markers from a table separator row"""
+    aligns = []
+    for marker in split_table_row(separator_line):
+        if marker.startswith(':') and marker.endswith(':'):
+            aligns.append('center')
+        elif marker.endswith(':'):
+            aligns.append('right')
+        elif marker.startswith(':'):
+            aligns.append('left')
+        else:
+            aligns.append(None)
+    return aligns
+
+def append_table_html(headers, aligns, rows, out):
+    """Append the HTML for a table to the out list"""
+    # Precompute the opening tags once per column
+    th_tags = []
+    td_tags = []
+    for align in aligns:
+        style = f' style="text-align: {align}"' if align else ''
+        th_tags.append(f'<th{style}>')
+        td_tags.append(f'<td{style}>')
+    columns = len(aligns)
+    
+    out.append('<table>\n<thead>\n<tr>')
+    for n, header in enumerate(headers):
+        tag = th_tags[n] if n < columns else '<th>'
+        out.append(f'{tag}{process_inline_elements(header)}</th>')
+    out.append('</tr>\n</thead>\n<tbody>')
+    for cells in rows:
+        out.append('<tr>')
+        for n, cell in enumerate(cells):
+            tag = td_tags[n] if n < columns else '<td>'
+            out.append(f'{tag}{process_inline_elements(cell)}</td>')
+        out.append('</tr>')
+    out.append('</tbody>\n</table>')
+
 def parse_table(lines, start_index):
-    """Parse markdown table"""
+    """Parse markdown table, returning (html, number of lines consumed)"""
     if start_index >= len(lines):
-        return None
+        return None, 0
         
     header_line = lines[start_index]
     if '|' not in header_line:
-        return None
+        return None, 0
         
     # Check for separator line
     if start_index + 1 >= len(lines) or '|' not in lines[start_index + 1]:
-        return None
+        return None, 0
         
     separator_line = lines[start_index + 1]
-    if not re.search(r'-+', separator_line):
-        return None
-    
-    # Parse headers
-    headers = [cell.strip() for cell in header_line.split('|') if cell.strip()]
-    
-    # Start table
-    html = '<table>\n<thead>\n<tr>\n'
-    for header in headers:
-        html += f'<th>{process_inline_elements(header)}</th>\n'
-    html += '</tr>\n</thead>\n<tbody>\n'
+    if '-' not in separator_line:
+        return None, 0
     
     # Parse body rows
+    rows = []
     i = start_index + 2
     while i < len(lines) and '|' in lines[i]:
-        cells = [cell.strip() for cell in lines[i].split('|') if cell.strip()]
+        cells = split_table_row(lines[i])
         if cells:
-            html += '<tr>\n'
-            for cell in cells:
-                html += f'<td>{process_inline_elements(cell)}</td>\n'
-            html += '</tr>\n'
+            rows.append(cells)
         i += 1
     
-    html += '</tbody>\n</table>'
-    return html
+    out = []
+    append_table_html(split_table_row(header_line), table_alignments(separator_line), rows, out)
+    return '\n'.join(out), i - start_index
 
 def extract_toc(content):
     """Extract table of contents from markdown"""
@@ -293,8 +397,7 @@ def extract_toc(content):
                 level = len(match.group(1))
                 text = match.group(2)
                 # Remove markdown formatting
-                clean_text = re.sub(r'\*\*([^*]+)\*\*', r'\1', text)
-                clean_text = re.sub(r'\*([^*]+)\*', r'\1', clean_text)
+                clean_text = strip_emphasis(text)
                 anchor = create_anchor(text)
                 toc.append((level, clean_text, anchor))
     return toc
@@ -326,25 +429,284 @@ def build_toc_html(toc):
     
     return '\n'.join(html)
 
-def create_html_manual(markdown_content):
-    """Create complete HTML manual"""
-    # Remove YAML frontmatter
-    if markdown_content.startswith('---'):
-        end = markdown_content.find('---', 3)
-        markdown_content = markdown_content[end + 3:].strip()
-    
-    # Extract TOC
-    toc = extract_toc(markdown_content)
-    toc_html = build_toc_html(toc)
-    
-    # Preprocess to extract code blocks
-    processed_content, code_blocks = preprocess_markdown(markdown_content)
-    
-    # Convert to HTML
-    html_content = convert_markdown_to_html(processed_content, code_blocks)
-    
-    # Create complete HTML
-    html_template = f'''<!DOCTYPE html>
+# ---------------------------------------------------------------------------
+# Single-pass engine: the block tokenizer reads each line exactly once and
+# builds a small AST, then the emitter walks that AST once to produce HTML
+# and the TOC entries. The multi-pass functions above remain available as
+# the legacy renderer (--legacy).
+# ---------------------------------------------------------------------------
+
+HEADER_RE = re.compile(r'^(#{1,6})\s+(.+)$')
+LIST_ITEM_RE = re.compile(r'^(\s*)([-*+]|\d+\.)\s+(.+)$')
+FENCE_RE = re.compile(r'^```(\w*)\s*$')
+
+class Heading:
+    __slots__ = ('level', 'text')
+
+    def __init__(self, level, text):
+        self.level = level
+        self.text = text
+
+class Paragraph:
+    __slots__ = ('lines',)
+
+    def __init__(self, lines):
+        self.lines = lines
+
+class Citation:
+    __slots__ = ('text',)
+
+    def __init__(self, text):
+        self.text = text
+
+class Rule:
+    __slots__ = ()
+
+class CodeBlock:
+    __slots__ = ('lang', 'code')
+
+    def __init__(self, lang, code):
+        self.lang = lang
+        self.code = code
+
+class MermaidBlock:
+    __slots__ = ('code',)
+
+    def __init__(self, code):
+        self.code = code
+
+class Table:
+    __slots__ = ('header', 'aligns', 'rows')
+
+    def __init__(self, header, aligns, rows):
+        self.header = header
+        self.aligns = aligns
+        self.rows = rows
+
+class ListBlock:
+    __slots__ = ('ordered', 'items')
+
+    def __init__(self, ordered):
+        self.ordered = ordered
+        self.items = []
+
+class ListItem:
+    __slots__ = ('text', 'children')
+
+    def __init__(self, text):
+        self.text = text
+        self.children = []
+
+def is_citation(stripped):
+    """Check if a text line is a source citation / emphasised note"""
+    return stripped.startswith('*Source:') or (stripped.startswith('*') and stripped.endswith('*'))
+
+def with_lookahead(lines):
+    """Yield (line, next_line) pairs; next_line is None for the last line"""
+    lines = iter(lines)
+    current = next(lines, None)
+    while current is not None:
+        following = next(lines, None)
+        yield current, following
+        current = following
+
+def iter_blocks(lines):
+    """Tokenize markdown lines into top-level AST nodes in a single pass"""
+    paragraph = None
+    fence = None          # (lang, code lines) while inside a ``` block
+    table = None
+    skip_separator = False
+    list_stack = []       # [(indent level, ListBlock)]; blank lines keep it open
+
+    def close_list():
+        root = list_stack[0][1]
+        list_stack.clear()
+        return root
+
+    for line, next_line in with_lookahead(lines):
+        line = line.rstrip('\r\n')
+
+        # Inside a fenced block everything is literal until the closing fence
+        if fence is not None:
+            if line.lstrip().startswith('```'):
+                lang, code = fence
+                code = '\n'.join(code) + '\n' if code else ''
+                yield MermaidBlock(code) if lang == 'mermaid' else CodeBlock(lang, code)
+                fence = None
+            else:
+                fence[1].append(line)
+            continue
+
+        if skip_separator:
+            skip_separator = False
+            continue
+
+        if table is not None:
+            if '|' in line:
+                cells = split_table_row(line)
+                if cells:
+                    table.rows.append(cells)
+                continue
+            yield table
+            table = None
+
+        stripped = line.strip()
+
+        if not stripped:
+            if paragraph is not None:
+                yield paragraph
+                paragraph = None
+            continue
+
+        list_match = LIST_ITEM_RE.match(line)
+        if list_match and not line.startswith('#') and stripped not in ('---', '***', '___'):
+            if paragraph is not None:
+                yield paragraph
+                paragraph = None
+            level = len(list_match.group(1)) // 2
+            ordered = list_match.group(2)[-1] == '.'
+            item = ListItem(list_match.group(3))
+            if not list_stack:
+                list_stack.append((level, ListBlock(ordered)))
+            else:
+                while len(list_stack) > 1 and list_stack[-1][0] > level:
+                    list_stack.pop()
+                if list_stack[-1][0] < level:
+                    nested = ListBlock(ordered)
+                    list_stack[-1][1].items[-1].children.append(nested)
+                    list_stack.append((level, nested))
+            list_stack[-1][1].items.append(item)
+            continue
+
+        # Any other non-blank line ends an open list
+        if list_stack:
+            yield close_list()
+
+        if line.startswith('#'):
+            match = HEADER_RE.match(line)
+            if match:
+                if paragraph is not None:
+                    yield paragraph
+                    paragraph = None
+                yield Heading(len(match.group(1)), match.group(2))
+                continue
+
+        if stripped in ('---', '***', '___'):
+            if paragraph is not None:
+                yield paragraph
+                paragraph = None
+            yield Rule()
+            continue
+
+        if ('|' in line and next_line is not None
+                and '|' in next_line and '-' in next_line):
+            if paragraph is not None:
+                yield paragraph
+                paragraph = None
+            table = Table(split_table_row(line), table_alignments(next_line), [])
+            skip_separator = True
+            continue
+
+        fence_match = FENCE_RE.match(stripped)
+        if fence_match:
+            if paragraph is not None:
+                yield paragraph
+                paragraph = None
+            fence = (fence_match.group(1), [])
+            continue
+
+        if is_citation(stripped):
+            if paragraph is not None:
+                yield paragraph
+                paragraph = None
+            yield Citation(line)
+            continue
+
+        if paragraph is None:
+            paragraph = Paragraph([])
+        paragraph.lines.append(line)
+
+    # Flush whatever is still open at end of input
+    if fence is not None:
+        lang, code = fence
+        code = '\n'.join(code) + '\n' if code else ''
+        yield MermaidBlock(code) if lang == 'mermaid' else CodeBlock(lang, code)
+    if table is not None:
+        yield table
+    if paragraph is not None:
+        yield paragraph
+    if list_stack:
+        yield close_list()
+
+def parse_markdown(text):
+    """Parse markdown text into a list of top-level AST nodes"""
+    return list(iter_blocks(text.split('\n')))
+
+def toc_entry(level, text):
+    """Build a (level, clean text, anchor) TOC entry for a heading"""
+    return (level, strip_emphasis(text), create_anchor(text))
+
+def emit_list(block, out):
+    """Emit a (possibly nested) list node"""
+    tag = 'ol' if block.ordered else 'ul'
+    out.append(f'<{tag}>')
+    for item in block.items:
+        if item.children:
+            out.append(f'<li>{process_inline_elements(item.text)}')
+            for child in item.children:
+                emit_list(child, out)
+            out.append('</li>')
+        else:
+            out.append(f'<li>{process_inline_elements(item.text)}</li>')
+    out.append(f'</{tag}>')
+
+def render_blocks(blocks, toc=None):
+    """Walk the AST once, returning HTML and filling toc with level 1-3 headings"""
+    out = []
+    for block in blocks:
+        kind = type(block)
+        if kind is Paragraph:
+            out.append('<p>')
+            out.extend(process_inline_elements(line) for line in block.lines)
+            out.append('</p>')
+        elif kind is Heading:
+            anchor = create_anchor(block.text)
+            content = process_inline_elements(block.text)
+            out.append(f'<h{block.level} id="{anchor}">{content}</h{block.level}>')
+            if toc is not None and block.level <= 3:
+                toc.append(toc_entry(block.level, block.text))
+        elif kind is ListBlock:
+            emit_list(block, out)
+        elif kind is Table:
+            append_table_html(block.header, block.aligns, block.rows, out)
+        elif kind is CodeBlock:
+            if block.lang:
+                out.append(f'<pre><code class="language-{block.lang}">{html_escape(block.code)}</code></pre>')
+            else:
+                out.append(f'<pre><code>{html_escape(block.code)}</code></pre>')
+        elif kind is MermaidBlock:
+            out.append(f'<div class="mermaid">\n{block.code}\n</div>')
+        elif kind is Citation:
+            out.append(f'<p class="source-citation">{process_inline_elements(block.text)}</p>')
+        elif kind is Rule:
+            out.append('<hr>')
+    return '\n'.join(out)
+
+def render_markdown(text):
+    """Render markdown to (html, toc) with the single-pass engine"""
+    toc = []
+    html_content = render_blocks(iter_blocks(text.split('\n')), toc)
+    return html_content, toc
+
+def render_markdown_legacy(text):
+    """Render markdown to (html, toc) with the original multi-pass pipeline"""
+    toc = extract_toc(text)
+    processed_content, code_blocks = preprocess_markdown(text)
+    return convert_markdown_to_html(processed_content, code_blocks), toc
+
+def page_head():
+    """HTML from the doctype through the sidebar heading"""
+    return f'''<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -684,13 +1046,20 @@ def create_html_manual(markdown_content):
         .language-sql {{
             color: #0550ae;
         }}
+        
+        {SEARCH_CSS}
     </style>
 </head>
 <body>
     <div class="container">
         <nav class="sidebar">
             <h2>📚 Table of Contents</h2>
-            {toc_html}
+            {SEARCH_BOX}
+            '''
+
+def page_body_open():
+    """HTML closing the sidebar and opening the main content area"""
+    return f'''
         </nav>
         
         <main class="main-content">
@@ -701,25 +1070,25 @@ def create_html_manual(markdown_content):
             </header>
             
             <div class="content">
-                {html_content}
+                '''
+
+def mermaid_config_js():
+    """MERMAID_CONFIG as a JavaScript object literal for the page scripts"""
+    return json.dumps(MERMAID_CONFIG, indent=4).replace('\n', '\n' + ' ' * 12)
+
+def page_footer(search_index):
+    """HTML closing the content area, with the search index and page scripts"""
+    return f'''
             </div>
         </main>
     </div>
     
+    {search_script(search_index)}
     <script>
-        // Initialize Mermaid
-        mermaid.initialize({{
-            startOnLoad: true,
-            theme: 'default',
-            themeVariables: {{
-                primaryColor: '#0969da',
-                primaryTextColor: '#fff',
-                primaryBorderColor: '#0550ae',
-                lineColor: '#57606a',
-                secondaryColor: '#f6f8fa',
-                tertiaryColor: '#dbeafe'
-            }}
-        }});
+        // Initialize Mermaid (absent offline; pre-rendered diagrams don't need it)
+        if (window.mermaid) {{
+            mermaid.initialize({mermaid_config_js()});
+        }}
         
         // Smooth scrolling
         document.querySelectorAll('.sidebar a').forEach(anchor => {{
@@ -776,24 +1145,300 @@ def create_html_manual(markdown_content):
     </script>
 </body>
 </html>'''
-    
-    return html_template
+
+def strip_frontmatter(lines):
+    """Skip a leading YAML frontmatter block and the blank lines after it"""
+    lines = iter(lines)
+    first = next(lines, None)
+    if first is None:
+        return
+    if first.startswith('---'):
+        for line in lines:
+            if line.startswith('---'):
+                break
+        for line in lines:
+            if line.strip():
+                yield line
+                break
+    else:
+        yield first
+    yield from lines
+
+def iter_sections(blocks):
+    """Group AST nodes into sections that start at # / ## headings"""
+    section = []
+    for block in blocks:
+        if type(block) is Heading and block.level <= 2 and section:
+            yield section
+            section = []
+        section.append(block)
+    if section:
+        yield section
+
+def iter_raw_sections(lines):
+    """Split markdown lines into raw sections at # / ## headings outside code fences
+
+    The boundaries match iter_sections, so each raw section renders on its own
+    exactly as it would inside the whole document. Headings containing '|'
+    could be read as table rows and are never used as boundaries.
+    """
+    section = []
+    in_fence = False
+    for line in lines:
+        line = line.rstrip('\r\n')
+        if in_fence:
+            if line.lstrip().startswith('```'):
+                in_fence = False
+        elif FENCE_RE.match(line.strip()):
+            in_fence = True
+        elif line.startswith('#') and '|' not in line and section:
+            match = HEADER_RE.match(line)
+            if match and len(match.group(1)) <= 2:
+                yield section
+                section = []
+        section.append(line)
+    if section:
+        yield section
+
+class SectionCache:
+    """On-disk cache of rendered manual sections keyed by content hash
+
+    Each entry is a <key>.html file holding the section's HTML and a
+    <key>.toc.json file holding its TOC entries. Keys mix in a stamp of this
+    generator (CACHE_VERSION plus a digest of this file) so any change to the
+    renderer invalidates everything.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+        with open(__file__, 'rb') as f:
+            source_digest = hashlib.sha256(f.read()).hexdigest()
+        self.stamp = f'{CACHE_VERSION}:{source_digest}\n'.encode('utf-8')
+
+    def key(self, section_lines):
+        """Content hash for a raw section"""
+        digest = hashlib.sha256(self.stamp)
+        for line in section_lines:
+            digest.update(line.encode('utf-8'))
+            digest.update(b'\n')
+        return digest.hexdigest()
+
+    def path(self, key, suffix):
+        """File path for one part of a cache entry"""
+        return os.path.join(self.directory, key + suffix)
+
+    def section_toc(self, key, section_lines):
+        """Return the section's TOC entries, rendering and storing it on a miss"""
+        try:
+            with open(self.path(key, '.toc.json'), 'r', encoding='utf-8') as f:
+                toc = [tuple(entry) for entry in json.load(f)]
+            if os.path.exists(self.path(key, '.html')):
+                self.hits += 1
+                return toc
+        except (OSError, ValueError):
+            pass
+
+        self.misses += 1
+        toc = []
+        html_content = render_blocks(iter_blocks(section_lines), toc)
+        # Write the HTML first; an entry only counts once its TOC file exists
+        with open(self.path(key, '.html'), 'w', encoding='utf-8') as f:
+            f.write(html_content)
+        with open(self.path(key, '.toc.json'), 'w', encoding='utf-8') as f:
+            json.dump(toc, f)
+        return toc
+
+    def section_html(self, key):
+        """Read a stored section's HTML"""
+        with open(self.path(key, '.html'), 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def prune(self, keep):
+        """Delete entries for sections no longer in the manual, leaving
+        anything this cache did not write alone"""
+        for name in os.listdir(self.directory):
+            match = CACHE_ENTRY_RE.match(name)
+            if match is None or match.group(1) in keep:
+                continue
+            path = os.path.join(self.directory, name)
+            if os.path.isfile(path):
+                os.remove(path)
+
+def iter_html_manual(read_lines, legacy=False, cache=None):
+    """Yield the complete HTML manual in chunks: head, TOC, body sections, scripts
+
+    read_lines is a zero-argument callable returning an iterable of markdown
+    lines. It is called twice (once for the TOC, which precedes the body in
+    the page, and once for the body) so that only one rendered section is
+    held in memory at a time. With a SectionCache it is called once: dirty
+    sections are rendered into the cache while the TOC is gathered, then the
+    body is streamed back from the cache. Each body section is added to the
+    search index as it passes; the index is embedded at the end of the page.
+    """
+    search_index = SearchIndexBuilder()
+    if legacy:
+        text = ''.join(strip_frontmatter(read_lines())).strip()
+        html_content, toc = render_markdown_legacy(text)
+        search_index.add_html(html_content)
+        yield page_head()
+        yield build_toc_html(toc)
+        yield page_body_open()
+        yield html_content
+        yield page_footer(search_index)
+        return
+
+    if cache is not None:
+        keys = []
+        toc = []
+        for section_lines in iter_raw_sections(strip_frontmatter(read_lines())):
+            key = cache.key(section_lines)
+            toc.extend(cache.section_toc(key, section_lines))
+            keys.append(key)
+        cache.prune(set(keys))
+
+        yield page_head()
+        yield build_toc_html(toc)
+        del toc
+        yield page_body_open()
+        for n, key in enumerate(keys):
+            if n:
+                yield '\n'
+            html_content = cache.section_html(key)
+            search_index.add_html(html_content)
+            yield html_content
+        yield page_footer(search_index)
+        return
+
+    toc = [toc_entry(block.level, block.text)
+           for block in iter_blocks(strip_frontmatter(read_lines()))
+           if type(block) is Heading and block.level <= 3]
+
+    yield page_head()
+    yield build_toc_html(toc)
+    del toc
+    yield page_body_open()
+    first = True
+    for section in iter_sections(iter_blocks(strip_frontmatter(read_lines()))):
+        if not first:
+            yield '\n'
+        html_content = render_blocks(section)
+        search_index.add_html(html_content)
+        yield html_content
+        first = False
+    yield page_footer(search_index)
+
+def create_html_manual(markdown_content, legacy=False):
+    """Create complete HTML manual"""
+    return ''.join(iter_html_manual(lambda: io.StringIO(markdown_content), legacy))
+
+def render_section(section_lines):
+    """Render one raw section to (html, TOC entries); run in build_docs.py workers"""
+    toc = []
+    return render_blocks(iter_blocks(section_lines), toc), toc
+
+def plan_build():
+    """Return (jobs, finish) for build_docs.py
+
+    jobs renders each raw section independently; finish takes their results
+    in document order and writes the manual.
+    """
+    sections = list(iter_raw_sections(strip_frontmatter(read_manual_lines())))
+    jobs = [('render_section', (section_lines,)) for section_lines in sections]
+
+    def finish(results):
+        toc = [entry for _, entries in results for entry in entries]
+        body = '\n'.join(html_content for html_content, _ in results)
+        search_index = SearchIndexBuilder()
+        search_index.add_html(body)
+        prerenderer = make_prerenderer(MERMAID_CONFIG) if prerender_enabled() else None
+        if prerenderer is not None:
+            body = prerenderer.prerender_html(body)
+            print(f"Mermaid SVG cache: {prerenderer.stats()}")
+        output_file = os.path.abspath('ACAS_Technical_Manual.html')
+        with open(output_file, 'w', encoding='utf-8', buffering=OUTPUT_BUFFER_SIZE) as f:
+            f.write(page_head())
+            f.write(build_toc_html(toc))
+            f.write(page_body_open())
+            f.write(body)
+            f.write(page_footer(search_index))
+        return output_file
+
+    return jobs, finish
 
 def main():
     """Generate the HTML manual"""
-    print("Reading manual...")
-    manual_content = read_manual()
-    
-    print("Generating final HTML with complete markdown parsing...")
-    html_content = create_html_manual(manual_content)
-    
-    print("Writing HTML file...")
+    parser = argparse.ArgumentParser(description='Generate the ACAS Technical Manual HTML')
+    parser.add_argument('--legacy', action='store_true',
+                        help='use the original multi-pass markdown converter')
+    parser.add_argument('--stdout', action='store_true',
+                        help='stream the HTML to standard output instead of a file')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='re-render every section instead of using the section cache')
+    parser.add_argument('--cache-dir', default=CACHE_DIR,
+                        help=f'directory for cached rendered sections (default: {CACHE_DIR})')
+    parser.add_argument('--prerender-diagrams', action='store_true', default=prerender_enabled(),
+                        help='render Mermaid diagrams to inline SVG at build time (needs mmdc)')
+    parser.add_argument('--svg-cache-dir', default=SVG_CACHE_DIR,
+                        help=f'directory for cached diagram SVG (default: {SVG_CACHE_DIR})')
+    args = parser.parse_args()
+
+    # Keep progress messages out of the HTML when streaming to a pipe
+    log = sys.stderr if args.stdout else sys.stdout
+
+    print("Streaming manual...", file=log)
+    print("Generating final HTML with complete markdown parsing...", file=log)
+    cache = None if args.no_cache or args.legacy else SectionCache(args.cache_dir)
+    chunks = iter_html_manual(read_manual_lines, legacy=args.legacy, cache=cache)
+    prerenderer = None
+    if args.prerender_diagrams:
+        prerenderer = make_prerenderer(MERMAID_CONFIG, args.svg_cache_dir,
+                                       log=lambda message: print(message, file=log))
+    if prerenderer is not None:
+        # Render every diagram in one renderer run up front, so the streamed
+        # sections below are served from the SVG cache
+        rendered = prerenderer.render_sources(block.code.strip() for block in
+                                              iter_blocks(strip_frontmatter(read_manual_lines()))
+                                              if type(block) is MermaidBlock)
+        chunks = map(prerenderer.prerender_html, chunks)
+        if None not in rendered.values():
+            # Nothing is left for the browser to render. page_head() streams
+            # as its own chunk, away from the diagrams prerender_html() sees,
+            # so drop the Mermaid script from it here
+            chunks = (drop_mermaid_script(chunk) if not n else chunk for n, chunk in enumerate(chunks))
+
+    if args.stdout:
+        try:
+            for chunk in chunks:
+                sys.stdout.write(chunk)
+            sys.stdout.flush()
+        except BrokenPipeError:
+            # The reader went away early (e.g. piped into head); silence the
+            # interpreter's own flush of stdout at exit
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            return
+        print("Done! HTML manual written to standard output", file=log)
+        report_cache(cache, log, prerenderer)
+        return
+
+    print("Writing HTML file...", file=log)
     output_file = 'ACAS_Technical_Manual.html'
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(html_content)
+    with open(output_file, 'w', encoding='utf-8', buffering=OUTPUT_BUFFER_SIZE) as f:
+        for chunk in chunks:
+            f.write(chunk)
     
-    file_size = len(html_content) / 1024 / 1024
-    print(f"Done! HTML manual created as {output_file} ({file_size:.2f} MB)")
+    file_size = os.path.getsize(output_file) / 1024 / 1024
+    print(f"Done! HTML manual created as {output_file} ({file_size:.2f} MB)", file=log)
+    report_cache(cache, log, prerenderer)
+
+def report_cache(cache, log, prerenderer=None):
+    """Print how many sections came from the section cache"""
+    if cache is not None:
+        print(f"Section cache: {cache.hits} reused, {cache.misses} re-rendered", file=log)
+    if prerenderer is not None:
+        print(f"Mermaid SVG cache: {prerenderer.stats()}", file=log)
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
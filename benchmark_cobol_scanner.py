@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the cobol_scanner package
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+from cobol_scanner.copybook import CopybookExpander
+from cobol_scanner.datafile import DataFile, import_numpy
+from cobol_scanner.layout import RecordDecoder, compile_layouts
+from cobol_scanner.scan import ROOT, build_analysis, find_sources, scan_sources
+
+STOCK_COPYBOOK = os.path.join(ROOT, 'copybooks', 'wsstock.cob')
+# (copybook, field) pairs for the decimal benchmark
+DECIMAL_FIELDS = (
+    ('wsstock.cob', 'Stock-Cost'),
+    ('wssl.cob', 'Sales-Current'),
+    ('wsaudit.cob', 'Audit-Stock-Value-Change'),
+)
+
+def best_of(func, repeat):
+    """Return the best wall-clock time of `repeat` calls to func"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def copy_sources(target):
+    """Copy every COBOL source into target, keeping the layout; return the count"""
+    sources = find_sources(ROOT)
+    for path, kind in sources:
+        destination = os.path.join(target, path)
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        shutil.copy2(os.path.join(ROOT, path), destination)
+    return len(sources)
+
+def bench_full(args):
+    """Full scan with no manifest: serial vs process pool"""
+    count = len(find_sources(ROOT))
+    size = sum(os.path.getsize(os.path.join(ROOT, path)) for path, kind in find_sources(ROOT))
+    print(f"{count} sources, {size / 1024:.0f} KB")
+    for workers in sorted({1, args.workers}):
+        elapsed = best_of(lambda: scan_sources(ROOT, None, workers), args.repeat)
+        print(f"  {workers} worker{'s' if workers > 1 else ' '}: {elapsed * 1000:8.1f} ms")
+    entries = scan_sources(ROOT, None, 1)[0]
+    print(f"  building the analysis JSON: {best_of(lambda: build_analysis(entries), args.repeat) * 1000:.1f} ms")
+
+def bench_rescan(args):
+    """Rescans against the manifest: nothing changed, one file touched, one file edited"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.join(tmp, 'src')
+        copy_sources(root)
+        manifest = os.path.join(tmp, 'manifest.json')
+        scan_sources(root, manifest, 1)
+        target = os.path.join(root, find_sources(root)[0][0])
+
+        def touch():
+            os.utime(target, ns=(time.time_ns(), time.time_ns()))
+            return scan_sources(root, manifest, 1)
+
+        def edit():
+            with open(target, 'a', encoding='utf-8') as f:
+                f.write('*> edited\n')
+            return scan_sources(root, manifest, 1)
+
+        for label, func in (('no change', lambda: scan_sources(root, manifest, 1)),
+                            ('one file touched', touch),
+                            ('one file edited', edit)):
+            counts = func()[1]
+            elapsed = best_of(func, args.repeat)
+            print(f"  {label:<17}: {elapsed * 1000:7.1f} ms "
+                  f"({counts['scanned']} scanned, {counts['rehashed']} rehashed)")
+
+def bench_expand(args):
+    """COPY expansion of every program: one shared expander vs a fresh one per program"""
+    programs = [path for path, kind in find_sources(ROOT) if kind == 'program']
+    counts = CopybookExpander().line_counts(programs)
+    print(f"{len(programs)} programs, {sum(own for own, expanded in counts.values()):,} code lines, "
+          f"{sum(expanded for own, expanded in counts.values()):,} expanded")
+    shared = best_of(lambda: CopybookExpander().line_counts(programs), args.repeat)
+    print(f"  shared expander     : {shared * 1000:8.1f} ms")
+    fresh = best_of(lambda: [CopybookExpander().line_counts([path]) for path in programs], args.repeat)
+    print(f"  expander per program: {fresh * 1000:8.1f} ms")
+
+def peak_memory(func):
+    """Peak bytes Python allocates during func()"""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def synthetic_field(field, count, rng):
+    """(count, length) uint8 matrix of random valid values of one elementary field"""
+    numpy = import_numpy()
+    kind = field.category
+    signed = 'S' in field.expanded_picture
+    negative = rng.random(count) < 0.5 if signed else numpy.zeros(count, dtype=bool)
+    if kind == 'binary' and field.numeric:
+        limit = 10 ** min(field.digits, 18)
+        values = rng.integers(0, limit, count, dtype=numpy.int64)
+        values[negative] *= -1
+        dtype = f"{'>i' if signed else '>u'}{field.length}"
+        return values.astype(dtype).view(numpy.uint8).reshape(count, field.length)
+    if kind == 'packed':
+        nibbles = rng.integers(0, 10, (count, field.length * 2), dtype=numpy.uint8)
+        nibbles[:, -1] = numpy.where(negative, 0xD, 0xC if signed else 0xF)
+        return nibbles[:, 0::2] << 4 | nibbles[:, 1::2]
+    if kind == 'display':
+        digits = rng.integers(ord('0'), ord('9') + 1, (count, field.length), dtype=numpy.uint8)
+        # GnuCOBOL's trailing embedded sign: 0x70 + digit when negative
+        digits[negative, -1] += 0x40
+        return digits
+    if kind == 'alphanumeric':
+        return rng.integers(ord('A'), ord('Z') + 1, (count, field.length), dtype=numpy.uint8)
+    return numpy.full((count, field.length), ord(' '), dtype=numpy.uint8)
+
+def synthetic_records(layout, count, seed=0):
+    """count random records of layout, valid for every field type, as one bytes object"""
+    numpy = import_numpy()
+    rng = numpy.random.default_rng(seed)
+    records = numpy.full((count, layout.size), ord(' '), dtype=numpy.uint8)
+    for field in layout.elementary():
+        if field.category in ('binary', 'packed', 'display', 'alphanumeric'):
+            for offset in field.occurrences:
+                records[:, offset:offset + field.length] = synthetic_field(field, count, rng)
+    return records.tobytes()
+
+def write_records(path, layout, count, chunk=100000):
+    """Write count synthetic records of layout to path, chunk records at a time"""
+    with open(path, 'wb') as f:
+        for start in range(0, count, chunk):
+            f.write(synthetic_records(layout, min(chunk, count - start), seed=start))
+
+def bench_datafile(args):
+    """Memory-mapped stock file: sequential read vs column decodes vs struct per record"""
+    layout = compile_layouts(STOCK_COPYBOOK)[0][0]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'stock.seq')
+        write_records(path, layout, args.records)
+        size = os.path.getsize(path)
+        print(f"{args.records:,} {layout.name} records, {size / 2 ** 20:.0f} MB (in the page cache)")
+
+        def read_file():
+            chunk = bytearray(2 ** 20)
+            with open(path, 'rb', buffering=0) as f:
+                while f.readinto(chunk):
+                    pass
+
+        def rate(elapsed):
+            return f"{elapsed * 1000:8.1f} ms, {size / 2 ** 20 / elapsed:7.0f} MB/s of records"
+
+        print(f"  sequential read, 1 MB chunks     : {rate(best_of(read_file, args.repeat))}")
+        with DataFile(path, layout) as data:
+            for label, name in (('binary column (Stock-Held)', 'Stock-Held'),
+                                ('OCCURS 12 column (Stock-TD-Adds)', 'Stock-TD-Adds'),
+                                ('packed column (Stock-Cost)', 'Stock-Cost'),
+                                ('text column (WS-Stock-Key)', 'WS-Stock-Key')):
+                elapsed = best_of(lambda: data.column(name), args.repeat)
+                peak = peak_memory(lambda: data.column(name))
+                print(f"  {label:<33}: {rate(elapsed)}, peak {peak / 2 ** 20:5.1f} MB")
+            elapsed = best_of(lambda: data.raw_column('Stock-Cost'), args.repeat)
+            print(f"  raw_column view (Stock-Cost)     : {elapsed * 1e6:8.1f} us")
+
+            decoder = data.decoder
+            sample = min(args.records, 100000)
+            elapsed = best_of(lambda: sum(1 for _ in decoder.struct.iter_unpack(data.buffer[:sample * layout.size])),
+                              args.repeat)
+            print(f"  struct.iter_unpack, tuple/record : {elapsed / sample * args.records * 1000:8.1f} ms "
+                  f"(extrapolated from {sample:,})")
+            elapsed = best_of(lambda: [data.value(index, 'Stock-Held') for index in range(sample)], args.repeat)
+            print(f"  value() per record (Stock-Held)  : {elapsed / sample * args.records * 1000:8.1f} ms "
+                  f"(extrapolated from {sample:,})")
+
+def layout_field(copybook, name):
+    """The field called name in the record layouts of a copybook"""
+    for layout in compile_layouts(os.path.join(ROOT, 'copybooks', copybook))[0]:
+        for field in layout.fields:
+            if field.name.upper() == name.upper():
+                return field
+    raise KeyError(f"{copybook} has no field {name}")
+
+def bench_decimal(args):
+    """Packed and zoned decimal columns: lookup-table decoder vs per-value converters"""
+    numpy = import_numpy()
+    from cobol_scanner.decimal_columns import decode_column
+    sample = min(args.values, 200000)
+    for copybook, name in DECIMAL_FIELDS:
+        field = layout_field(copybook, name)
+        picture = f"{field.picture} {field.usage or 'DISPLAY'}"
+        print(f"  {name} ({picture}, {field.length} bytes), {args.values:,} values:")
+        rng = numpy.random.default_rng(0)
+        matrix = synthetic_field(field, args.values, rng)
+        elapsed = best_of(lambda: decode_column(matrix, field), args.repeat)
+        print(f"    lookup tables, int64      : {elapsed * 1000:8.1f} ms, {args.values / elapsed / 1e6:6.1f}M values/s")
+
+        convert = RecordDecoder.converter(field)
+        rows = [bytes(row) for row in matrix[:sample]]
+        elapsed = best_of(lambda: [convert(row) for row in rows], args.repeat) / sample * args.values
+        print(f"    converter per value       : {elapsed * 1000:8.1f} ms, {args.values / elapsed / 1e6:6.1f}M values/s "
+              f"(extrapolated from {sample:,})")
+
+        # Valid values and random bytes must decode alike both ways
+        noise = rng.integers(0, 256, (sample, field.length), dtype=numpy.uint8)
+        checked = numpy.concatenate([matrix[:sample], noise])
+        expected = [convert(bytes(row)) for row in checked]
+        if field.scale:
+            expected = [int(value.scaleb(field.scale)) for value in expected]
+        mismatches = int(numpy.count_nonzero(decode_column(checked, field) != numpy.array(expected)))
+        print(f"    {len(checked):,} valid and random values checked against the converter: {mismatches} differ")
+
+BENCHMARKS = {
+    'full': bench_full,
+    'rescan': bench_rescan,
+    'expand': bench_expand,
+    'datafile': bench_datafile,
+    'decimal': bench_decimal,
+}
+
+def main():
+    """Run the selected benchmarks"""
+    parser = argparse.ArgumentParser(description='Benchmark the cobol_scanner package')
+    parser.add_argument('names', nargs='*', metavar='name',
+                        help=f"benchmarks to run: {', '.join(BENCHMARKS)} (default: all)")
+    parser.add_argument('--workers', type=int, default=max(2, os.cpu_count() or 1),
+                        help='pool size compared against one worker (default: CPUs, at least 2)')
+    parser.add_argument('--records', type=int, default=2000000,
+                        help='records in the synthetic data file (default: %(default)s)')
+    parser.add_argument('--values', type=int, default=10000000,
+                        help='values per field in the decimal benchmark (default: %(default)s)')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='timing repetitions, best is reported (default: 3)')
+    args = parser.parse_args()
+    for name in args.names:
+        if name not in BENCHMARKS:
+            parser.error(f"unknown benchmark: {name}")
+
+    for name in args.names or BENCHMARKS:
+        print(f"== {name}: {BENCHMARKS[name].__doc__}")
+        BENCHMARKS[name](args)
+        print()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the search index embedded in the generated reports
+"""
+
+import argparse
+import base64
+import gzip
+import json
+import os
+import re
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+
+import search_index
+from search_index import SearchIndexBuilder
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+REPORTS = [
+    os.path.join('5_MANUAL', 'ACAS_Technical_Manual.html'),
+    os.path.join('2_SUBSYSTEMS DOCUMENTATION', 'ACAS_Subsystems_Report.html'),
+    os.path.join('1_FUNCTIONAL DOCUMENTATION', 'Functional_Documentation_Report.html'),
+]
+
+# Compressed pages of the functional documentation report
+PAGE_BLOB_RE = re.compile(r'<script type="application/octet-stream" class="doc-blob" data-doc="[^"]+">([^<]*)</script>')
+
+# Whole words, several words, and words still being typed (prefixes)
+QUERIES = [
+    'sales', 'ledger', 'invoice', 'mysql', 'cobol', 'irs',
+    'sales ledger', 'stock valuation', 'month end', 'purchase order posting', 'sl_mgmt',
+    'p', 'pu', 'pur', 'purc', 'purch', 's', 'st', 'gl',
+    'nonexistentword', 'the',
+]
+
+# Loads the index the way the page does, then times each query
+NODE_QUERIES = """
+const fs = require('fs');
+const [blobFile, queryFile, repeat] = process.argv.slice(2);
+const queries = JSON.parse(fs.readFileSync(queryFile, 'utf8'));
+(async () => {
+    const bytes = Uint8Array.from(atob(fs.readFileSync(blobFile, 'utf8')), c => c.charCodeAt(0));
+    const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('gzip'));
+    const start = performance.now();
+    const raw = new Uint8Array(await new Response(stream).arrayBuffer());
+    const index = new SearchIndex(raw);
+    const load = performance.now() - start;
+    const results = queries.map(query => {
+        const hits = index.search(query).length;
+        const times = [];
+        for (let n = 0; n < Number(repeat); n++) {
+            const t = performance.now();
+            index.search(query);
+            times.push(performance.now() - t);
+        }
+        times.sort((a, b) => a - b);
+        return { query, hits, median: times[times.length >> 1], max: times[times.length - 1] };
+    });
+    console.log(JSON.stringify({ load, sections: index.sections.length, terms: index.terms.length, results }));
+})();
+"""
+
+def best_of(func, repeat):
+    """Return the best wall-clock time of `repeat` calls to func"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def load_corpus():
+    """(container, HTML) for every generated report and functional documentation page"""
+    corpus = []
+    for report in REPORTS:
+        path = os.path.join(ROOT, report)
+        if not os.path.exists(path):
+            print(f"  skipping {report}: not generated")
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            page = f.read()
+        corpus.append((report, page))
+        for n, blob in enumerate(PAGE_BLOB_RE.findall(page)):
+            corpus.append((f'{report}#{n}', gzip.decompress(base64.b64decode(blob)).decode('utf-8')))
+    return corpus
+
+def build_index(corpus, scale):
+    """One index over every document, repeated `scale` times"""
+    builder = SearchIndexBuilder()
+    for n in range(scale):
+        for container, html_content in corpus:
+            builder.add_html(html_content, f'{n}:{container}', container)
+    return builder
+
+def bench_build(args):
+    """Index build time and size over all reports"""
+    corpus = load_corpus()
+    text_bytes = sum(len(html_content.encode('utf-8')) for _, html_content in corpus) * args.scale
+    builder = build_index(corpus, args.scale)
+    print(f"{text_bytes / 1024:.0f} KB of report HTML ({args.scale}x), {builder.stats()}")
+
+    build = best_of(lambda: build_index(corpus, args.scale), args.repeat)
+    encode = best_of(builder.html_blob, args.repeat)
+    raw = builder.to_bytes()
+    compressed = gzip.compress(raw, compresslevel=9, mtime=0)
+    print(f"  tokenize + invert: {build * 1000:8.1f} ms, serialize + compress: {encode * 1000:8.1f} ms")
+    print(f"  index: {len(raw) / 1024:.0f} KB raw, {len(compressed) / 1024:.0f} KB gzip, "
+          f"{len(base64.b64encode(compressed)) / 1024:.0f} KB embedded as base64")
+
+def bench_query(args):
+    """Query latency of the embedded engine under node"""
+    node = shutil.which('node')
+    if node is None:
+        print("  skipped: node is not installed")
+        return
+    builder = build_index(load_corpus(), args.scale)
+    blob = base64.b64encode(gzip.compress(builder.to_bytes(), compresslevel=9, mtime=0)).decode('ascii')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files = {'blob.txt': blob, 'queries.json': json.dumps(QUERIES),
+                 'bench.js': search_index.SEARCH_ENGINE_JS + NODE_QUERIES}
+        for name, content in files.items():
+            with open(os.path.join(tmp, name), 'w', encoding='utf-8') as f:
+                f.write(content)
+        result = subprocess.run([node, os.path.join(tmp, 'bench.js'), os.path.join(tmp, 'blob.txt'),
+                                 os.path.join(tmp, 'queries.json'), str(args.query_repeat)],
+                                capture_output=True, text=True, check=True)
+    timings = json.loads(result.stdout)
+    print(f"{timings['sections']} sections, {timings['terms']} terms; "
+          f"index decoded on first use in {timings['load']:.1f} ms")
+    for row in timings['results']:
+        print(f"  {row['query']!r:<26} {row['hits']:3d} hits  median {row['median']:6.3f} ms  "
+              f"max {row['max']:6.3f} ms")
+    worst = max(row['max'] for row in timings['results'])
+    median = statistics.median(row['median'] for row in timings['results'])
+    print(f"  all queries: median {median:.3f} ms, slowest {worst:.3f} ms")
+
+BENCHMARKS = {
+    'build': bench_build,
+    'query': bench_query,
+}
+
+def main():
+    """Run the selected benchmarks"""
+    parser = argparse.ArgumentParser(description='Benchmark search_index.py over the generated reports')
+    parser.add_argument('names', nargs='*', metavar='name',
+                        help=f"benchmarks to run: {', '.join(BENCHMARKS)} (default: all)")
+    parser.add_argument('--scale', type=int, default=1,
+                        help='copies of the report corpus to index (default: 1)')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='timing repetitions, best is reported (default: 3)')
+    parser.add_argument('--query-repeat', type=int, default=50,
+                        help='timed runs of each query (default: 50)')
+    args = parser.parse_args()
+    for name in args.names:
+        if name not in BENCHMARKS:
+            parser.error(f"unknown benchmark: {name}")
+
+    for name in args.names or BENCHMARKS:
+        print(f"== {name}: {BENCHMARKS[name].__doc__}")
+        BENCHMARKS[name](args)
+        print()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Build every HTML documentation report in one run.
+
+Discovers the generator scripts in the numbered documentation directories
+(any script defining plan_build()), fans their independent per-file
+conversions out to one shared process pool, then lets each generator
+assemble and write its report from the results in original document order.
+
+Usage:
+    python3 build_docs.py [--jobs N] [--serial] [--only NAME] [--prerender-diagrams]
+"""
+
+import argparse
+import importlib.util
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+from mermaid_svg import PRERENDER_ENV
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Generator modules already imported in this process, keyed by script path
+_generators = {}
+
+def discover_generators(root=ROOT):
+    """Find generator scripts that provide a plan_build() hook"""
+    found = []
+    for entry in sorted(os.listdir(root)):
+        directory = os.path.join(root, entry)
+        if not entry[:1].isdigit() or not os.path.isdir(directory):
+            continue
+        for name in sorted(os.listdir(directory)):
+            if not name.endswith('.py'):
+                continue
+            path = os.path.join(directory, name)
+            # Check the source rather than importing: some scripts do their
+            # work at import time
+            with open(path, 'r', encoding='utf-8') as f:
+                if '\ndef plan_build(' in f.read():
+                    found.append(path)
+    return found
+
+@contextmanager
+def in_directory(path):
+    """Run a block with path as the working directory"""
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+def load_generator(path):
+    """Import a generator script by path (once per process)"""
+    module = _generators.get(path)
+    if module is None:
+        name = os.path.splitext(os.path.basename(path))[0]
+        # Let the script import helper modules that sit next to it
+        directory = os.path.dirname(path)
+        if directory not in sys.path:
+            sys.path.insert(0, directory)
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+        _generators[path] = module
+    return module
+
+def run_job(path, func_name, args):
+    """Worker entry point: call func_name(*args) from the generator at path"""
+    module = load_generator(path)
+    with in_directory(os.path.dirname(path)):
+        return getattr(module, func_name)(*args)
+
+def label(path):
+    """Short display name for a generator script"""
+    return os.path.relpath(path, ROOT)
+
+def main():
+    """Discover, convert in parallel and assemble every report"""
+    parser = argparse.ArgumentParser(description='Build all ACAS HTML documentation reports')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(),
+                        help='worker processes (default: number of CPUs)')
+    parser.add_argument('--serial', action='store_true',
+                        help='run every conversion in this process, without a pool')
+    parser.add_argument('--only', action='append', default=[],
+                        help='only build generators whose path contains NAME (repeatable)')
+    parser.add_argument('--prerender-diagrams', action='store_true',
+                        help='render Mermaid diagrams to inline SVG at build time (needs mmdc)')
+    args = parser.parse_args()
+    if args.prerender_diagrams:
+        # Generators pick this up in plan_build()
+        os.environ[PRERENDER_ENV] = '1'
+
+    build_start = time.perf_counter()
+    timings = []
+
+    start = time.perf_counter()
+    generators = discover_generators()
+    if args.only:
+        generators = [path for path in generators
+                      if any(name in label(path) for name in args.only)]
+    timings.append(('discover', '', time.perf_counter() - start))
+    print(f"Found {len(generators)} generators")
+
+    # Plan: each generator reads its inputs and lists its conversions
+    plans = []
+    failed = []
+    for path in generators:
+        start = time.perf_counter()
+        try:
+            module = load_generator(path)
+            with in_directory(os.path.dirname(path)):
+                jobs, finish = module.plan_build()
+        except ImportError as e:
+            print(f"  skipping {label(path)}: {e}")
+            failed.append(path)
+            continue
+        timings.append(('plan', label(path), time.perf_counter() - start))
+        plans.append((path, jobs, finish))
+        print(f"  {label(path)}: {len(jobs)} conversions")
+
+    # Convert: one shared pool for every generator's jobs, so small
+    # generators don't leave workers idle
+    pool = None if args.serial else ProcessPoolExecutor(max_workers=args.jobs)
+    try:
+        convert_start = time.perf_counter()
+        if pool is not None:
+            pending = [[pool.submit(run_job, path, name, job_args) for name, job_args in jobs]
+                       for path, jobs, finish in plans]
+
+        # Assemble in discovery order; results keep each generator's job order
+        for n, (path, jobs, finish) in enumerate(plans):
+            if pool is None:
+                start = time.perf_counter()
+                results = [run_job(path, name, job_args) for name, job_args in jobs]
+                timings.append(('convert', label(path), time.perf_counter() - start))
+            else:
+                results = [future.result() for future in pending[n]]
+                timings.append(('convert', label(path), time.perf_counter() - convert_start))
+
+            start = time.perf_counter()
+            with in_directory(os.path.dirname(path)):
+                output_file = finish(results)
+            timings.append(('assemble', label(path), time.perf_counter() - start))
+            print(f"  wrote {os.path.relpath(output_file, ROOT)}")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    total = time.perf_counter() - build_start
+    mode = 'serial' if args.serial else f'{args.jobs} workers'
+    note = '' if args.serial else '; convert is time since the pool started'
+    print(f"\nStage timings ({mode}{note}):")
+    for stage, name, elapsed in timings:
+        print(f"  {stage:<9} {name:<60} {elapsed * 1000:9.1f} ms")
+    print(f"  {'total':<9} {'':<60} {total * 1000:9.1f} ms")
+
+    if failed:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
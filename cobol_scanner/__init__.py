@@ -0,0 +1,25 @@
+"""
+Python scanner for the ACAS COBOL sources.
+
+Replaces the parse-cobol-simple.js and analyze-structures.js stages in
+0_COBOL PARSER: run python3 -m cobol_scanner from the repository root to
+rewrite analysis-results/structure-analysis.json and system-call-graph.json.
+CopybookExpander expands a program's COPY statements for analysis that
+needs the full source, load_layouts compiles copybooks into record
+layouts with byte offsets and struct-based decoders, and DataFile reads
+fixed-length record files through those layouts via mmap. decimal_columns
+(NumPy, so not imported here) decodes zoned and packed columns in bulk.
+"""
+
+from .copybook import CopybookCycleError, CopybookExpander, ExpandedSource, load_line_counts
+from .datafile import DataFile
+from .extract import scan_source
+from .layout import RecordDecoder, RecordLayout, compile_layouts, load_layouts
+from .scan import (MANIFEST_FILE, OUTPUT_DIR, build_analysis, build_call_graph, find_sources,
+                   scan_sources, write_analysis)
+
+__all__ = [
+    'CopybookCycleError', 'CopybookExpander', 'DataFile', 'ExpandedSource', 'MANIFEST_FILE', 'OUTPUT_DIR',
+    'RecordDecoder', 'RecordLayout', 'build_analysis', 'build_call_graph', 'compile_layouts',
+    'find_sources', 'load_layouts', 'load_line_counts', 'scan_source', 'scan_sources', 'write_analysis',
+]
@@ -0,0 +1,334 @@
+"""
+COPY statement expansion for COBOL sources.
+
+CopybookExpander replaces each COPY statement with the copybook it names,
+nested copies and REPLACING included, so analysis sees everything a program
+declares. Sources become lines of tokens; every copybook is read and
+tokenized once per expander and its expansion cached, so programs copying
+the same books splice the same token lines instead of re-reading files. A
+copybook that copies itself, directly or through others, raises
+CopybookCycleError.
+"""
+
+import hashlib
+import os
+import pickle
+import re
+import sys
+
+from . import extract
+from .extract import code_lines
+from .scan import ROOT
+
+# Cached line counts depend on the expansion rules in these modules
+_digest = hashlib.sha256()
+for _module in (extract, sys.modules[__name__]):
+    with open(_module.__file__, 'rb') as _source:
+        _digest.update(_source.read())
+EXPANDER_DIGEST = _digest.hexdigest()
+
+COPYBOOK_DIRS = ('copybooks',)
+# Suffixes tried after the name as written, as GnuCOBOL does
+COPY_EXTENSIONS = ('.cpy', '.cob', '.cbl')
+
+# Literals, pseudo-text delimiters, words (which may contain '.' and '()',
+# e.g. X(132) or 9(5).99) and single separators
+TOKEN_RE = re.compile(r'''"(?:[^"]|"")*"?|'(?:[^']|'')*'?|==|[^\s,;"'.=]+(?:\.[^\s,;"'.=]+)*|\S''')
+COPY_RE = re.compile(r'(?<![\w-])COPY(?![\w-])', re.I)
+
+class CopybookCycleError(ValueError):
+    """A copybook includes itself; chain lists the copybooks from the outermost"""
+
+    def __init__(self, chain):
+        super().__init__('COPY cycle: ' + ' -> '.join(chain))
+        self.chain = chain
+
+class ExpandedSource:
+    """A source file with its COPY statements expanded
+
+    lines holds the token tuples of every line after expansion, code_lines
+    the number of code lines in the file itself, copybooks the copybooks
+    used at any depth and missing the COPY names that did not resolve.
+    """
+
+    __slots__ = ('path', 'lines', 'code_lines', 'copybooks', 'missing')
+
+    def __init__(self, path, lines, code_lines, copybooks, missing):
+        self.path = path
+        self.lines = lines
+        self.code_lines = code_lines
+        self.copybooks = copybooks
+        self.missing = missing
+
+def token_key(token):
+    """Tokens compare case-insensitively, except literals"""
+    return token if token[:1] in '"\'' else token.upper()
+
+def tokenize(text, free):
+    """(token tuples for the code lines of a source, numbers of the lines
+    that may hold a COPY statement)"""
+    lines = []
+    copy_lines = []
+    for code in code_lines(text, free):
+        if ('OPY' in code or 'opy' in code) and COPY_RE.search(code):
+            copy_lines.append(len(lines))
+        lines.append(tuple(TOKEN_RE.findall(code)))
+    return lines, copy_lines
+
+def statement_end(tokens):
+    """Index of the full stop ending a statement, skipping pseudo-text; None if absent"""
+    in_pseudo_text = False
+    for position, token in enumerate(tokens):
+        if token == '==':
+            in_pseudo_text = not in_pseudo_text
+        elif token == '.' and not in_pseudo_text:
+            return position
+    return None
+
+def operand(tokens, position):
+    """(key tuple, tokens, next position) for a REPLACING operand at position"""
+    if tokens[position] == '==':
+        end = tokens.index('==', position + 1)
+        text = tokens[position + 1:end]
+        return tuple(token_key(token) for token in text), text, end + 1
+    return (token_key(tokens[position]),), tokens[position:position + 1], position + 1
+
+def parse_copy(tokens):
+    """(copybook name, REPLACING rules) from the tokens after COPY, up to the full stop
+
+    A rule is (mode, pattern keys, replacement tokens) with mode None for
+    whole text, or 'LEADING'/'TRAILING' for the parts of words.
+    """
+    name = tokens[0].strip('"\'')
+    rules = []
+    position = 1
+    while position < len(tokens) and tokens[position].upper() != 'REPLACING':
+        position += 1
+    position += 1
+    while position < len(tokens):
+        mode = tokens[position].upper()
+        if mode in ('LEADING', 'TRAILING'):
+            position += 1
+        else:
+            mode = None
+        pattern, _, position = operand(tokens, position)
+        if position >= len(tokens) or tokens[position].upper() != 'BY':
+            break
+        _, replacement, position = operand(tokens, position + 1)
+        rules.append((mode, pattern, tuple(replacement)))
+    return name, tuple(rules)
+
+def apply_replacing(line, rules):
+    """The line with REPLACING rules applied left to right, each position once"""
+    keys = [token_key(token) for token in line]
+    replaced = []
+    position = 0
+    while position < len(line):
+        for mode, pattern, replacement in rules:
+            if mode is None:
+                if tuple(keys[position:position + len(pattern)]) == pattern:
+                    replaced.extend(replacement)
+                    position += len(pattern)
+                    break
+                continue
+            key = keys[position]
+            part = pattern[0]
+            new = replacement[0] if replacement else ''
+            if len(key) > len(part) and mode == 'LEADING' and key.startswith(part):
+                replaced.append(new + line[position][len(part):])
+            elif len(key) > len(part) and mode == 'TRAILING' and key.endswith(part):
+                replaced.append(line[position][:-len(part)] + new)
+            else:
+                continue
+            position += 1
+            break
+        else:
+            replaced.append(line[position])
+            position += 1
+    return tuple(replaced)
+
+class CopybookExpander:
+    """Expands COPY statements, caching each copybook's tokens and expansion"""
+
+    def __init__(self, root=ROOT, copybook_dirs=COPYBOOK_DIRS):
+        self.root = root
+        self.copybook_dirs = [os.path.join(root, directory) for directory in copybook_dirs]
+        self._listings = {}
+        self._expanded = {}
+        self._replaced = {}
+        self._active = []
+
+    def listing(self, directory):
+        """{lower-case file name: file name} for a directory, read once"""
+        names = self._listings.get(directory)
+        if names is None:
+            try:
+                names = {name.lower(): name for name in os.listdir(directory)}
+            except OSError:
+                names = {}
+            self._listings[directory] = names
+        return names
+
+    def resolve(self, name, including_dir):
+        """Path of the copybook a COPY statement names, or None"""
+        candidates = [name.lower()] + [name.lower() + extension for extension in COPY_EXTENSIONS]
+        for directory in [including_dir] + self.copybook_dirs:
+            names = self.listing(directory)
+            for candidate in candidates:
+                if candidate in names:
+                    return os.path.join(directory, names[candidate])
+        return None
+
+    def expand_lines(self, lines, copy_lines, including_dir):
+        """(expanded lines, copybooks used, missing names) for token lines;
+        only the lines numbered in copy_lines are searched for COPY"""
+        expanded = []
+        copybooks = {}
+        missing = {}
+        line_number = 0
+        for copy_line in copy_lines:
+            if copy_line < line_number:
+                # Already consumed by a statement spanning lines
+                continue
+            expanded.extend(lines[line_number:copy_line])
+            line = lines[copy_line]
+            line_number = copy_line + 1
+            start = next((position for position, token in enumerate(line)
+                          if token.upper() == 'COPY'), None)
+            if start is None:
+                expanded.append(line)
+                continue
+            if start:
+                expanded.append(line[:start])
+
+            # The statement runs to the next full stop, possibly lines later
+            statement = list(line[start + 1:])
+            end = statement_end(statement)
+            while end is None and line_number < len(lines):
+                statement.extend(lines[line_number])
+                line_number += 1
+                end = statement_end(statement)
+            if end is None:
+                end = len(statement)
+            if end:
+                name, rules = parse_copy(statement[:end])
+                path = self.resolve(name, including_dir)
+                if path is None:
+                    missing[name] = True
+                else:
+                    book_lines, nested, nested_missing = self.expand_copybook(path, rules)
+                    expanded.extend(book_lines)
+                    copybooks[path] = True
+                    copybooks.update(dict.fromkeys(nested))
+                    missing.update(dict.fromkeys(nested_missing))
+            if statement[end + 1:]:
+                expanded.extend(self.expand_lines([tuple(statement[end + 1:])], [0], including_dir)[0])
+        expanded.extend(lines[line_number:])
+        return expanded, list(copybooks), list(missing)
+
+    def expand_copybook(self, path, rules=()):
+        """Cached (expanded lines, copybooks, missing) of one copybook under REPLACING rules"""
+        key = (path, rules)
+        result = self._replaced.get(key)
+        if result is not None:
+            return result
+        result = self._expanded.get(path)
+        if result is None:
+            if path in self._active:
+                chain = self._active[self._active.index(path):] + [path]
+                raise CopybookCycleError([os.path.relpath(book, self.root) for book in chain])
+            self._active.append(path)
+            try:
+                with open(path, 'rb') as f:
+                    text = f.read().decode('utf-8', errors='replace')
+                result = self.expand_lines(*tokenize(text, free=True), os.path.dirname(path))
+            finally:
+                self._active.pop()
+            self._expanded[path] = result
+        if rules:
+            lines, copybooks, missing = result
+            result = ([apply_replacing(line, rules) for line in lines], copybooks, missing)
+        self._replaced[key] = result
+        return result
+
+    def expand_text(self, text, path, free=False):
+        """ExpandedSource for source text; path locates copybooks next to it"""
+        lines, copy_lines = tokenize(text, free)
+        expanded, copybooks, missing = self.expand_lines(lines, copy_lines, os.path.dirname(path))
+        return ExpandedSource(path, expanded, len(lines), copybooks, missing)
+
+    def expand_file(self, path):
+        """ExpandedSource for a program, path relative to the root or absolute"""
+        path = os.path.join(self.root, path)
+        with open(path, 'rb') as f:
+            text = f.read().decode('utf-8', errors='replace')
+        return self.expand_text(text, path)
+
+    def line_counts(self, paths):
+        """{path: (code lines, expanded code lines)} for programs that expand;
+        missing files and COPY cycles are left out"""
+        counts = {}
+        for path in paths:
+            try:
+                source = self.expand_file(path)
+            except (OSError, CopybookCycleError):
+                continue
+            counts[path] = (source.code_lines, len(source.lines))
+        return counts
+
+def file_digest(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def load_line_counts(paths, cache_path=None, root=ROOT):
+    """({path: (code lines, expanded code lines)}, number expanded rather than
+    taken from the cache)
+
+    Like CopybookExpander.line_counts(), but cached in a pickle keyed by the
+    SHA-256 of each program and of the copybooks it copies. An entry is also
+    redone once a COPY name that did not resolve finds a copybook.
+    """
+    cached = {}
+    if cache_path is not None:
+        try:
+            with open(cache_path, 'rb') as f:
+                digest, cached = pickle.load(f)
+            if digest != EXPANDER_DIGEST:
+                cached = {}
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+            cached = {}
+
+    expander = CopybookExpander(root)
+    digests = {}
+
+    def digest_of(source):
+        if source not in digests:
+            digests[source] = file_digest(source)
+        return digests[source]
+
+    counts = {}
+    entries = {}
+    expanded = 0
+    for path in paths:
+        key = os.path.join(root, path)
+        try:
+            entry = cached.get(key)
+            if entry is not None and all(digest_of(source) == digest for source, digest in entry[0]) \
+                    and all(expander.resolve(name, os.path.dirname(key)) is None for name in entry[1]):
+                counts[path] = entry[2]
+                entries[key] = entry
+                continue
+            source = expander.expand_file(key)
+            sources = tuple((book, digest_of(book)) for book in [key] + source.copybooks)
+        except (OSError, CopybookCycleError):
+            continue
+        counts[path] = (source.code_lines, len(source.lines))
+        entries[key] = (sources, tuple(source.missing), counts[path])
+        expanded += 1
+
+    if cache_path is not None and (expanded or entries.keys() != cached.keys()):
+        temp_path = f'{cache_path}.tmp'
+        with open(temp_path, 'wb') as f:
+            pickle.dump((EXPANDER_DIGEST, entries), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, cache_path)
+    return counts, expanded
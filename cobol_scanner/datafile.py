@@ -0,0 +1,198 @@
+"""
+Memory-mapped reader for ACAS fixed-length record files.
+
+DataFile maps a record sequential file (fixed-length records back to back,
+as GnuCOBOL writes ORGANIZATION SEQUENTIAL) read-only and reads it through
+a RecordLayout from cobol_scanner.layout. Nothing is copied or decoded up
+front: record() returns a memoryview slice of the mapping, value() decodes
+a single field, and column() decodes one field across every record into a
+NumPy array through strided views of the mapping, with no per-record
+Python objects. The ACAS data files proper are ORGANIZATION INDEXED;
+unload them to sequential files first (the *UNL programs, or a COBOL copy
+loop) to read them here.
+
+NumPy is only needed for column() and raw_column(); decimal_columns decodes
+zoned and packed fields in bulk from raw_column() matrices.
+"""
+
+import mmap
+import os
+from decimal import Decimal
+
+from .layout import RecordDecoder
+
+BINARY_LENGTHS = (1, 2, 4, 8)
+FLOAT_DTYPES = {4: '=f4', 8: '=f8'}
+
+def import_numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError('DataFile.column() needs NumPy: pip install numpy') from None
+    return numpy
+
+def binary_decoder(field):
+    """Converter from big-endian COMP bytes to int, or Decimal with a V in the picture"""
+    signed = field.signed
+    scale = field.scale
+
+    def convert(data):
+        value = int.from_bytes(data, 'big', signed=signed)
+        return Decimal(value).scaleb(-scale) if scale else value
+    return convert
+
+class Record:
+    """Lazy view of one record: fields decode when looked up"""
+
+    __slots__ = ('file', 'index')
+
+    def __init__(self, file, index):
+        self.file = file
+        self.index = index
+
+    def __getitem__(self, name):
+        return self.file.value(self.index, name)
+
+    @property
+    def raw(self):
+        return self.file.record(self.index)
+
+    def decode(self):
+        """{field name: value} for every data field, as RecordDecoder.decode() gives it"""
+        return self.file.decoder.decode(self.file.buffer, self.index * self.file.record_size)
+
+class DataFile:
+    """A fixed-length record file mapped into memory, read through a RecordLayout"""
+
+    def __init__(self, path, layout):
+        self.path = path
+        self.layout = layout
+        self.record_size = layout.size
+        self.fields = {}
+        for field in layout.fields:
+            self.fields.setdefault(field.name.upper(), field)
+        self._decoder = None
+        self._converters = {}
+
+        self._file = open(path, 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        if size % self.record_size:
+            self._file.close()
+            raise ValueError(f'{path}: {size:,} bytes is not a whole number of '
+                             f'{self.record_size}-byte {layout.name} records')
+        # mmap cannot map an empty file; slicing the map (or b'') gives the
+        # bytes single values decode from
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        self._data = self._map if size else b''
+        self.buffer = memoryview(self._data)
+        self.count = size // self.record_size
+
+    def close(self):
+        """Unmap the file; fails with BufferError while record views or raw
+        columns are still referenced"""
+        self.buffer.release()
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError(f'record {index} out of range ({self.count} records)')
+        return Record(self, index)
+
+    @property
+    def decoder(self):
+        if self._decoder is None:
+            self._decoder = self.layout.decoder()
+        return self._decoder
+
+    def field(self, name):
+        """The layout field called name (any case)"""
+        try:
+            return self.fields[name.upper()]
+        except KeyError:
+            raise KeyError(f'{self.layout.name} has no field {name}') from None
+
+    def record(self, index):
+        """The bytes of one record as a memoryview of the mapping"""
+        start = index * self.record_size
+        return self.buffer[start:start + self.record_size]
+
+    def converter(self, field):
+        """(bytes -> value) for one occurrence of an elementary field"""
+        convert = self._converters.get(field.name.upper())
+        if convert is None:
+            if field.is_group:
+                convert = bytes
+            elif field.category == 'binary' and field.numeric:
+                # The struct decoder unpacks these as integers itself
+                convert = binary_decoder(field)
+            else:
+                convert = RecordDecoder.converter(field) or bytes
+            self._converters[field.name.upper()] = convert
+        return convert
+
+    def value(self, index, name):
+        """One field of one record, decoded; a list for OCCURS fields"""
+        field = self.field(name)
+        convert = self.converter(field)
+        start = index * self.record_size
+        values = [convert(self._data[start + offset:start + offset + field.length])
+                  for offset in field.occurrences]
+        return values if field.dims else values[0]
+
+    def values(self, name):
+        """Decoded values of a field across all records, one at a time"""
+        for index in range(self.count):
+            yield self.value(index, name)
+
+    def strided(self, field, dtype, numpy, item_shape=(), item_strides=()):
+        """Zero-copy array over a field in every record, shape (records, *OCCURS counts, *item_shape)"""
+        shape = (self.count, *field.dims, *item_shape)
+        if not self.count:
+            # numpy.ndarray cannot take an offset into an empty buffer
+            return numpy.empty(shape, dtype=dtype)
+        return numpy.ndarray(shape, dtype=dtype, buffer=self.buffer, offset=field.offset,
+                             strides=(self.record_size, *field.strides, *item_strides))
+
+    def raw_column(self, name):
+        """Zero-copy uint8 array of a field's bytes in every record: shape
+        (records, *OCCURS counts, length), strided over the mapping"""
+        numpy = import_numpy()
+        field = self.field(name)
+        return self.strided(field, numpy.uint8, numpy, (field.length,), (1,))
+
+    def column(self, name):
+        """A field decoded across every record into a NumPy array of shape
+        (records, *OCCURS counts)
+
+        Binary fields give int64 and floats float64, both read straight from
+        the mapping through strided views. Zoned and packed decimals give
+        int64 too, decoded by cobol_scanner.decimal_columns; like binary
+        fields with a V in their picture these hold the unscaled value, so
+        divide by 10 ** field.scale. Text gives a bytes (S) array.
+        """
+        numpy = import_numpy()
+        field = self.field(name)
+        kind = field.category
+        if kind in ('binary', 'native', 'pointer') and field.length in BINARY_LENGTHS \
+                and (field.numeric or not field.picture):
+            dtype = f"{'>' if kind == 'binary' else '='}{'i' if field.signed else 'u'}{field.length}"
+            return self.strided(field, dtype, numpy).astype(numpy.int64)
+        if kind == 'float':
+            return self.strided(field, FLOAT_DTYPES[field.length], numpy).astype(numpy.float64)
+        if kind in ('packed', 'display'):
+            from .decimal_columns import decode_column
+            return decode_column(self.raw_column(name), field)
+        return self.strided(field, f'S{field.length}', numpy).copy()
@@ -0,0 +1,162 @@
+"""
+Line-level extraction of COBOL program structure.
+
+scan_source() picks out what the documentation tooling needs from one
+source file: PROGRAM-ID, divisions, sections, paragraphs, CALL, COPY,
+PERFORM and SELECT/FD. It follows free and fixed source format, >>SOURCE
+directives, *> comments and string literals, but does not parse COBOL.
+"""
+
+import re
+
+# Fixed format: sequence area in columns 1-6, indicator in 7, code in 8-72
+FIXED_INDICATOR = 6
+FIXED_CODE_END = 72
+
+SOURCE_DIRECTIVE_RE = re.compile(r'^\s*(?:>>\s*SOURCE|\$\s*SET\s+SOURCEFORMAT)\b(.*)', re.I)
+
+NAME = r'[A-Za-z0-9][A-Za-z0-9_-]*'
+DIVISION_RE = re.compile(r'^\s*(IDENTIFICATION|ID|ENVIRONMENT|DATA|PROCEDURE)\s+DIVISION\b', re.I)
+SECTION_RE = re.compile(rf'^\s*({NAME})\s+SECTION\s*\.?\s*$', re.I)
+PARAGRAPH_RE = re.compile(rf'^\s*({NAME})\s*\.\s*$')
+PROGRAM_ID_RE = re.compile(rf'\bPROGRAM-ID\s*\.?\s*(?:"([^"]+)"|\'([^\']+)\'|({NAME}))?', re.I)
+LEADING_NAME_RE = re.compile(rf'\s*["\']?({NAME})')
+FILE_RE = re.compile(rf'^\s*(?:FD|SD)\s+({NAME})', re.I)
+SELECT_RE = re.compile(rf'^\s*SELECT\s+(?:OPTIONAL\s+)?({NAME})', re.I)
+# String literals are matched first so that words inside them are skipped
+STATEMENT_RE = re.compile(rf'''"[^"]*"?|'[^']*'?|(?<![\w-])(CALL|COPY|PERFORM)\s+'''
+                          rf'''(?:"([^"]+)"|'([^']+)'|({NAME})(\s+TIMES\b)?)''', re.I)
+
+# Words that can end a line on their own in the procedure division
+STATEMENT_WORDS = frozenset({
+    'CONTINUE', 'ELSE', 'EXIT', 'GOBACK', 'NEXT', 'RUN', 'SENTENCE', 'EJECT',
+    'SKIP1', 'SKIP2', 'SKIP3', 'THEN',
+})
+# PERFORM followed by one of these is an inline PERFORM, not a paragraph
+PERFORM_KEYWORDS = frozenset({'UNTIL', 'VARYING', 'WITH', 'TEST', 'FOREVER'})
+
+def strip_comment(code):
+    """Code with any *> comment removed, ignoring *> inside string literals"""
+    if '*>' not in code:
+        return code
+    quote = None
+    for position, char in enumerate(code):
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in '"\'':
+            quote = char
+        elif char == '*' and code.startswith('*>', position):
+            return code[:position]
+    return code
+
+def code_lines(text, free=True):
+    """The code of each source line, comments and sequence areas removed"""
+    for line in text.splitlines():
+        if '>>' in line or '$' in line:
+            directive = SOURCE_DIRECTIVE_RE.match(line)
+            if directive:
+                free = 'FREE' in directive.group(1).upper()
+                continue
+        if not free:
+            if len(line) <= FIXED_INDICATOR or line[FIXED_INDICATOR] in '*/':
+                continue
+            line = line[FIXED_INDICATOR + 1:FIXED_CODE_END]
+        if line.lstrip().startswith('*>'):
+            continue
+        code = strip_comment(line)
+        if code.strip():
+            yield code
+
+def scan_source(text, free=False):
+    """Structure of one COBOL source file
+
+    Programs are fixed format unless a >>SOURCE directive says otherwise;
+    pass free=True for copybooks, which ACAS writes in free format.
+    """
+    structure = {
+        'programId': None,
+        'divisions': [],
+        'sections': [],
+        'paragraphs': [],
+        'copies': [],
+        'calls': [],
+        'performs': [],
+        'files': [],
+    }
+    copies = {}
+    calls = {}
+    performs = {}
+    in_procedure = False
+    want_program_id = False
+    # A name alone on a line is a paragraph only after a full stop; otherwise
+    # it ends a statement continued from the line before
+    sentence_ended = True
+
+    for code in code_lines(text, free):
+        upper = code.upper()
+        starts_sentence = sentence_ended
+        sentence_ended = code.rstrip().endswith('.')
+        if want_program_id:
+            match = LEADING_NAME_RE.match(code)
+            structure['programId'] = match.group(1) if match else None
+            want_program_id = False
+
+        if 'DIVISION' in upper:
+            match = DIVISION_RE.match(code)
+            if match:
+                structure['divisions'].append(code.strip())
+                in_procedure = match.group(1).upper() == 'PROCEDURE'
+                sentence_ended = True
+                continue
+        if 'PROGRAM-ID' in upper and structure['programId'] is None:
+            match = PROGRAM_ID_RE.search(code)
+            if match:
+                name = match.group(1) or match.group(2) or match.group(3)
+                if name:
+                    structure['programId'] = name
+                else:
+                    want_program_id = True
+            continue
+        if 'SECTION' in upper:
+            match = SECTION_RE.match(code)
+            if match:
+                structure['sections'].append(code.strip())
+                sentence_ended = True
+                continue
+
+        if in_procedure:
+            match = PARAGRAPH_RE.match(code) if starts_sentence else None
+            if match:
+                name = match.group(1)
+                if name.upper() not in STATEMENT_WORDS and not name.upper().startswith('END-'):
+                    structure['paragraphs'].append(name)
+                continue
+        elif 'SELECT' in upper or 'FD' in upper or 'SD' in upper:
+            match = SELECT_RE.match(code)
+            if match:
+                structure['files'].append(f'SELECT {match.group(1).upper()}')
+            else:
+                match = FILE_RE.match(code)
+                if match:
+                    structure['files'].append(match.group(1).upper())
+
+        if 'CALL' in upper or 'COPY' in upper or 'PERFORM' in upper:
+            for match in STATEMENT_RE.finditer(code):
+                verb = match.group(1)
+                if verb is None:
+                    continue
+                verb = verb.upper()
+                name = (match.group(2) or match.group(3) or match.group(4)).upper()
+                if verb == 'CALL':
+                    calls[name] = True
+                elif verb == 'COPY':
+                    copies[name] = True
+                elif (match.group(4) and not match.group(5) and name not in PERFORM_KEYWORDS
+                      and not name.isdigit()):
+                    performs[name] = True
+
+    structure['copies'] = list(copies)
+    structure['calls'] = list(calls)
+    structure['performs'] = list(performs)
+    return structure
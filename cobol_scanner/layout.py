@@ -0,0 +1,564 @@
+"""
+Record layouts compiled from COBOL copybooks.
+
+compile_layouts() turns the data description entries of a copybook (level
+numbers with PIC, USAGE, OCCURS, REDEFINES and SIGN clauses) into one
+RecordLayout per 01 or 77 level item: a flat table of every field with its
+byte offset and length, sized as GnuCOBOL stores it with the default
+configuration (COMP fields take 1, 2, 4 or 8 bytes by digit count, stored
+big-endian). RecordLayout.decoder() builds a RecordDecoder around a single
+precompiled struct.Struct that unpacks a whole record in one call.
+
+load_layouts() caches compiled layouts in a pickle keyed by the SHA-256 of
+each copybook and of the copybooks it copies, so unchanged copybooks are
+never parsed again.
+"""
+
+import hashlib
+import os
+import pickle
+import re
+import struct
+import sys
+from decimal import Decimal
+
+from . import copybook, extract
+from .copybook import CopybookExpander, file_digest
+
+# Cached layouts depend on the parsing rules in these modules
+_digest = hashlib.sha256()
+for _module in (copybook, extract, sys.modules[__name__]):
+    with open(_module.__file__, 'rb') as _source:
+        _digest.update(_source.read())
+COMPILER_DIGEST = _digest.hexdigest()
+
+LEVEL_RE = re.compile(r'^\d\d?$')
+REPEAT_RE = re.compile(r'(.)\((\d+)\)')
+PICTURE_PART_RE = re.compile(r'^[\w$+\-*/().]+$')
+
+# USAGE spellings mapped to: 'display', 'packed', 'binary' (big-endian),
+# 'native' (machine byte order), 'float' or 'pointer'
+USAGES = {
+    'DISPLAY': 'display',
+    'COMP': 'binary', 'COMPUTATIONAL': 'binary', 'COMP-4': 'binary', 'COMPUTATIONAL-4': 'binary',
+    'BINARY': 'binary', 'COMP-X': 'binary', 'COMPUTATIONAL-X': 'binary',
+    'COMP-5': 'native', 'COMPUTATIONAL-5': 'native',
+    'COMP-3': 'packed', 'COMPUTATIONAL-3': 'packed', 'PACKED-DECIMAL': 'packed',
+    'COMP-6': 'packed', 'COMPUTATIONAL-6': 'packed',
+    'COMP-1': 'float', 'COMPUTATIONAL-1': 'float', 'FLOAT-SHORT': 'float',
+    'COMP-2': 'float', 'COMPUTATIONAL-2': 'float', 'FLOAT-LONG': 'float',
+    'BINARY-CHAR': 'native', 'BINARY-SHORT': 'native', 'BINARY-LONG': 'native',
+    'BINARY-DOUBLE': 'native', 'INDEX': 'native', 'POINTER': 'pointer',
+}
+# Usages whose size does not depend on the PICTURE
+FIXED_SIZES = {
+    'COMP-1': 4, 'COMPUTATIONAL-1': 4, 'FLOAT-SHORT': 4,
+    'COMP-2': 8, 'COMPUTATIONAL-2': 8, 'FLOAT-LONG': 8,
+    'BINARY-CHAR': 1, 'BINARY-SHORT': 2, 'BINARY-LONG': 4, 'BINARY-DOUBLE': 8,
+    'INDEX': 4, 'POINTER': 8,
+}
+# Words that start a clause, so never part of a data name or a picture
+CLAUSE_WORDS = frozenset(USAGES) | {
+    'PIC', 'PICTURE', 'USAGE', 'OCCURS', 'REDEFINES', 'VALUE', 'VALUES', 'SIGN', 'LEADING',
+    'TRAILING', 'SEPARATE', 'SYNC', 'SYNCHRONIZED', 'JUSTIFIED', 'JUST', 'BLANK', 'EXTERNAL',
+    'GLOBAL', 'RENAMES', 'IS', 'SIGNED', 'UNSIGNED',
+}
+
+# Decimal data is read as the GnuCOBOL runtime reads it, bad bytes included:
+# a zoned digit is the low nibble of its byte, and an embedded sign byte
+# (last, or first with SIGN LEADING) other than a digit or space is
+# negative (GnuCOBOL writes 0x70 + digit). A packed byte holding a nibble
+# above 9 counts as 00, as in the runtime's byte-to-value table.
+ZONED_POSITIVE = frozenset(b'0123456789 ')
+PACKED_PAIRS = bytes((byte >> 4) * 10 + (byte & 0x0F) if byte >> 4 < 10 and byte & 0x0F < 10 else 0
+                     for byte in range(256))
+
+def binary_size(digits):
+    """Bytes GnuCOBOL allocates to a COMP item (binary-size: 1-2-4-8)"""
+    if digits <= 2:
+        return 1
+    if digits <= 4:
+        return 2
+    if digits <= 9:
+        return 4
+    return 8
+
+class Field:
+    """One data item of a record layout
+
+    offset is the byte offset of the first occurrence within the record and
+    length the size of one occurrence. dims and strides give the OCCURS
+    counts of the item and its ancestors, outermost first, with the bytes
+    between occurrences. in_redefines marks items under a REDEFINES, which
+    overlay other fields.
+    """
+
+    __slots__ = ('level', 'name', 'depth', 'parent', 'picture', 'usage', 'unsigned', 'occurs', 'redefines',
+                 'sign_leading', 'sign_separate', 'offset', 'length', 'dims', 'strides', 'in_redefines',
+                 'is_group')
+
+    def __init__(self, level, name, depth):
+        self.level = level
+        self.name = name
+        self.depth = depth
+        self.parent = None
+        self.picture = None
+        self.usage = None
+        self.unsigned = False
+        self.occurs = 1
+        self.redefines = None
+        self.sign_leading = False
+        self.sign_separate = False
+        self.offset = 0
+        self.length = 0
+        self.dims = ()
+        self.strides = ()
+        self.in_redefines = False
+        self.is_group = False
+
+    @property
+    def size(self):
+        """Bytes taken by all occurrences of the item"""
+        return self.length * self.occurs
+
+    @property
+    def category(self):
+        """'group', 'alphanumeric' (including edited pictures) or the storage class of USAGES"""
+        if self.is_group:
+            return 'group'
+        kind = USAGES.get(self.usage or 'DISPLAY', 'display')
+        if kind == 'display' and not self.numeric:
+            return 'alphanumeric'
+        return kind
+
+    @property
+    def numeric(self):
+        picture = self.expanded_picture
+        return bool(picture) and set(picture) <= set('9SVP')
+
+    @property
+    def expanded_picture(self):
+        """The picture with repeats written out, upper case: 9(3)V99 -> 999V99"""
+        if not self.picture:
+            return ''
+        return REPEAT_RE.sub(lambda match: match.group(1) * int(match.group(2)), self.picture.upper())
+
+    @property
+    def digits(self):
+        return self.expanded_picture.count('9')
+
+    @property
+    def scale(self):
+        """Digits after the assumed decimal point"""
+        picture = self.expanded_picture
+        return picture[picture.index('V'):].count('9') if 'V' in picture else 0
+
+    @property
+    def signed(self):
+        if self.usage in FIXED_SIZES and not self.picture:
+            return not self.unsigned and self.usage != 'POINTER'
+        return 'S' in self.expanded_picture
+
+    @property
+    def occurrences(self):
+        """Byte offsets of every occurrence, in storage order"""
+        offsets = [self.offset]
+        for count, stride in zip(self.dims, self.strides):
+            offsets = [offset + number * stride for offset in offsets for number in range(count)]
+        return offsets
+
+    def storage_size(self):
+        """Bytes for one occurrence of an elementary item"""
+        if self.usage in FIXED_SIZES:
+            return FIXED_SIZES[self.usage]
+        kind = USAGES.get(self.usage or 'DISPLAY', 'display')
+        picture = self.expanded_picture
+        if kind == 'packed':
+            return self.digits // 2 + 1 if self.usage in ('COMP-3', 'COMPUTATIONAL-3', 'PACKED-DECIMAL') \
+                else (self.digits + 1) // 2
+        if kind in ('binary', 'native'):
+            if picture and not self.numeric:
+                # COMP-X with an alphanumeric picture: one byte per character
+                return len(picture)
+            return binary_size(self.digits)
+        size = len(picture) - picture.count('S') - picture.count('V') - picture.count('P')
+        if 'S' in picture and self.sign_separate:
+            size += 1
+        return size
+
+class RecordLayout:
+    """Fields of one 01 or 77 level record, in declaration order"""
+
+    def __init__(self, name, copybook, fields, redefines=None):
+        self.name = name
+        self.copybook = copybook
+        self.fields = fields
+        self.redefines = redefines
+        self.size = fields[0].length if fields else 0
+
+    def __getstate__(self):
+        # The decoder holds a struct.Struct, which does not pickle
+        state = self.__dict__.copy()
+        state.pop('_decoder', None)
+        return state
+
+    def elementary(self):
+        """Fields that hold data: no groups, fillers or REDEFINES overlays"""
+        return [field for field in self.fields
+                if not field.is_group and not field.in_redefines and field.name.upper() != 'FILLER']
+
+    def decoder(self):
+        """The RecordDecoder for this layout, built on first use"""
+        decoder = self.__dict__.get('_decoder')
+        if decoder is None:
+            decoder = self._decoder = RecordDecoder(self)
+        return decoder
+
+def split_entries(lines):
+    """Data description entries (token lists) from token lines, split at full stops"""
+    entries = []
+    entry = []
+    for line in lines:
+        for token in line:
+            if token == '.':
+                if entry:
+                    entries.append(entry)
+                entry = []
+            else:
+                entry.append(token)
+    if entry:
+        entries.append(entry)
+    return entries
+
+def parse_entry(tokens, depth):
+    """Field for one data description entry; None for 66, 78 and 88 levels"""
+    level = int(tokens[0])
+    if level in (66, 78, 88):
+        return None
+    position = 1
+    name = 'FILLER'
+    if position < len(tokens) and tokens[position].upper() not in CLAUSE_WORDS:
+        name = tokens[position]
+        position += 1
+    field = Field(level, name, depth)
+    while position < len(tokens):
+        word = tokens[position].upper()
+        position += 1
+        if word in ('PIC', 'PICTURE'):
+            if position < len(tokens) and tokens[position].upper() == 'IS':
+                position += 1
+            picture = tokens[position]
+            position += 1
+            # Commas in an edited picture such as ZZ,ZZ9.99 split it into tokens
+            while (position + 1 < len(tokens) and tokens[position] == ','
+                   and PICTURE_PART_RE.match(tokens[position + 1])
+                   and tokens[position + 1].upper() not in CLAUSE_WORDS):
+                picture += ',' + tokens[position + 1]
+                position += 2
+            field.picture = picture
+        elif word in USAGES:
+            field.usage = word
+        elif word == 'UNSIGNED':
+            field.unsigned = True
+        elif word == 'OCCURS':
+            counts = []
+            while position < len(tokens) and (tokens[position].isdigit() or tokens[position].upper() == 'TO'):
+                if tokens[position].isdigit():
+                    counts.append(int(tokens[position]))
+                position += 1
+            # OCCURS n TO m DEPENDING ON: storage for the maximum
+            field.occurs = max(counts) if counts else 1
+        elif word == 'REDEFINES' and position < len(tokens):
+            field.redefines = tokens[position]
+            position += 1
+        elif word == 'LEADING':
+            field.sign_leading = True
+        elif word == 'SEPARATE':
+            field.sign_separate = True
+        elif word in ('VALUE', 'VALUES'):
+            # Skip the literal so that e.g. VALUE ZERO is not read as a clause
+            position += 1
+    return field
+
+def place(fields, start, offset, in_redefines):
+    """Assign offsets and lengths to fields[start] and its subordinates; return
+    the index after them"""
+    field = fields[start]
+    field.offset = offset
+    field.in_redefines = in_redefines
+    position = start + 1
+    children = []
+    next_offset = offset
+    end = offset
+    while position < len(fields) and fields[position].level > field.level:
+        child = fields[position]
+        child.parent = field.name
+        # USAGE and SIGN on a group apply to everything under it
+        if child.usage is None:
+            child.usage = field.usage
+        if not (child.sign_leading or child.sign_separate):
+            child.sign_leading = field.sign_leading
+            child.sign_separate = field.sign_separate
+        child_offset = next_offset
+        if child.redefines:
+            target = next((sibling for sibling in children
+                           if sibling.name.upper() == child.redefines.upper()), None)
+            if target is not None:
+                child_offset = target.offset
+        position = place(fields, position, child_offset, in_redefines or child.redefines is not None)
+        if not child.redefines:
+            next_offset = child_offset + child.size
+        end = max(end, child_offset + child.size)
+        children.append(child)
+    if children:
+        field.is_group = True
+        field.length = end - offset
+    else:
+        field.length = field.storage_size()
+    return position
+
+def compile_records(lines, copybook_name=''):
+    """RecordLayouts for the 01 and 77 level items in expanded token lines"""
+    records = []
+    current = None
+    levels = []
+    for tokens in split_entries(lines):
+        if not LEVEL_RE.match(tokens[0]):
+            # FD, SD and anything else that is not a data description entry
+            continue
+        level = int(tokens[0])
+        if level in (1, 77):
+            current = []
+            records.append(current)
+            levels = []
+        elif current is None:
+            continue
+        while levels and levels[-1] >= level:
+            levels.pop()
+        field = parse_entry(tokens, len(levels))
+        if field is None:
+            continue
+        levels.append(level)
+        current.append(field)
+
+    layouts = []
+    for fields in records:
+        place(fields, 0, 0, False)
+        # Lengths are known now: OCCURS strides are the lengths of the occurring items
+        ancestors = []
+        for field in fields:
+            del ancestors[field.depth:]
+            parent = ancestors[-1] if ancestors else None
+            field.dims = parent.dims if parent else ()
+            field.strides = parent.strides if parent else ()
+            if field.occurs > 1:
+                field.dims += (field.occurs,)
+                field.strides += (field.length,)
+            ancestors.append(field)
+        layouts.append(RecordLayout(fields[0].name, copybook_name, fields, fields[0].redefines))
+    return layouts
+
+def compile_layouts(path, expander=None):
+    """(RecordLayouts of a copybook, paths of the copybooks it copies)"""
+    expander = expander or CopybookExpander()
+    lines, copybooks, missing = expander.expand_copybook(os.path.abspath(path))
+    return compile_records(lines, os.path.basename(path)), copybooks
+
+def load_layouts(paths, cache_path=None):
+    """({path: [RecordLayout]}, number compiled rather than taken from the cache)
+
+    Copybooks that cannot be read are left out.
+    """
+    cached = {}
+    if cache_path is not None:
+        try:
+            with open(cache_path, 'rb') as f:
+                digest, cached = pickle.load(f)
+            if digest != COMPILER_DIGEST:
+                cached = {}
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+            cached = {}
+
+    expander = CopybookExpander()
+    layouts = {}
+    entries = {}
+    compiled = 0
+    for path in paths:
+        key = os.path.abspath(path)
+        try:
+            entry = cached.get(key)
+            if entry is not None and all(file_digest(source) == digest for source, digest in entry[0]):
+                layouts[path] = entry[1]
+                entries[key] = entry
+                continue
+            records, copybooks = compile_layouts(key, expander)
+            sources = tuple((source, file_digest(source)) for source in [key] + copybooks)
+        except OSError:
+            continue
+        layouts[path] = records
+        entries[key] = (sources, records)
+        compiled += 1
+
+    if cache_path is not None and compiled:
+        temp_path = f'{cache_path}.tmp'
+        with open(temp_path, 'wb') as f:
+            pickle.dump((COMPILER_DIGEST, entries), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, cache_path)
+    return layouts, compiled
+
+def decode_text(data):
+    return data.decode('latin-1')
+
+def zoned_digits(data):
+    """Unsigned value of zoned decimal digits: each byte's low nibble"""
+    head = data[:-1]
+    if head.isdigit() or not head:
+        return (int(head) if head else 0) * 10 + (data[-1] & 0x0F if data else 0)
+    value = 0
+    for byte in data:
+        value = value * 10 + (byte & 0x0F)
+    return value
+
+def zoned_decoder(field):
+    """Converter from zoned decimal (USAGE DISPLAY) bytes to int or Decimal"""
+    scale = field.scale
+    signed = 'S' in field.expanded_picture
+    separate = field.sign_separate
+    leading = field.sign_leading
+
+    def convert(data):
+        negative = False
+        if signed and data:
+            sign = data[0] if leading else data[-1]
+            if separate:
+                negative = sign == 0x2D
+                data = data[1:] if leading else data[:-1]
+            else:
+                negative = sign not in ZONED_POSITIVE
+        value = zoned_digits(data)
+        if negative:
+            value = -value
+        return Decimal(value).scaleb(-scale) if scale else value
+    return convert
+
+def packed_decoder(field):
+    """Converter from packed decimal (COMP-3, or COMP-6 without a sign nibble) bytes to int or Decimal
+
+    Only a D sign nibble is negative, and only in a signed field. With an
+    even digit count the first nibble is padding and is skipped.
+    """
+    scale = field.scale
+    signed = 'S' in field.expanded_picture
+    has_sign = field.usage not in ('COMP-6', 'COMPUTATIONAL-6')
+    pad = field.digits % 2 == (0 if has_sign else 1)
+
+    def convert(data):
+        nibbles = data.hex()
+        digits = nibbles[pad:-1] if has_sign else nibbles[pad:]
+        if digits.isdigit():
+            value = int(digits)
+        else:
+            body = data[:-1] if has_sign else data
+            value = 0
+            for position, byte in enumerate(body):
+                value = byte & 0x0F if pad and not position else value * 100 + PACKED_PAIRS[byte]
+            if has_sign and data:
+                value = value * 10 + (data[-1] >> 4)
+        if signed and has_sign and data and data[-1] & 0x0F == 0x0D:
+            value = -value
+        return Decimal(value).scaleb(-scale) if scale else value
+    return convert
+
+def scaled_decoder(field, convert=None):
+    """Converter applying the picture's assumed decimal point to an integer"""
+    scale = field.scale
+    if convert is None:
+        return lambda value: Decimal(value).scaleb(-scale)
+    return lambda value: Decimal(convert(value)).scaleb(-scale)
+
+def native_decoder(field):
+    signed = field.signed
+
+    def convert(data):
+        return int.from_bytes(data, sys.byteorder, signed=signed)
+    return convert
+
+class RecordDecoder:
+    """Decodes records of one layout with a single precompiled struct.Struct
+
+    Every occurrence of every data field gets a slot in the struct format, in
+    offset order, with pad bytes over fillers and REDEFINES overlays. Binary
+    fields unpack as integers directly; text, zoned and packed fields unpack
+    as bytes and go through a per-field converter.
+    """
+
+    def __init__(self, layout):
+        self.layout = layout
+        slots = []
+        for field in layout.elementary():
+            for offset in field.occurrences:
+                slots.append((offset, field))
+        slots.sort(key=lambda slot: slot[0])
+
+        formats = ['>']
+        slot_numbers = {}
+        position = 0
+        for number, (offset, field) in enumerate(slots):
+            if offset > position:
+                formats.append(f'{offset - position}x')
+            formats.append(self.format_code(field))
+            slot_numbers.setdefault(id(field), []).append(number)
+            position = offset + field.length
+        if layout.size > position:
+            formats.append(f'{layout.size - position}x')
+        self.struct = struct.Struct(''.join(formats))
+        self.size = self.struct.size
+
+        # (key, slot numbers, converter, repeated) per field; a name used
+        # twice in the record is qualified by its group, as in COBOL
+        self.plan = []
+        seen = set()
+        for field in layout.elementary():
+            key = field.name if field.name.upper() not in seen else f'{field.name} OF {field.parent}'
+            seen.add(field.name.upper())
+            numbers = tuple(slot_numbers[id(field)])
+            self.plan.append((key, numbers, self.converter(field), bool(field.dims)))
+        self.names = [key for key, numbers, convert, repeated in self.plan]
+
+    @staticmethod
+    def format_code(field):
+        kind = field.category
+        if kind == 'binary' and field.length in (1, 2, 4, 8) and field.numeric:
+            code = {1: 'b', 2: 'h', 4: 'i', 8: 'q'}[field.length]
+            return code if 'S' in field.expanded_picture else code.upper()
+        return f'{field.length}s'
+
+    @staticmethod
+    def converter(field):
+        kind = field.category
+        if kind == 'binary' and field.numeric:
+            return scaled_decoder(field) if field.scale else None
+        if kind in ('binary', 'native', 'pointer'):
+            convert = native_decoder(field) if kind != 'binary' else (lambda data: int.from_bytes(data, 'big'))
+            return scaled_decoder(field, convert) if field.scale else convert
+        if kind == 'float':
+            unpack = struct.Struct('=f' if field.length == 4 else '=d').unpack
+            return lambda data: unpack(data)[0]
+        if kind == 'packed':
+            return packed_decoder(field)
+        if kind == 'display':
+            return zoned_decoder(field)
+        return decode_text
+
+    def decode(self, buffer, offset=0):
+        """{field name: value} for the record at offset; OCCURS fields give lists"""
+        values = self.struct.unpack_from(buffer, offset)
+        record = {}
+        for key, numbers, convert, repeated in self.plan:
+            if repeated:
+                items = [values[number] for number in numbers]
+                record[key] = [convert(item) for item in items] if convert else items
+            else:
+                value = values[numbers[0]]
+                record[key] = convert(value) if convert else value
+        return record
@@ -0,0 +1,236 @@
+"""
+Incremental scan of the ACAS COBOL sources into the analysis JSON.
+
+Every program (*.cbl) and copybook (*.cpy, and the *.cob/*.ws files in
+copybooks/) under the repository is scanned with extract.scan_source() and
+the results written as structure-analysis.json and system-call-graph.json,
+in the schema analyze-structures.js produces.
+
+A manifest records each file's modification time, size, SHA-256 and scan
+result. Files whose time and size are unchanged are not read; files whose
+content hashes the same are not re-scanned; the rest are scanned across a
+process pool. When nothing changed the JSON is not rewritten.
+"""
+
+import hashlib
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+from . import extract
+from .extract import scan_source
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PARSER_DIR = os.path.join(ROOT, '0_COBOL PARSER')
+OUTPUT_DIR = os.path.join(PARSER_DIR, 'analysis-results')
+MANIFEST_FILE = os.path.join(PARSER_DIR, '.scan_manifest.json')
+MANIFEST_VERSION = 1
+
+PROGRAM_EXTENSIONS = ('.cbl',)
+COPYBOOK_EXTENSIONS = ('.cpy',)
+COPYBOOK_DIR = 'copybooks'
+COPYBOOK_DIR_EXTENSIONS = ('.cob', '.cpy', '.ws')
+SKIPPED_DIRS = frozenset({'node_modules', '0_COBOL PARSER'})
+
+MAIN_PROGRAM_RE = re.compile(r'^(ACAS|irs|sales|purchase|stock|general)\.cbl$', re.I)
+SUBSYSTEM_DIRS = ('irs', 'sales', 'purchase', 'stock', 'general')
+
+# Scan results depend on the extraction rules: any edit to them rescans everything
+with open(extract.__file__, 'rb') as _source:
+    SCANNER_DIGEST = hashlib.sha256(_source.read()).hexdigest()
+
+def find_sources(root=ROOT):
+    """Sorted (relative path, 'program' or 'copybook') for every COBOL source"""
+    found = []
+    for directory, subdirs, files in os.walk(root):
+        subdirs[:] = [name for name in subdirs if not name.startswith('.') and name not in SKIPPED_DIRS]
+        relative_dir = os.path.relpath(directory, root)
+        in_copybooks = relative_dir == COPYBOOK_DIR
+        for name in files:
+            extension = os.path.splitext(name)[1].lower()
+            if extension in PROGRAM_EXTENSIONS:
+                kind = 'program'
+            elif extension in COPYBOOK_EXTENSIONS or (in_copybooks and extension in COPYBOOK_DIR_EXTENSIONS):
+                kind = 'copybook'
+            else:
+                continue
+            path = name if relative_dir == '.' else f'{relative_dir}/{name}'
+            found.append((path.replace(os.sep, '/'), kind))
+    found.sort()
+    return found
+
+def scan_file(root, path, kind, known_hash=None):
+    """(SHA-256, file entry) for one source; the entry is None when the hash
+    equals known_hash, i.e. the content has not changed"""
+    with open(os.path.join(root, path), 'rb') as f:
+        data = f.read()
+    digest = hashlib.sha256(data).hexdigest()
+    if digest == known_hash:
+        return digest, None
+    structure = scan_source(data.decode('utf-8', errors='replace'), free=kind == 'copybook')
+    entry = {
+        'name': os.path.basename(path),
+        'path': path,
+        'type': kind,
+        'programId': structure['programId'],
+        'calls': structure['calls'],
+        'copies': structure['copies'],
+        'performs': structure['performs'],
+        'files': structure['files'],
+        'divisions': structure['divisions'],
+        'sections': structure['sections'],
+        'paragraphs': structure['paragraphs'],
+    }
+    return digest, entry
+
+def load_manifest(manifest_path):
+    """{path: [mtime_ns, size, sha256, entry]} from the manifest, or {} if stale"""
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get('version') != MANIFEST_VERSION or manifest.get('scanner') != SCANNER_DIGEST:
+        return {}
+    return manifest.get('files', {})
+
+def save_manifest(manifest_path, files):
+    temp_path = f'{manifest_path}.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump({'version': MANIFEST_VERSION, 'scanner': SCANNER_DIGEST, 'files': files}, f)
+    os.replace(temp_path, manifest_path)
+
+def scan_sources(root=ROOT, manifest_path=MANIFEST_FILE, workers=None):
+    """Scan every source, reusing manifest entries for unchanged files
+
+    Returns (entries in path order, counts of 'unchanged', 'rehashed' and
+    'scanned' files, whether anything differs from the manifest).
+    """
+    previous = load_manifest(manifest_path) if manifest_path else {}
+    files = {}
+    todo = []
+    for path, kind in find_sources(root):
+        stat = os.stat(os.path.join(root, path))
+        known = previous.get(path)
+        if known and known[0] == stat.st_mtime_ns and known[1] == stat.st_size and known[3]['type'] == kind:
+            files[path] = known
+        else:
+            files[path] = [stat.st_mtime_ns, stat.st_size, None, None]
+            todo.append((path, kind, known[2] if known and known[3]['type'] == kind else None))
+
+    if workers and workers > 1 and len(todo) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(scan_file, [root] * len(todo), *zip(*todo),
+                                        chunksize=max(1, len(todo) // (workers * 4))))
+    else:
+        results = [scan_file(root, *job) for job in todo]
+
+    counts = {'unchanged': len(files) - len(todo), 'rehashed': 0, 'scanned': 0}
+    for (path, kind, known_hash), (digest, entry) in zip(todo, results):
+        if entry is None:
+            entry = previous[path][3]
+            counts['rehashed'] += 1
+        else:
+            counts['scanned'] += 1
+        files[path][2:] = [digest, entry]
+
+    changed = counts['scanned'] > 0 or files.keys() != previous.keys()
+    if manifest_path and (changed or todo):
+        save_manifest(manifest_path, files)
+    return [files[path][3] for path in sorted(files)], counts, changed
+
+def subsystem_of(path):
+    """Source directory grouping used by the call graph"""
+    for name in SUBSYSTEM_DIRS:
+        if f'{name}/' in path:
+            return name
+    return 'common'
+
+def build_analysis(entries):
+    """structure-analysis.json from the scanned files"""
+    programs = [entry for entry in entries if entry['type'] == 'program']
+    copybooks = [entry for entry in entries if entry['type'] == 'copybook']
+    analysis = {
+        'programs': programs,
+        'copybooks': copybooks,
+        'dependencies': {},
+        'calls': {entry['path']: entry['calls'] for entry in entries if entry['calls']},
+        'copyDependencies': {entry['path']: entry['copies'] for entry in entries if entry['copies']},
+        'unusedCopybooks': [],
+        'mainPrograms': [entry for entry in programs if MAIN_PROGRAM_RE.match(entry['name'])],
+        'summary': {},
+    }
+
+    # Copied names as written, e.g. "WSNAMES.COB" or WSNAMES; a copybook is
+    # used if any program or copybook copies its file name or its stem
+    used = set()
+    for entry in entries:
+        for copy in entry['copies']:
+            used.add(copy)
+            used.add(os.path.splitext(copy)[0])
+    analysis['unusedCopybooks'] = [entry['path'] for entry in copybooks
+                                   if entry['name'].upper() not in used
+                                   and os.path.splitext(entry['name'])[0].upper() not in used]
+
+    summary = {
+        'overview': {
+            'totalPrograms': len(programs),
+            'totalCopybooks': len(copybooks),
+            'mainPrograms': len(analysis['mainPrograms']),
+            'unusedCopybooks': len(analysis['unusedCopybooks']),
+        },
+        'subsystems': {},
+        'dataAccessLayer': {'MT_modules': [], 'LD_modules': [], 'UNL_modules': [], 'RES_modules': []},
+        'fileTypes': {'programs': {}, 'copybooks': {}},
+    }
+    for name in SUBSYSTEM_DIRS + ('common',):
+        members = [entry for entry in programs if subsystem_of(entry['path']) == name]
+        summary['subsystems'][name] = {
+            'programs': len(members),
+            'withCalls': sum(1 for entry in members if entry['calls']),
+            'withCopies': sum(1 for entry in members if entry['copies']),
+        }
+    for entry in programs:
+        for suffix in ('MT', 'LD', 'UNL', 'RES'):
+            if entry['name'].endswith(f'{suffix}.cbl'):
+                summary['dataAccessLayer'][f'{suffix}_modules'].append(entry['name'])
+                break
+        pattern = re.sub(r'[0-9]+', 'XXX', entry['name'], count=1)
+        summary['fileTypes']['programs'][pattern] = summary['fileTypes']['programs'].get(pattern, 0) + 1
+    analysis['summary'] = summary
+    return analysis
+
+def build_call_graph(analysis):
+    """system-call-graph.json from the analysis"""
+    graph = {
+        'nodes': [],
+        'edges': [],
+        'mainPrograms': [entry['name'] for entry in analysis['mainPrograms']],
+        'subsystems': {name: {'programs': [], 'calls': []} for name in SUBSYSTEM_DIRS + ('common',)},
+    }
+    for entry in analysis['programs']:
+        node_id = entry['programId'] or entry['name']
+        subsystem = subsystem_of(entry['path'])
+        graph['nodes'].append({'id': node_id, 'label': entry['name'], 'type': 'program',
+                               'path': entry['path'], 'subsystem': subsystem})
+        graph['subsystems'][subsystem]['programs'].append(node_id)
+        for callee in entry['calls']:
+            edge = {'from': node_id, 'to': callee, 'type': 'calls'}
+            graph['edges'].append(edge)
+            graph['subsystems'][subsystem]['calls'].append(edge)
+    return graph
+
+def write_json(path, data):
+    temp_path = f'{path}.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(temp_path, path)
+
+def write_analysis(entries, output_dir=OUTPUT_DIR):
+    """Write structure-analysis.json and system-call-graph.json; return the analysis"""
+    analysis = build_analysis(entries)
+    os.makedirs(output_dir, exist_ok=True)
+    write_json(os.path.join(output_dir, 'structure-analysis.json'), analysis)
+    write_json(os.path.join(output_dir, 'system-call-graph.json'), build_call_graph(analysis))
+    return analysis
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Optional build stage: pre-render Mermaid diagrams to inline SVG.
+
+Shared by the documentation generators. Every <div class="mermaid"> in a
+generated page is rendered through a local renderer process (mermaid-cli's
+mmdc, or whatever MERMAID_RENDERER points at) and the SVG is inlined in the
+div, marked data-processed so the browser-side Mermaid skips it. Diagrams
+the renderer cannot handle keep their source and still render client-side;
+when no renderer is installed the page is left as it was.
+
+Rendered SVG is cached on disk as <key>.svg, keyed by a hash of the diagram
+source, the Mermaid configuration and the renderer version, so repeat builds
+only launch the renderer for new or changed diagrams.
+"""
+
+import hashlib
+import html
+import json
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+
+SVG_CACHE_DIR = '.mermaid_svg_cache'
+PRERENDER_ENV = 'ACAS_PRERENDER_DIAGRAMS'
+RENDERER_ENV = 'MERMAID_RENDERER'
+RENDER_TIMEOUT = 300
+
+MERMAID_DIV_RE = re.compile(r'<div class="mermaid"([^>]*)>(.*?)</div>', re.DOTALL)
+MERMAID_SCRIPT_RE = re.compile(r'[ \t]*<script src="[^"]*/mermaid(?:\.min)?\.js"></script>\n?')
+SVG_ID_RE = re.compile(r'<svg\b[^>]*?\bid="([^"]+)"')
+
+def drop_mermaid_script(html_content):
+    """The page without its Mermaid <script> tag, for pages whose diagrams are all inlined"""
+    return MERMAID_SCRIPT_RE.sub('', html_content, count=1)
+
+def prerender_enabled():
+    """True when pre-rendering was requested for this build (build_docs.py sets it)"""
+    return os.environ.get(PRERENDER_ENV, '') not in ('', '0')
+
+def find_renderer():
+    """Path of the local Mermaid renderer, or None"""
+    return os.environ.get(RENDERER_ENV) or shutil.which('mmdc')
+
+def make_prerenderer(config, cache_dir=SVG_CACHE_DIR, log=print):
+    """A MermaidPrerenderer, or None (diagrams then render in the browser)"""
+    renderer = find_renderer()
+    if renderer is None:
+        log(f"No Mermaid renderer found (install @mermaid-js/mermaid-cli or set {RENDERER_ENV}); "
+            f"diagrams will render in the browser")
+        return None
+    try:
+        return MermaidPrerenderer(renderer, config, cache_dir)
+    except (OSError, subprocess.SubprocessError) as e:
+        log(f"Mermaid renderer {renderer} is not usable ({e}); diagrams will render in the browser")
+        return None
+
+class MermaidPrerenderer:
+    """Renders Mermaid diagrams to SVG through a renderer process, with an on-disk cache"""
+
+    def __init__(self, renderer, config, cache_dir=SVG_CACHE_DIR):
+        self.renderer = renderer
+        self.config = config
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        self.failures = 0
+        # SVG (or None for failures) already looked up during this build
+        self.rendered = {}
+        os.makedirs(cache_dir, exist_ok=True)
+        version = subprocess.run([renderer, '--version'], capture_output=True, text=True,
+                                 check=True, timeout=RENDER_TIMEOUT).stdout.strip()
+        self.stamp = f'{version}\0{json.dumps(config, sort_keys=True)}\0'.encode('utf-8')
+
+    def key(self, source):
+        """Content hash for a diagram"""
+        return hashlib.sha256(self.stamp + source.encode('utf-8')).hexdigest()
+
+    def cache_path(self, key):
+        return os.path.join(self.cache_dir, key + '.svg')
+
+    def render_sources(self, sources):
+        """Return {source: svg or None}, launching the renderer once for all cache misses"""
+        rendered = {}
+        missing = []
+        for source in dict.fromkeys(sources):
+            if source in self.rendered:
+                rendered[source] = self.rendered[source]
+                continue
+            try:
+                with open(self.cache_path(self.key(source)), 'r', encoding='utf-8') as f:
+                    rendered[source] = f.read()
+                self.hits += 1
+            except OSError:
+                missing.append(source)
+
+        if missing:
+            self.misses += len(missing)
+            for source, svg in zip(missing, self.run_renderer(missing)):
+                if svg is None:
+                    self.failures += 1
+                else:
+                    svg = self.unique_ids(svg, self.key(source))
+                    with open(self.cache_path(self.key(source)), 'w', encoding='utf-8') as f:
+                        f.write(svg)
+                rendered[source] = svg
+        self.rendered.update(rendered)
+        return rendered
+
+    def run_renderer(self, sources):
+        """Render sources to SVG text (None where rendering failed)"""
+        with tempfile.TemporaryDirectory() as tmp:
+            config_file = os.path.join(tmp, 'config.json')
+            with open(config_file, 'w', encoding='utf-8') as f:
+                json.dump(self.config, f)
+            # Headless Chromium refuses to start as root without this
+            puppeteer_file = os.path.join(tmp, 'puppeteer.json')
+            with open(puppeteer_file, 'w', encoding='utf-8') as f:
+                json.dump({'args': ['--no-sandbox']}, f)
+            options = ['-c', config_file, '-p', puppeteer_file, '-b', 'white', '-q']
+
+            # One process for every diagram: mmdc renders each mermaid block
+            # of a markdown file to <output>-<n>.svg
+            batch_input = os.path.join(tmp, 'diagrams.md')
+            with open(batch_input, 'w', encoding='utf-8') as f:
+                f.write(''.join(f'```mermaid\n{source}\n```\n\n' for source in sources))
+            if self.run([batch_input, os.path.join(tmp, 'rendered.md')], options):
+                svgs = [self.read_svg(os.path.join(tmp, f'rendered-{n}.svg'))
+                        for n in range(1, len(sources) + 1)]
+                if None not in svgs:
+                    return svgs
+
+            # A bad diagram fails the whole batch: retry one at a time
+            svgs = []
+            for n, source in enumerate(sources):
+                diagram_input = os.path.join(tmp, f'diagram-{n}.mmd')
+                diagram_output = os.path.join(tmp, f'diagram-{n}.svg')
+                with open(diagram_input, 'w', encoding='utf-8') as f:
+                    f.write(source)
+                ok = self.run([diagram_input, diagram_output], options)
+                svgs.append(self.read_svg(diagram_output) if ok else None)
+            return svgs
+
+    def run(self, paths, options):
+        """Run the renderer from paths[0] to paths[1]; True on success"""
+        try:
+            subprocess.run([self.renderer, '-i', paths[0], '-o', paths[1]] + options,
+                           capture_output=True, check=True, timeout=RENDER_TIMEOUT)
+            return True
+        except (OSError, subprocess.SubprocessError):
+            return False
+
+    @staticmethod
+    def read_svg(path):
+        """SVG element text from a rendered file, or None"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                svg = f.read()
+        except OSError:
+            return None
+        start = svg.find('<svg')
+        return svg[start:].strip() if start >= 0 else None
+
+    @staticmethod
+    def unique_ids(svg, key):
+        """Give the SVG (and its internal references) an id derived from its
+        content, so several inlined diagrams don't share one id"""
+        match = SVG_ID_RE.search(svg)
+        if match is None:
+            return svg
+        old_id = match.group(1)
+        new_id = f'mermaid-svg-{key[:16]}'
+        return svg.replace(f'id="{old_id}', f'id="{new_id}').replace(f'#{old_id}', f'#{new_id}')
+
+    def prerender_html(self, html_content):
+        """Inline SVG into every Mermaid div of a page (or part of one) that renders"""
+        matches = list(MERMAID_DIV_RE.finditer(html_content))
+        pending = [match for match in matches if 'data-processed' not in match.group(1)]
+        if not pending:
+            return html_content
+        sources = [html.unescape(match.group(2)).strip() for match in pending]
+        rendered = self.render_sources(sources)
+
+        def replace(match):
+            attributes = match.group(1)
+            if 'data-processed' in attributes:
+                return match.group(0)
+            svg = rendered.get(html.unescape(match.group(2)).strip())
+            if svg is None:
+                return match.group(0)
+            return f'<div class="mermaid"{attributes} data-processed="true">{svg}</div>'
+
+        html_content = MERMAID_DIV_RE.sub(replace, html_content)
+        # A page with nothing left for the browser to render no longer needs
+        # the Mermaid script, and so also works offline
+        if None not in rendered.values():
+            html_content = drop_mermaid_script(html_content)
+        return html_content
+
+    def stats(self):
+        """One-line cache summary"""
+        failed = f", {self.failures} left for the browser" if self.failures else ""
+        return f"{self.hits} cached, {self.misses} rendered{failed}"
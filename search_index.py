@@ -0,0 +1,478 @@
+#!/usr/bin/env python3
+"""
+Build stage shared by the documentation generators: a full-text search index.
+
+Every section of a generated report (the text under each h1-h3 heading that
+has an id) is tokenized at build time into an inverted index. The terms are
+stored sorted and front-coded; each term's postings are varint arrays of
+(section number delta, term frequency) pairs. The index is gzip-compressed
+and embedded in the page as a base64 <script type="application/octet-stream">,
+and a small query engine decodes it the first time the search box is used.
+Queries then binary-search the term list and merge postings; the page text
+itself is never scanned.
+
+Index layout (every integer an unsigned LEB128 varint, every string a varint
+byte length followed by UTF-8):
+    magic "ACSI", format version byte
+    stopword count, stopwords
+    container count, (container id, container title) per container
+    section count, (container number, length in words, anchor, title) per section
+    term count, then per term in sorted order:
+        length of the prefix shared with the previous term, rest of the term,
+        postings count, postings byte length, postings
+"""
+
+import base64
+import gzip
+import html
+import re
+from collections import Counter
+
+INDEX_MAGIC = b'ACSI'
+INDEX_VERSION = 1
+INDEX_ELEMENT_ID = 'search-index'
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+MAX_TOKEN_LENGTH = 40
+STOPWORDS = frozenset((
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in', 'is',
+    'it', 'of', 'on', 'or', 'that', 'the', 'this', 'to', 'with'))
+
+# A word in a section's title counts as this many occurrences in its text
+TITLE_WEIGHT = 5
+
+# Sections start at h1-h3 headings that can be linked to
+HEADING_RE = re.compile(r'<h([1-3])\b[^>]*?\bid="([^"]+)"[^>]*>(.*?)</h\1>', re.DOTALL | re.IGNORECASE)
+# Markup whose text is not prose: scripts, styles, pre-rendered diagrams,
+# then Mermaid sources (once any SVG inside them is gone)
+SKIPPED_RE = re.compile(r'<(script|style|svg)\b.*?</\1>', re.DOTALL | re.IGNORECASE)
+MERMAID_DIV_RE = re.compile(r'<div class="mermaid"[^>]*>.*?</div>', re.DOTALL)
+TAG_RE = re.compile(r'<[^>]+>')
+
+def tokenize(text):
+    """Lower-cased alphanumeric words, minus stopwords (the query engine splits queries the same way)"""
+    return [token for token in TOKEN_RE.findall(text.lower())
+            if len(token) <= MAX_TOKEN_LENGTH and token not in STOPWORDS]
+
+def html_text(fragment):
+    """Plain text of an HTML fragment, whitespace collapsed"""
+    return ' '.join(html.unescape(TAG_RE.sub(' ', fragment)).split())
+
+def write_varint(out, value):
+    while value >= 0x80:
+        out.append(value & 0x7f | 0x80)
+        value >>= 7
+    out.append(value)
+
+def write_string(out, text):
+    data = text.encode('utf-8')
+    write_varint(out, len(data))
+    out += data
+
+class SearchIndexBuilder:
+    """Collects report sections and serializes them as a search index"""
+
+    def __init__(self):
+        # Container (the element a section lives in: a report section, a
+        # page, or '' for the whole document) -> (number, title)
+        self.containers = {}
+        self.sections = []
+        self.postings = {}
+
+    def add_section(self, container, anchor, title, text):
+        """Index one section; anchor is the id of its heading ('' for the container itself)"""
+        counts = Counter(tokenize(text))
+        for token in tokenize(title):
+            counts[token] += TITLE_WEIGHT
+        if not counts:
+            return
+        number = len(self.sections)
+        self.sections.append((self.containers[container][0], sum(counts.values()), anchor, title))
+        for term, count in counts.items():
+            self.postings.setdefault(term, []).append((number, count))
+
+    def add_html(self, html_content, container='', container_title=''):
+        """Index rendered HTML as one section per h1-h3 heading with an id
+
+        Text before the first such heading is a section of its own, titled
+        container_title and linked to the container.
+        """
+        if container not in self.containers:
+            self.containers[container] = (len(self.containers), container_title)
+        html_content = MERMAID_DIV_RE.sub(' ', SKIPPED_RE.sub(' ', html_content))
+        anchor, title, start = '', container_title, 0
+        for match in HEADING_RE.finditer(html_content):
+            self.add_section(container, anchor, title, html_text(html_content[start:match.start()]))
+            anchor, title, start = match.group(2), html_text(match.group(3)), match.end()
+        self.add_section(container, anchor, title, html_text(html_content[start:]))
+
+    def to_bytes(self):
+        """The serialized index"""
+        out = bytearray(INDEX_MAGIC)
+        out.append(INDEX_VERSION)
+        write_varint(out, len(STOPWORDS))
+        for word in sorted(STOPWORDS):
+            write_string(out, word)
+        write_varint(out, len(self.containers))
+        for container, (_, title) in self.containers.items():
+            write_string(out, container)
+            write_string(out, title)
+        write_varint(out, len(self.sections))
+        for container, length, anchor, title in self.sections:
+            write_varint(out, container)
+            write_varint(out, length)
+            write_string(out, anchor)
+            write_string(out, title)
+
+        write_varint(out, len(self.postings))
+        previous = ''
+        for term in sorted(self.postings):
+            shared = 0
+            for a, b in zip(previous, term):
+                if a != b:
+                    break
+                shared += 1
+            write_varint(out, shared)
+            write_string(out, term[shared:])
+            postings = bytearray()
+            last = 0
+            for number, count in self.postings[term]:
+                write_varint(postings, number - last)
+                write_varint(postings, count)
+                last = number
+            write_varint(out, len(self.postings[term]))
+            write_varint(out, len(postings))
+            out += postings
+            previous = term
+        return bytes(out)
+
+    def html_blob(self):
+        """The index as a compressed, base64-encoded script element"""
+        data = gzip.compress(self.to_bytes(), compresslevel=9, mtime=0)
+        return (f'<script type="application/octet-stream" id="{INDEX_ELEMENT_ID}">'
+                f'{base64.b64encode(data).decode("ascii")}</script>')
+
+    def stats(self):
+        """One-line index summary"""
+        return f"{len(self.sections)} sections, {len(self.postings)} terms"
+
+# Search box for a report's sidebar
+SEARCH_BOX = '''<div class="search-box">
+                <input type="search" id="search-input" placeholder="Search the documentation..." autocomplete="off" aria-label="Search">
+                <div class="search-results" id="search-results" hidden></div>
+            </div>'''
+
+# Placed at the indentation of the page's other style rules
+SEARCH_CSS = '''/* Full-text search */
+        .search-box {
+            position: relative;
+            margin: 12px 0;
+        }
+
+        .search-box input {
+            width: 100%;
+            padding: 8px 12px;
+            border: 1px solid #d0d7de;
+            border-radius: 6px;
+            font-size: 14px;
+            color: #24292e;
+            background: #ffffff;
+        }
+
+        .search-results {
+            position: absolute;
+            left: 0;
+            right: 0;
+            z-index: 100;
+            max-height: 60vh;
+            overflow-y: auto;
+            margin-top: 4px;
+            background: #ffffff;
+            border: 1px solid #d0d7de;
+            border-radius: 6px;
+            box-shadow: 0 8px 24px rgba(0,0,0,0.15);
+        }
+
+        .search-results a {
+            display: block;
+            padding: 8px 12px;
+            color: #0969da;
+            text-decoration: none;
+            font-size: 14px;
+            cursor: pointer;
+            border-radius: 0;
+        }
+
+        .search-results a:hover,
+        .search-results a.selected {
+            background: #f0f6ff;
+        }
+
+        .search-results .search-context {
+            display: block;
+            color: #57606a;
+            font-size: 12px;
+        }
+
+        .search-results .search-status {
+            padding: 6px 12px;
+            color: #57606a;
+            font-size: 12px;
+            border-top: 1px solid #eaeef2;
+        }'''
+
+# The query engine, without browser dependencies (benchmark_search_index.py
+# runs it under node)
+SEARCH_ENGINE_JS = '''
+        // Inverted index decoded from the bytes search_index.py wrote
+        class SearchIndex {
+            constructor(bytes) {
+                this.bytes = bytes;
+                this.pos = 0;
+                if (String.fromCharCode(...bytes.subarray(0, 4)) !== 'ACSI' || bytes[4] !== 1) {
+                    throw new Error('Unknown search index format');
+                }
+                this.pos = 5;
+                const decoder = new TextDecoder();
+                const readString = () => {
+                    const length = this.varint();
+                    this.pos += length;
+                    return decoder.decode(bytes.subarray(this.pos - length, this.pos));
+                };
+
+                this.stopwords = new Set();
+                for (let n = this.varint(); n > 0; n--) {
+                    this.stopwords.add(readString());
+                }
+                this.containers = [];
+                for (let n = this.varint(); n > 0; n--) {
+                    this.containers.push({ id: readString(), title: readString() });
+                }
+                const sectionCount = this.varint();
+                this.sections = new Array(sectionCount);
+                this.lengths = new Float64Array(sectionCount);
+                for (let n = 0; n < sectionCount; n++) {
+                    const container = this.containers[this.varint()];
+                    this.lengths[n] = this.varint();
+                    this.sections[n] = { container, anchor: readString(), title: readString() };
+                }
+                // BM25 length normalization, precomputed per section
+                const averageLength = this.lengths.reduce((a, b) => a + b, 0) / Math.max(sectionCount, 1);
+                this.norms = this.lengths.map(length => 1.2 * (0.25 + 0.75 * length / averageLength));
+
+                // Terms are ASCII and front-coded; postings stay encoded
+                // until a query needs them
+                const termCount = this.varint();
+                this.terms = new Array(termCount);
+                this.counts = new Uint32Array(termCount);
+                this.offsets = new Uint32Array(termCount);
+                let previous = '';
+                for (let n = 0; n < termCount; n++) {
+                    const shared = this.varint();
+                    const length = this.varint();
+                    previous = previous.slice(0, shared) + String.fromCharCode(...bytes.subarray(this.pos, this.pos + length));
+                    this.pos += length;
+                    this.terms[n] = previous;
+                    this.counts[n] = this.varint();
+                    const size = this.varint();
+                    this.offsets[n] = this.pos;
+                    this.pos += size;
+                }
+                this.scores = new Float64Array(sectionCount);
+                this.matched = new Uint8Array(sectionCount);
+            }
+
+            varint() {
+                let value = 0;
+                let shift = 0;
+                let byte;
+                do {
+                    byte = this.bytes[this.pos++];
+                    value += (byte & 0x7f) * 2 ** shift;
+                    shift += 7;
+                } while (byte & 0x80);
+                return value;
+            }
+
+            tokenize(text) {
+                return (text.toLowerCase().match(/[a-z0-9]+/g) || [])
+                    .filter(token => token.length <= 40 && !this.stopwords.has(token));
+            }
+
+            // First term not less than key
+            lowerBound(key) {
+                let low = 0;
+                let high = this.terms.length;
+                while (low < high) {
+                    const mid = (low + high) >>> 1;
+                    if (this.terms[mid] < key) {
+                        low = mid + 1;
+                    } else {
+                        high = mid;
+                    }
+                }
+                return low;
+            }
+
+            // Term numbers a query word matches: the word itself, or for the
+            // word being typed, the most frequent terms it is a prefix of
+            // (a single letter is too short to mean much as a prefix)
+            expand(word, prefix) {
+                const start = this.lowerBound(word);
+                if (!prefix || word.length < 2) {
+                    return this.terms[start] === word ? [start] : [];
+                }
+                const end = this.lowerBound(word + '\\uffff');
+                const found = [];
+                for (let n = start; n < end; n++) {
+                    found.push(n);
+                }
+                if (found.length > SearchIndex.MAX_EXPANSIONS) {
+                    found.sort((a, b) => this.counts[b] - this.counts[a]);
+                    found.length = SearchIndex.MAX_EXPANSIONS;
+                }
+                return found;
+            }
+
+            // Sections containing every query word, best first
+            search(query, limit = 20) {
+                const words = this.tokenize(query).slice(0, 16);
+                if (!words.length) {
+                    return [];
+                }
+                const scores = this.scores;
+                const matched = this.matched;
+                scores.fill(0);
+                matched.fill(0);
+                const sectionCount = this.sections.length;
+
+                for (let w = 0; w < words.length; w++) {
+                    const last = w === words.length - 1;
+                    for (const term of this.expand(words[w], last)) {
+                        const idf = Math.log(1 + sectionCount / this.counts[term]);
+                        const weight = this.terms[term] === words[w] ? idf : idf * 0.7;
+                        this.pos = this.offsets[term];
+                        let section = 0;
+                        for (let n = this.counts[term]; n > 0; n--) {
+                            section += this.varint();
+                            const frequency = this.varint();
+                            // A section counts only if it matched every earlier word
+                            if (matched[section] === w) {
+                                matched[section] = w + 1;
+                            } else if (matched[section] !== w + 1) {
+                                continue;
+                            }
+                            scores[section] += weight * frequency * 2.2 / (frequency + this.norms[section]);
+                        }
+                    }
+                }
+
+                const hits = [];
+                for (let section = 0; section < sectionCount; section++) {
+                    if (matched[section] === words.length) {
+                        hits.push(section);
+                    }
+                }
+                hits.sort((a, b) => scores[b] - scores[a]);
+                return hits.slice(0, limit).map(section => ({ ...this.sections[section], score: scores[section] }));
+            }
+        }
+        SearchIndex.MAX_EXPANSIONS = 16;
+'''
+
+# Search box behaviour. A report can define openSearchResult(hit) to show a
+# result itself; by default the page scrolls to the result's heading
+SEARCH_UI_JS = '''
+        let searchIndexPromise = null;
+
+        function loadSearchIndex() {
+            if (!searchIndexPromise) {
+                const blob = document.getElementById('search-index');
+                const bytes = Uint8Array.from(atob(blob.textContent.trim()), c => c.charCodeAt(0));
+                const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('gzip'));
+                searchIndexPromise = new Response(stream).arrayBuffer()
+                    .then(buffer => new SearchIndex(new Uint8Array(buffer)));
+            }
+            return searchIndexPromise;
+        }
+
+        function scrollToSearchResult(hit) {
+            const scope = hit.container.id ? document.getElementById(hit.container.id) : document;
+            if (!scope) {
+                return;
+            }
+            const target = hit.anchor ? scope.querySelector(`[id="${CSS.escape(hit.anchor)}"]`) : scope;
+            if (target) {
+                target.scrollIntoView({ behavior: 'smooth', block: 'start' });
+            }
+        }
+
+        (function () {
+            const input = document.getElementById('search-input');
+            const results = document.getElementById('search-results');
+            let hits = [];
+
+            function openHit(hit) {
+                results.hidden = true;
+                (window.openSearchResult || scrollToSearchResult)(hit);
+            }
+
+            function showResults(elapsed) {
+                results.replaceChildren();
+                hits.forEach(hit => {
+                    const link = document.createElement('a');
+                    link.textContent = hit.title || hit.container.title;
+                    if (hit.container.title && hit.title !== hit.container.title) {
+                        const context = document.createElement('span');
+                        context.className = 'search-context';
+                        context.textContent = hit.container.title;
+                        link.appendChild(context);
+                    }
+                    link.addEventListener('click', () => openHit(hit));
+                    results.appendChild(link);
+                });
+                const status = document.createElement('div');
+                status.className = 'search-status';
+                status.textContent = `${hits.length || 'No'} result${hits.length === 1 ? '' : 's'} (${elapsed.toFixed(1)} ms)`;
+                results.appendChild(status);
+                results.hidden = false;
+            }
+
+            async function runSearch() {
+                const query = input.value;
+                if (!query.trim()) {
+                    results.hidden = true;
+                    return;
+                }
+                let index;
+                try {
+                    index = await loadSearchIndex();
+                } catch (error) {
+                    console.error('Search index unavailable:', error);
+                    return;
+                }
+                if (query !== input.value) {
+                    // Typing moved on while the index loaded
+                    return;
+                }
+                const start = performance.now();
+                hits = index.search(query);
+                showResults(performance.now() - start);
+            }
+
+            input.addEventListener('focus', () => loadSearchIndex().catch(() => {}));
+            input.addEventListener('input', runSearch);
+            input.addEventListener('keydown', event => {
+                if (event.key === 'Enter' && hits.length && !results.hidden) {
+                    openHit(hits[0]);
+                } else if (event.key === 'Escape') {
+                    results.hidden = true;
+                }
+            });
+        })();
+'''
+
+def search_script(builder):
+    """The embedded index followed by the query engine and search box script"""
+    return f'''{builder.html_blob()}
+    <script>{SEARCH_ENGINE_JS}{SEARCH_UI_JS}    </script>'''